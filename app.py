@@ -14,7 +14,7 @@ st.set_page_config(
 )
 
 # 导入模块
-from src.audio_cache import AudioCache
+from src.audio_cache import get_shared_audio_cache
 from src.history_manager import HistoryManager
 from src.wrong_answer_manager import WrongAnswerManager
 from data.vocabulary_store import VocabularyStore
@@ -39,10 +39,11 @@ def init_session_state():
         'current_index': 0,
         'dictation_order': [],  # 听写顺序
         'user_answers': {},  # 用户答案
-        'audio_cache': None,  # 延迟初始化
+        'audio_cache': None,  # 延迟初始化（进程级共享）
         'voice_en': "male_qn_qingse",
         'voice_cn': "female_shaonv",
         'playback_interval': 3,
+        'playback_speed': 1.0,  # 语速，非 1.0 时本地变速，不重新合成
         'shuffle_order': False,
         'dictation_mode': "en_to_cn",  # en_to_cn | cn_to_en | spell
         'grading_result': None,  # 拍照批改结果
@@ -60,7 +61,8 @@ def init_session_state():
 
     # 延迟初始化复杂对象
     if st.session_state.audio_cache is None:
-        st.session_state.audio_cache = AudioCache()
+        # 所有会话共享同一个缓存，相同音频只合成一次
+        st.session_state.audio_cache = get_shared_audio_cache()
 
     if st.session_state.vocab_store is None:
         st.session_state.vocab_store = VocabularyStore()
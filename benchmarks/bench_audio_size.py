@@ -0,0 +1,74 @@
+"""
+音频规格体积基准测试
+
+对本地 TTS 测试桩按不同音频规格预加载一组单词，比较每个单词的音频体积、
+base64 内联后的体积，以及每 1000 个单词的缓存占用。
+运行：python -m benchmarks.bench_audio_size [--words 200] [--profiles hifi standard compact]
+"""
+import argparse
+import base64
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_tts_server import StubTTSServer
+from src.audio_cache import AudioCache
+from src.audio_profile import AUDIO_PROFILES
+from src.minimax_tts import MiniMaxTTSEngine
+
+
+def measure_profile(server: StubTTSServer, words, profile: str) -> dict:
+    """在空缓存上按指定规格预加载，返回体积统计（字节）"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = AudioCache(cache_dir=tmpdir, audio_profile=profile)
+        cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=server.url)
+        cache.preload_words(words, mode="en_to_cn")
+
+        status = cache.get_preload_status()
+        if status["errors"]:
+            raise RuntimeError(f"预加载出现 {status['errors']} 个错误")
+
+        paths = list(cache.cache.values())
+        base64_bytes = 0
+        for path in paths:
+            with open(path, "rb") as f:
+                base64_bytes += len(base64.b64encode(f.read()))
+        store_bytes = cache.store.get_usage()["bytes"]
+
+    count = max(1, len(paths))
+    return {
+        "per_word": store_bytes / count,
+        "base64_per_word": base64_bytes / count,
+        "per_1000": store_bytes / count * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="音频规格体积基准测试")
+    parser.add_argument("--words", type=int, default=200, help="单词数量")
+    parser.add_argument("--profiles", nargs="+", default=list(AUDIO_PROFILES),
+                        choices=list(AUDIO_PROFILES), help="比较的音频规格")
+    args = parser.parse_args(argv)
+
+    words = [{"en": f"word{i}", "cn": f"词{i}"} for i in range(args.words)]
+
+    print(f"单词数: {args.words}（测试桩按文本长度生成对应规格的 MP3 帧）")
+    print(f"{'规格':>8} {'采样率':>8} {'比特率':>8} {'每词(KB)':>10} "
+          f"{'base64(KB)':>11} {'每千词(MB)':>11} {'相对':>6}")
+
+    baseline = None
+    for name in args.profiles:
+        profile = AUDIO_PROFILES[name]
+        with StubTTSServer() as server:
+            server.realistic_audio = True
+            result = measure_profile(server, words, name)
+        baseline = baseline or result["per_word"]
+        print(f"{name:>8} {profile.sample_rate:>8} {profile.bitrate // 1000:>6}k "
+              f"{result['per_word'] / 1024:>10.2f} {result['base64_per_word'] / 1024:>11.2f} "
+              f"{result['per_1000'] / 1024 / 1024:>11.2f} {result['per_word'] / baseline:>5.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+预加载并发基准测试
+
+对本地 TTS 测试桩预加载一组单词，比较不同并发数下的耗时。
+运行：python -m benchmarks.bench_preload [--words 40] [--latency 0.2] [--batch-size 10]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_tts_server import StubTTSServer
+from src.audio_cache import AudioCache
+from src.minimax_tts import MiniMaxTTSEngine
+
+
+def run_preload(server: StubTTSServer, words, workers: int, batch_size: int = 1) -> float:
+    """在空缓存上预加载一次，返回耗时（秒）"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = AudioCache(cache_dir=tmpdir, max_workers=workers, batch_size=batch_size)
+        cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=server.url)
+
+        start = time.perf_counter()
+        cache.preload_words(words, mode="en_to_cn")
+        elapsed = time.perf_counter() - start
+
+        status = cache.get_preload_status()
+        if status["errors"]:
+            raise RuntimeError(f"预加载出现 {status['errors']} 个错误")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="预加载并发基准测试")
+    parser.add_argument("--words", type=int, default=40, help="单词数量")
+    parser.add_argument("--latency", type=float, default=0.2, help="测试桩单次合成耗时（秒）")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="并发数列表")
+    parser.add_argument("--batch-size", type=int, default=1, help="每个请求合成的单词数")
+    args = parser.parse_args(argv)
+
+    words = [{"en": f"word{i}", "cn": f"词{i}"} for i in range(args.words)]
+
+    print(f"单词数: {args.words}, 单次合成耗时: {args.latency:.2f}s, 批大小: {args.batch_size}")
+    print(f"{'并发数':>6} {'耗时(s)':>10} {'加速比':>8} {'请求数':>6} {'服务端最大并发':>14}")
+
+    baseline = None
+    for workers in args.workers:
+        with StubTTSServer(latency=args.latency) as server:
+            elapsed = run_preload(server, words, workers, args.batch_size)
+            max_active = server.max_active
+            request_count = len(server.requests)
+        baseline = baseline or elapsed
+        print(f"{workers:>6} {elapsed:>10.2f} {baseline / elapsed:>7.1f}x "
+              f"{request_count:>6} {max_active:>14}")
+
+
+if __name__ == "__main__":
+    main()
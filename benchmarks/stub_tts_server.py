@@ -0,0 +1,234 @@
+"""
+本地 TTS 测试桩 - 模拟 MiniMax t2a_v2 接口
+
+用于基准测试和单元测试，不访问外网：
+    server = StubTTSServer(latency=0.1)
+    server.start()
+    engine = MiniMaxTTSEngine(api_key="stub", api_url=server.url)
+"""
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+
+from src.mp3_utils import get_duration, make_silence
+
+
+class StubTTSServer:
+    """模拟 MiniMax 语音合成接口的本地 HTTP 服务"""
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            latency: 每次请求的模拟合成耗时（秒）
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+        """
+        self.latency = latency
+        self.requests: List[Dict] = []
+        # 依次注入的错误：int 为 HTTP 状态码，dict 为 base_resp（HTTP 200）
+        self.errors: List[Union[int, Dict]] = []
+        self.connections = set()
+        self.active = 0
+        self.max_active = 0
+        # 是否为 subtitle_enable 的请求返回字幕文件
+        self.subtitles_enabled = True
+        # 流式响应：音频切成的块数与块间隔（秒）
+        self.stream_chunks = 4
+        self.chunk_delay = 0.0
+        # 为 True 时单个合成也返回与请求规格一致的真实 MP3 帧（用于体积基准）
+        self.realistic_audio = False
+        self._subtitles: Dict[str, List[Dict]] = {}
+        self._subtitle_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/v1/t2a_v2"
+
+    def start(self) -> "StubTTSServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def synthesize(self, payload: Dict) -> bytes:
+        """生成假音频：内容由文本和音色决定（realistic_audio 时为对应规格的静音 MP3）"""
+        if self.realistic_audio:
+            audio_setting = payload.get("audio_setting", {})
+            return make_silence(
+                self.segment_duration(payload.get("text", "")),
+                sample_rate=audio_setting.get("sample_rate", 32000),
+                bitrate=audio_setting.get("bitrate", 128000),
+            )
+        voice = payload.get("voice_setting", {}).get("voice_id", "")
+        return f"ID3|{payload.get('text', '')}|{voice}".encode("utf-8")
+
+    @staticmethod
+    def segment_duration(text: str) -> float:
+        """批量模式下每段文本的模拟发音时长（秒），随文本长度变化便于校验切分"""
+        return 0.2 + 0.06 * len(text)
+
+    def synthesize_batch(self, payload: Dict):
+        """
+        按停顿标记分段生成静音 MP3，并返回与真实接口相同结构的字幕
+
+        Returns:
+            (音频字节, 字幕列表)
+        """
+        audio_setting = payload.get("audio_setting", {})
+        params = {
+            "sample_rate": audio_setting.get("sample_rate", 32000),
+            "bitrate": audio_setting.get("bitrate", 128000),
+        }
+
+        text = payload.get("text", "")
+        pauses = [float(p) for p in re.findall(r"<#([\d.]+)#>", text)]
+        segments = [seg.strip() for seg in re.split(r"<#[\d.]+#>", text)]
+
+        chunks, subtitles = [], []
+        elapsed = 0.0
+        for i, segment in enumerate(segments):
+            speech = make_silence(self.segment_duration(segment), **params)
+            duration = get_duration(speech)
+            subtitles.append({
+                "text": segment,
+                "time_begin": round(elapsed * 1000, 3),
+                "time_end": round((elapsed + duration) * 1000, 3),
+            })
+            chunks.append(speech)
+            elapsed += duration
+            if i < len(pauses):
+                pause = make_silence(pauses[i], **params)
+                chunks.append(pause)
+                elapsed += get_duration(pause)
+        return b"".join(chunks), subtitles
+
+    def handle(self, payload: Dict):
+        """处理一次合成请求，返回 (状态码, 响应体)"""
+        with self._lock:
+            error = self.errors.pop(0) if self.errors else None
+        if isinstance(error, int):
+            return error, {"error": f"injected {error}"}
+        if isinstance(error, dict):
+            return 200, {"base_resp": error}
+
+        if payload.get("subtitle_enable"):
+            audio, subtitles = self.synthesize_batch(payload)
+            data = {"audio": audio.hex(), "status": 2}
+            if self.subtitles_enabled:
+                with self._lock:
+                    subtitle_id = str(next(self._subtitle_ids))
+                    self._subtitles[subtitle_id] = subtitles
+                data["subtitle_file"] = f"{self.base_url}/subtitles/{subtitle_id}.json"
+        else:
+            data = {"audio": self.synthesize(payload).hex(), "status": 2}
+
+        body = {
+            "data": data,
+            "base_resp": {"status_code": 0, "status_msg": "success"},
+        }
+        return 200, body
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 支持 keep-alive
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                with stub._lock:
+                    stub.requests.append(payload)
+                    stub.connections.add(self.client_address)
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                try:
+                    if stub.latency:
+                        time.sleep(stub.latency)
+                    status, body = stub.handle(payload)
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+                if payload.get("stream") and status == 200:
+                    self._send_stream(payload, body)
+                    return
+
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, payload: Dict, body: Dict):
+                """以 SSE（分块传输）返回：若干个 status=1 音频块 + 结束事件"""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def send_event(event: Dict):
+                    data = f"data: {json.dumps(event)}\n\n".encode("utf-8")
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+
+                if "data" not in body:
+                    send_event(body)
+                else:
+                    audio = bytes.fromhex(body["data"]["audio"])
+                    count = max(1, stub.stream_chunks)
+                    size = -(-len(audio) // count)
+                    for i in range(0, len(audio), size):
+                        if i and stub.chunk_delay:
+                            time.sleep(stub.chunk_delay)
+                        send_event({"data": {"audio": audio[i:i + size].hex(), "status": 1}})
+
+                    exclude = payload.get("stream_options", {}).get("exclude_aggregated_audio")
+                    final = {"audio": "" if exclude else audio.hex(), "status": 2}
+                    send_event({"data": final, "base_resp": body["base_resp"]})
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_GET(self):
+                match = re.match(r"^/subtitles/(\w+)\.json$", self.path)
+                subtitles = stub._subtitles.get(match.group(1)) if match else None
+                if subtitles is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                data = json.dumps(subtitles, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
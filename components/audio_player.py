@@ -3,11 +3,96 @@
 统一处理不同模式的音频播放逻辑
 """
 import os
+import json
 import base64
 import time
 import streamlit as st
+import streamlit.components.v1 as components
 from typing import Optional, List, Dict, Callable
 
+from src.audio_server import get_audio_server
+from src.track_builder import build_track
+
+
+def _browser_can_reach_audio_server() -> bool:
+    """
+    浏览器能否直接访问音频服务
+
+    配置了 DICTATION_AUDIO_BASE_URL 时视为可访问；否则只在浏览器与服务在同一台机器上
+    （通过 localhost 访问页面）时使用默认的本地地址。
+    """
+    if os.getenv("DICTATION_AUDIO_BASE_URL"):
+        return True
+    try:
+        host = st.context.headers.get("Host", "")
+    except Exception:
+        return False
+    return host.rsplit(":", 1)[0] in ("localhost", "127.0.0.1", "[::1]")
+
+
+# 浏览器端播放列表：一次性下发全部地址与间隔，由浏览器预取并按时播放
+_PLAYLIST_HTML = """
+<div style="font-family:sans-serif;">
+  <p id="status" style="margin:0 0 6px 0;font-weight:bold;">准备播放...</p>
+  <progress id="bar" max="1" value="0" style="width:100%;"></progress>
+  <button id="start" style="display:none;margin-top:6px;">▶️ 开始播放</button>
+</div>
+<script>
+const playlist = __PLAYLIST__;
+const total = __TOTAL__;
+const PREFETCH = 3;  // 提前加载的片段数
+const statusText = document.getElementById("status");
+const bar = document.getElementById("bar");
+const startBtn = document.getElementById("start");
+const audios = {};
+let current = 0;
+
+function load(i) {
+  if (i < playlist.length && !audios[i]) {
+    const audio = new Audio();
+    audio.preload = "auto";
+    audio.src = playlist[i].src;
+    audios[i] = audio;
+  }
+  return audios[i];
+}
+
+function playAt(i) {
+  if (i >= playlist.length) {
+    statusText.textContent = "✅ 播放完成！";
+    bar.value = 1;
+    return;
+  }
+  current = i;
+  const item = playlist[i];
+  for (let k = i; k <= i + PREFETCH; k++) load(k);
+  statusText.textContent = "正在播放: " + (item.index + 1) + " / " + total;
+  bar.value = (i + 1) / playlist.length;
+
+  const audio = load(i);
+  let advanced = false;
+  const next = () => {
+    if (advanced) return;
+    advanced = true;
+    delete audios[i];
+    setTimeout(() => playAt(i + 1), item.gap * 1000);
+  };
+  audio.onended = next;
+  audio.onerror = next;
+  audio.play().catch(() => {
+    // 浏览器阻止自动播放时，等待用户点击
+    startBtn.style.display = "inline-block";
+  });
+}
+
+startBtn.onclick = () => {
+  startBtn.style.display = "none";
+  playAt(current);
+};
+playAt(0);
+</script>
+"""
+
 
 class AudioPlayer:
     """音频播放器组件"""
@@ -17,7 +102,10 @@ class AudioPlayer:
     MODE_CN_TO_EN = "cn_to_en"  # 中译英：播放中文
     MODE_SPELL = "spell"        # 拼写模式：先英文后中文
 
-    def __init__(self, audio_cache, voice_en: str = "male_qn_qingse", voice_cn: str = "female_shaonv"):
+    SPELL_GAP = 1.5  # 拼写模式中英文与中文之间（以及重复播放之间）的间隔（秒）
+
+    def __init__(self, audio_cache, voice_en: str = "male_qn_qingse", voice_cn: str = "female_shaonv",
+                 speed: float = 1.0):
         """
         初始化音频播放器
 
@@ -25,10 +113,12 @@ class AudioPlayer:
             audio_cache: 音频缓存对象
             voice_en: 英文语音
             voice_cn: 中文语音
+            speed: 语速（非 1.0 时由缓存从 1.0× 音频本地派生，不重新合成）
         """
         self.audio_cache = audio_cache
         self.voice_en = voice_en
         self.voice_cn = voice_cn
+        self.speed = speed
 
     def update_voices(self, voice_en: str = None, voice_cn: str = None):
         """更新语音设置"""
@@ -37,6 +127,28 @@ class AudioPlayer:
         if voice_cn:
             self.voice_cn = voice_cn
 
+    def update_speed(self, speed: float = 1.0):
+        """更新语速"""
+        self.speed = speed
+
+    @staticmethod
+    def audio_src(audio_path: str) -> str:
+        """
+        获取音频的播放地址
+
+        优先使用音频服务的 URL（浏览器可永久缓存，重复播放不再传输音频）；
+        服务不可用时回退为 base64 内联的 data URI。
+        """
+        server = get_audio_server() if _browser_can_reach_audio_server() else None
+        url = server.url_for(audio_path) if server else None
+        if url:
+            return url
+
+        with open(audio_path, 'rb') as f:
+            audio_bytes = f.read()
+        b64_audio = base64.b64encode(audio_bytes).decode()
+        return f"data:audio/mp3;base64,{b64_audio}"
+
     @staticmethod
     def play_audio(audio_path: str) -> bool:
         """
@@ -50,13 +162,13 @@ class AudioPlayer:
         """
         if not audio_path or not os.path.exists(audio_path):
             return False
+        return AudioPlayer._play_src(AudioPlayer.audio_src(audio_path))
 
-        with open(audio_path, 'rb') as f:
-            audio_bytes = f.read()
-        b64_audio = base64.b64encode(audio_bytes).decode()
+    @staticmethod
+    def _play_src(src: str) -> bool:
         st.markdown(f"""
         <audio autoplay>
-            <source src="data:audio/mp3;base64,{b64_audio}" type="audio/mp3">
+            <source src="{src}" type="audio/mp3">
         </audio>
         """, unsafe_allow_html=True)
         return True
@@ -75,14 +187,14 @@ class AudioPlayer:
         """
         if not audio_path or not os.path.exists(audio_path):
             return False
+        return AudioPlayer._play_src_delayed(AudioPlayer.audio_src(audio_path), delay_ms)
 
-        with open(audio_path, 'rb') as f:
-            audio_bytes = f.read()
-        b64_audio = base64.b64encode(audio_bytes).decode()
+    @staticmethod
+    def _play_src_delayed(src: str, delay_ms: int) -> bool:
         st.markdown(f"""
         <script>
             setTimeout(function() {{
-                var audio = new Audio('data:audio/mp3;base64,{b64_audio}');
+                var audio = new Audio('{src}');
                 audio.play();
             }}, {delay_ms});
         </script>
@@ -101,9 +213,49 @@ class AudioPlayer:
             音频文件路径，失败返回 None
         """
         if lang == "en":
-            return self.audio_cache.get_audio(text, mode="en", voice_en=self.voice_en)
+            return self.audio_cache.get_audio(text, mode="en", voice_en=self.voice_en, speed=self.speed)
         else:
-            return self.audio_cache.get_audio(text, mode="cn", voice_cn=self.voice_cn)
+            return self.audio_cache.get_audio(text, mode="cn", voice_cn=self.voice_cn, speed=self.speed)
+
+    def stream_src(self, text: str, lang: str = "en") -> Optional[str]:
+        """
+        尚未缓存的音频的边合成边播放地址（音频服务的 /stream）
+
+        只在浏览器能访问音频服务、原速播放且音频尚未缓存时返回，否则返回 None
+        （使用 get_audio_path 的文件）。变速音频由完整的 1.0× 音频派生，无法流式产出。
+        """
+        if self.speed != 1.0:
+            return None
+        server = get_audio_server() if _browser_can_reach_audio_server() else None
+        if server is None:
+            return None
+        if lang == "en":
+            if self.audio_cache.is_cached(text, "en", voice_en=self.voice_en):
+                return None
+            return server.stream_url(text, "en", self.voice_en)
+        if self.audio_cache.is_cached(text, "cn", voice_cn=self.voice_cn):
+            return None
+        return server.stream_url(text, "cn", self.voice_cn)
+
+    def play_text(self, text: str, lang: str = "en", delay_ms: int = 0) -> bool:
+        """
+        播放一段文本（未缓存时边合成边播放，不等待整段合成）
+
+        Args:
+            text: 要播放的文本
+            lang: 语言类型 "en" 或 "cn"
+            delay_ms: 延迟播放的毫秒数（使用 JavaScript）
+
+        Returns:
+            是否播放成功
+        """
+        src = self.stream_src(text, lang)
+        if src:
+            return self._play_src_delayed(src, delay_ms) if delay_ms else self._play_src(src)
+        audio_path = self.get_audio_path(text, lang)
+        if delay_ms:
+            return self.play_audio_delayed(audio_path, delay_ms)
+        return self.play_audio(audio_path)
 
     def play_word(self, word: Dict[str, str], mode: str, use_js_delay: bool = True) -> bool:
         """
@@ -119,34 +271,139 @@ class AudioPlayer:
         """
         if mode == self.MODE_EN_TO_CN:
             # 英译中：播放英文
-            audio_path = self.get_audio_path(word['en'], "en")
-            return self.play_audio(audio_path)
+            return self.play_text(word['en'], "en")
 
         elif mode == self.MODE_CN_TO_EN:
             # 中译英：播放中文
-            audio_path = self.get_audio_path(word['cn'], "cn")
-            return self.play_audio(audio_path)
+            return self.play_text(word['cn'], "cn")
 
         elif mode == self.MODE_SPELL:
             # 拼写模式：先播放英文，再播放中文
-            audio_path_en = self.get_audio_path(word['en'], "en")
-            audio_path_cn = self.get_audio_path(word['cn'], "cn")
-
-            # 播放英文
-            self.play_audio(audio_path_en)
+            self.play_text(word['en'], "en")
 
             # 播放中文（延迟）
             if use_js_delay:
                 # 使用 JavaScript 延迟（适用于单次播放，不阻塞）
-                self.play_audio_delayed(audio_path_cn, 1500)
+                self.play_text(word['cn'], "cn", delay_ms=1500)
             else:
                 # 使用 time.sleep（适用于连续播放）
                 time.sleep(1.5)
-                self.play_audio(audio_path_cn)
+                self.play_text(word['cn'], "cn")
             return True
 
         return False
 
+    def _word_clips(self, word: Dict[str, str], mode: str) -> List[tuple]:
+        """单词在给定模式下依次播放的 (文本, 语言)"""
+        if mode == self.MODE_EN_TO_CN:
+            return [(word['en'], "en")]
+        if mode == self.MODE_CN_TO_EN:
+            return [(word['cn'], "cn")]
+        if mode == self.MODE_SPELL:
+            return [(word['en'], "en"), (word['cn'], "cn")]
+        return []
+
+    def build_playlist(
+        self,
+        words: List[Dict[str, str]],
+        order: List[int],
+        mode: str,
+        interval: float = 3.0,
+        start: int = 0,
+        repeat: int = 1
+    ) -> List[Dict]:
+        """
+        生成浏览器端播放列表
+
+        先并发预加载缺失的音频，再把每个片段转换为播放地址。
+
+        Args:
+            words: 单词列表
+            order: 播放顺序（索引列表）
+            mode: 播放模式
+            interval: 单词间隔时间（秒）
+            start: 从播放顺序中的第几个开始
+            repeat: 每词重复次数
+
+        Returns:
+            [{"index": 播放序号, "src": 音频地址, "gap": 播放结束后的等待秒数}, ...]
+        """
+        return [
+            {"index": index, "src": self.audio_src(audio_path), "gap": gap}
+            for index, audio_path, gap in self._sequence(words, order, mode, interval, start, repeat)
+        ]
+
+    def _sequence(self, words: List[Dict[str, str]], order: List[int], mode: str,
+                  interval: float, start: int = 0, repeat: int = 1) -> List[tuple]:
+        """
+        预加载缺失的音频后按播放顺序展开片段
+
+        Returns:
+            [(播放序号, 音频路径, 播放结束后的等待秒数), ...]
+        """
+        selected = [words[idx] for idx in order[start:]]
+        self.audio_cache.preload_words(selected, mode,
+                                       voice_en=self.voice_en, voice_cn=self.voice_cn)
+
+        sequence = []
+        for offset, word in enumerate(selected):
+            paths = []
+            for text, lang in self._word_clips(word, mode):
+                audio_path = self.get_audio_path(text, lang)
+                if audio_path and os.path.exists(audio_path):
+                    paths.append(audio_path)
+
+            clips = paths * max(1, repeat)
+            for n, audio_path in enumerate(clips):
+                gap = interval if n == len(clips) - 1 else self.SPELL_GAP
+                sequence.append((start + offset, audio_path, gap))
+        return sequence
+
+    def export_track(
+        self,
+        words: List[Dict[str, str]],
+        order: List[int],
+        mode: str,
+        output_path: str,
+        interval: float = 3.0,
+        repeat: int = 1
+    ) -> List[Dict]:
+        """
+        导出整段听写音频（单个 MP3，带按单词划分的章节）
+
+        Args:
+            words: 单词列表
+            order: 播放顺序（索引列表）
+            mode: 播放模式
+            output_path: 输出文件路径
+            interval: 单词间隔时间（秒）
+            repeat: 每词重复次数
+
+        Returns:
+            章节列表 [{"title", "start", "end"}, ...]（秒）
+        """
+        # 章节只标序号，不暴露单词内容
+        items = [
+            {"path": audio_path, "gap": gap, "chapter": f"第 {index + 1} 个"}
+            for index, audio_path, gap in self._sequence(words, order, mode, interval, repeat=repeat)
+        ]
+        return build_track(items, output_path, title="听写")
+
+    @staticmethod
+    def render_playlist(playlist: List[Dict], total: int, height: int = 110):
+        """
+        把播放列表一次性下发到浏览器，播放过程中服务端不再参与
+
+        Args:
+            playlist: build_playlist 生成的播放列表
+            total: 单词总数（用于显示进度）
+            height: 组件高度（像素）
+        """
+        html = (_PLAYLIST_HTML
+                .replace("__PLAYLIST__", json.dumps(playlist))
+                .replace("__TOTAL__", str(total)))
+        components.html(html, height=height)
+
     def auto_play_all(
         self,
         words: List[Dict[str, str]],
@@ -157,32 +414,24 @@ class AudioPlayer:
         on_complete: Callable[[], None] = None
     ):
         """
-        自动连续播放所有单词
+        自动连续播放所有单词（浏览器端按间隔播放，不阻塞脚本线程）
 
         Args:
             words: 单词列表
             order: 播放顺序（索引列表）
             mode: 播放模式
             interval: 单词间隔时间（秒）
-            on_progress: 进度回调函数 (current_index, total)
-            on_complete: 完成回调函数
+            on_progress: 进度回调函数 (current_index, total)，播放列表下发前调用一次
+            on_complete: 完成回调函数，播放列表下发后调用
         """
         total = len(words)
 
-        for i, idx in enumerate(order):
-            word = words[idx]
-
-            # 进度回调
-            if on_progress:
-                on_progress(i, total)
-
-            # 播放单词（连续播放模式不使用 JS 延迟）
-            self.play_word(word, mode, use_js_delay=False)
+        if on_progress:
+            on_progress(0, total)
 
-            # 等待间隔
-            time.sleep(interval)
+        playlist = self.build_playlist(words, order, mode, interval=interval)
+        self.render_playlist(playlist, total)
 
-        # 完成回调
         if on_complete:
             on_complete()
 
@@ -219,5 +468,6 @@ def create_audio_player_from_session() -> AudioPlayer:
     return AudioPlayer(
         audio_cache=st.session_state.audio_cache,
         voice_en=st.session_state.voice_en,
-        voice_cn=st.session_state.voice_cn
+        voice_cn=st.session_state.voice_cn,
+        speed=st.session_state.get('playback_speed', 1.0)
     )
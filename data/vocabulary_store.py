@@ -6,20 +6,25 @@
 import json
 import os
 import csv
-from datetime import datetime
 from typing import List, Dict, Optional
 
+from src.storage import VocabularyBackend, create_vocabulary_backend
+
 
 class VocabularyStore:
     """词库存储管理类"""
 
-    def __init__(self, base_dir: str = None):
+    def __init__(self, base_dir: str = None, backend: Optional[VocabularyBackend] = None):
         """
         初始化词库存储
 
         Args:
             base_dir: 词库存储目录，默认为当前目录下的 data/vocabularies
+                （指定目录时总是使用 JSON 文件，否则按 DICTATION_STORAGE 选择后端）
+            backend: 存储后端，默认见 src.storage
         """
+        self.backend = backend or create_vocabulary_backend(base_dir)
+
         if base_dir is None:
             # 获取当前文件所在目录的父目录
             current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -27,21 +32,9 @@ class VocabularyStore:
 
         self.base_dir = base_dir
 
-        # 确保目录存在
-        if not os.path.exists(self.base_dir):
-            os.makedirs(self.base_dir)
-
-    def _get_file_path(self, name: str) -> str:
-        """获取词库文件路径"""
-        # 安全文件名处理
-        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).strip()
-        if not safe_name:
-            safe_name = "vocabulary"
-        return os.path.join(self.base_dir, f"{safe_name}.json")
-
     def save_vocabulary(self, name: str, words: List[Dict], update_time: bool = True) -> bool:
         """
-        保存词库到JSON文件
+        保存词库
 
         Args:
             name: 词库名称
@@ -51,33 +44,7 @@ class VocabularyStore:
         Returns:
             bool: 保存是否成功
         """
-        try:
-            file_path = self._get_file_path(name)
-
-            # 如果文件已存在，保留创建时间
-            created_at = datetime.now().isoformat()
-            if os.path.exists(file_path):
-                existing_data = self.load_vocabulary(name)
-                if existing_data and 'created_at' in existing_data:
-                    created_at = existing_data['created_at']
-
-            # 构建词库数据
-            vocabulary_data = {
-                "name": name,
-                "words": words,
-                "created_at": created_at,
-                "updated_at": datetime.now().isoformat() if update_time else created_at
-            }
-
-            # 保存到文件
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(vocabulary_data, f, ensure_ascii=False, indent=2)
-
-            return True
-
-        except Exception as e:
-            print(f"保存词库失败: {e}")
-            return False
+        return self.backend.save(name, words, update_time)
 
     def load_vocabulary(self, name: str) -> Optional[Dict]:
         """
@@ -90,20 +57,7 @@ class VocabularyStore:
             Dict: 词库数据 {"name": "...", "words": [...], "created_at": "...", "updated_at": "..."}
             None: 加载失败
         """
-        try:
-            file_path = self._get_file_path(name)
-
-            if not os.path.exists(file_path):
-                return None
-
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            return data
-
-        except Exception as e:
-            print(f"加载词库失败: {e}")
-            return None
+        return self.backend.load(name)
 
     def list_vocabularies(self) -> List[Dict]:
         """
@@ -113,27 +67,7 @@ class VocabularyStore:
             List[Dict]: 词库列表 [{"name": "...", "word_count": 10, "updated_at": "..."}, ...]
         """
         try:
-            vocabularies = []
-
-            if not os.path.exists(self.base_dir):
-                return vocabularies
-
-            for filename in os.listdir(self.base_dir):
-                if filename.endswith('.json'):
-                    file_path = os.path.join(self.base_dir, filename)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-
-                        vocabularies.append({
-                            "name": data.get("name", filename.replace('.json', '')),
-                            "word_count": len(data.get("words", [])),
-                            "created_at": data.get("created_at", ""),
-                            "updated_at": data.get("updated_at", "")
-                        })
-                    except Exception as e:
-                        print(f"读取词库 {filename} 失败: {e}")
-                        continue
+            vocabularies = self.backend.list()
 
             # 按更新时间倒序排序
             vocabularies.sort(key=lambda x: x['updated_at'], reverse=True)
@@ -154,18 +88,7 @@ class VocabularyStore:
         Returns:
             bool: 删除是否成功
         """
-        try:
-            file_path = self._get_file_path(name)
-
-            if not os.path.exists(file_path):
-                return False
-
-            os.remove(file_path)
-            return True
-
-        except Exception as e:
-            print(f"删除词库失败: {e}")
-            return False
+        return self.backend.delete(name)
 
     def vocabulary_exists(self, name: str) -> bool:
         """
@@ -177,8 +100,7 @@ class VocabularyStore:
         Returns:
             bool: 词库是否存在
         """
-        file_path = self._get_file_path(name)
-        return os.path.exists(file_path)
+        return self.backend.exists(name)
 
     def rename_vocabulary(self, old_name: str, new_name: str) -> bool:
         """
@@ -175,13 +175,8 @@ def _save_grading_history(result: dict, mode: str):
         wrong_words=wrong_words
     )
 
-    # 添加错题到错题本
-    for wrong_word in wrong_words:
-        st.session_state.wrong_answer_manager.add_wrong_answer(
-            en=wrong_word['en'],
-            cn=wrong_word['cn'],
-            user_answer=wrong_word['user_answer']
-        )
+    # 添加错题到错题本（批量写入一次）
+    st.session_state.wrong_answer_manager.add_wrong_answers(wrong_words)
 
 
 def render_grading_result():
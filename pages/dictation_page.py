@@ -7,11 +7,15 @@
 - 报英文写英文（拼写）
 - 报英文写中文
 """
+import os
+import tempfile
+
 import streamlit as st
-import time
 
 from components.audio_player import create_audio_player_from_session
+from src.audio_profile import SPEED_OPTIONS
 from src.minimax_tts import MiniMaxTTSEngine
+from src.preload_scheduler import sync_session_preload
 
 
 def render_dictation_page():
@@ -105,6 +109,13 @@ def render_dictation_page():
                 index=0,
                 key="repeat_count"
             )
+        st.session_state.playback_speed = st.select_slider(
+            "语速",
+            options=list(SPEED_OPTIONS),
+            value=st.session_state.playback_speed,
+            format_func=lambda speed: f"{speed:g}×",
+            help="切换语速无需重新合成，由已缓存的音频直接变速"
+        )
 
         # 音色设置（折叠）
         with st.expander("🎤 音色设置"):
@@ -122,6 +133,12 @@ def render_dictation_page():
                     index=list(MiniMaxTTSEngine.CHINESE_VOICES.keys()).index(st.session_state.voice_cn)
                 )
 
+    # 按播放位置优先预加载（切换音色、前进/后退后自动重新排序）
+    preload_job = sync_session_preload(st.session_state)
+    if not preload_job.done():
+        status = preload_job.progress()
+        st.caption(f"🔄 后台准备音频中：{status['completed']} / {status['total']}")
+
     # 连续播放按钮
     col1, col2 = st.columns(2)
     with col1:
@@ -133,6 +150,22 @@ def render_dictation_page():
             st.session_state.page = 'answer'
             st.rerun()
 
+    # 课堂播放：导出整段音频
+    with st.expander("📥 导出整段音频"):
+        st.caption("按当前播放顺序、间隔和重复次数生成一个 MP3，可在课堂上连续播放")
+        if st.button("生成音频文件", use_container_width=True):
+            _export_track()
+        track = st.session_state.get("exported_track")
+        if track:
+            st.download_button(
+                "⬇️ 下载 MP3",
+                data=track["data"],
+                file_name="dictation.mp3",
+                mime="audio/mpeg",
+                use_container_width=True,
+            )
+            st.caption(f"共 {track['chapters']} 个单词，时长 {track['duration']:.0f} 秒")
+
 
 def _play_current():
     """播放当前单词"""
@@ -145,34 +178,50 @@ def _play_current():
 
 
 def _auto_play_from_current():
-    """从当前位置连续播放"""
+    """从当前位置连续播放（播放列表一次性下发，由浏览器预取并按间隔播放）"""
     player = create_audio_player_from_session()
     words = st.session_state.selected_words
-    order = st.session_state.dictation_order
-    mode = st.session_state.dictation_mode
-    interval = st.session_state.playback_interval
-    start_idx = st.session_state.current_index
-
-    total = len(words)
-    progress_bar = st.progress(0)
-    status_text = st.empty()
 
-    for i in range(start_idx, total):
-        st.session_state.current_index = i
-        idx = order[i]
-        word = words[idx]
-
-        # 更新进度
-        progress = (i - start_idx + 1) / (total - start_idx)
-        progress_bar.progress(progress)
-        status_text.markdown(f"**正在播放: {i + 1} / {total}**")
+    with st.spinner("正在准备音频..."):
+        playlist = player.build_playlist(
+            words,
+            st.session_state.dictation_order,
+            st.session_state.dictation_mode,
+            interval=st.session_state.playback_interval,
+            start=st.session_state.current_index,
+            repeat=st.session_state.get("repeat_count", 1),
+        )
+
+    if not playlist:
+        st.error("没有可播放的音频")
+        return
+    player.render_playlist(playlist, total=len(words))
 
-        # 播放
-        player.play_word(word, mode, use_js_delay=False)
 
-        # 等待间隔
-        if i < total - 1:
-            time.sleep(interval)
+def _export_track():
+    """生成整段听写音频，保存到会话中供下载"""
+    player = create_audio_player_from_session()
 
-    status_text.markdown("**✅ 播放完成！**")
-    progress_bar.progress(1.0)
+    with st.spinner("正在生成音频..."):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_path = os.path.join(tmpdir, "dictation.mp3")
+            try:
+                chapters = player.export_track(
+                    st.session_state.selected_words,
+                    st.session_state.dictation_order,
+                    st.session_state.dictation_mode,
+                    output_path,
+                    interval=st.session_state.playback_interval,
+                    repeat=st.session_state.get("repeat_count", 1),
+                )
+            except ValueError as e:
+                st.error(f"生成失败: {e}")
+                return
+            with open(output_path, "rb") as f:
+                data = f.read()
+
+    st.session_state.exported_track = {
+        "data": data,
+        "chapters": len(chapters),
+        "duration": chapters[-1]["end"] if chapters else 0,
+    }
@@ -5,6 +5,9 @@
 import streamlit as st
 import pandas as pd
 
+# 历史记录列表每页条数
+HISTORY_PAGE_SIZE = 20
+
 
 def render_history_page():
     """学习历史页"""
@@ -81,6 +84,15 @@ def render_history_page():
         })
 
         st.line_chart(df.set_index("序号"))
+        st.caption(f"最近 {len(scores)} 次平均分: {stats['recent_average']:.1f}%")
+
+        # 分数分布
+        distribution = stats['score_distribution']
+        df = pd.DataFrame({
+            "分数段": list(distribution.keys()),
+            "次数": list(distribution.values())
+        })
+        st.bar_chart(df.set_index("分数段"))
 
     # 历史记录列表
     st.divider()
@@ -112,8 +124,10 @@ def render_history_page():
                         mime="text/csv"
                     )
 
-    # 获取所有记录
-    records = history_manager.get_all_records()
+    # 分页获取记录（只读取需要显示的条数）
+    if 'history_limit' not in st.session_state:
+        st.session_state.history_limit = HISTORY_PAGE_SIZE
+    records = history_manager.get_all_records(limit=st.session_state.history_limit)
 
     if not records:
         st.info("暂无历史记录")
@@ -176,6 +190,12 @@ def render_history_page():
                 if len(wrong_words) > 10:
                     st.markdown(f"...还有 {len(wrong_words) - 10} 个错题")
 
+    if stats['total_sessions'] > len(records):
+        st.caption(f"已显示 {len(records)} / {stats['total_sessions']} 条记录")
+        if st.button("显示更多"):
+            st.session_state.history_limit += HISTORY_PAGE_SIZE
+            st.rerun()
+
     # 高频错词
     st.divider()
     st.subheader("🔥 高频错词")
@@ -6,12 +6,12 @@ import streamlit as st
 import json
 import random
 import time
-import threading
 import io
 from PIL import Image
 
 from src.ai_corrector import correct_spelling
 from data.vocabulary_store import VocabularyStore
+from src.preload_scheduler import sync_session_preload
 
 # OCR 延迟导入（云端可能不可用）
 def get_ocr_engine():
@@ -51,17 +51,15 @@ def get_ocr_api_words(image_file):
 
 
 def preload_all_audio():
-    """预加���所有选中单词的音频"""
-    if not st.session_state.selected_words:
-        return
-
-    cache = st.session_state.audio_cache
-    voice_en = st.session_state.voice_en
-    voice_cn = st.session_state.voice_cn
+    """
+    在后台按播放顺序预加载选中单词的音频（立即返回，听写可以马上开始）
 
-    for word in st.session_state.selected_words:
-        cache.get_audio(word['en'], mode="en", voice_en=voice_en)
-        cache.get_audio(word['cn'], mode="cn", voice_cn=voice_cn)
+    Returns:
+        预加载任务句柄，没有选中单词时返回 None
+    """
+    if not st.session_state.selected_words:
+        return None
+    return sync_session_preload(st.session_state)
 
 
 def render_vocabulary_page():
@@ -370,7 +368,7 @@ def _render_selection_section():
             st.session_state.user_answers = {}
             st.session_state.dictation_start_time = time.time()
             st.session_state.page = 'dictation'
-            threading.Thread(target=preload_all_audio, daemon=True).start()
+            preload_all_audio()
             st.rerun()
     else:
         st.warning("请至少选择1个单词")
@@ -1,128 +1,765 @@
 """
 音频缓存模块 - 预加载TTS音频
+
+音频持久化保存在 AudioStore 中（按内容寻址），重启或切换词库后仍可直接命中。
 """
+import asyncio
 import os
-import tempfile
-from typing import Dict, List, Optional
+import shutil
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 import threading
 import streamlit as st
 
 # 导入TTS引擎
-from src.tts_engine import tts_engine, speak_word
-from src.minimax_tts import MiniMaxTTSEngine
+from src.tts_engine import TTSEngine, get_tts_loop, tts_engine, speak_word
+from src.minimax_tts import BatchSplitError, MiniMaxTTSEngine
+from src.audio_store import AudioStore
+from src.audio_server import set_metrics_source, set_stream_source
+from src.audio_profile import (get_audio_profile, time_stretch_mp3, transcode_available,
+                               transcode_mp3)
+from src.preload_scheduler import PreloadJob
+from src.text_normalizer import normalize_text
+from src.audio_metrics import AudioMetrics
+from src.circuit_breaker import CircuitBreaker
+from src.tts_registry import EDGE_INFO, LOCAL_INFO, MINIMAX_INFO, TTSRegistry
 
 
 class AudioCache:
     """音频缓存管理器"""
+
+    # 批量引擎（如本地 TTS）每次调用合成的单词数
+    LOCAL_BATCH_SIZE = 64
+    # 各引擎单个单词的延迟预算（秒）：超出按失败计入熔断器，同时作为 MiniMax 读超时与 Edge 超时
+    LATENCY_BUDGETS = {MINIMAX_INFO.name: 15.0, EDGE_INFO.name: 10.0, LOCAL_INFO.name: 20.0}
+    # MiniMax 建立连接的超时（秒），服务不可达时尽快失败
+    CONNECT_TIMEOUT = 3.05
+    # 本地派生的变速音频在存储键中记录的“引擎”名称
+    STRETCH_ENGINE = "atempo"
+    # 回退引擎的音频记在请求键下的有效期（秒），到期后重新尝试首选引擎
+    FALLBACK_TTL = 600.0
     
-    def __init__(self):
-        self.cache_dir = tempfile.mkdtemp(prefix="dictation_audio_")
-        self.cache: Dict[str, str] = {}  # word -> audio_path
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None,
+                 max_workers: Optional[int] = None, batch_size: Optional[int] = None,
+                 audio_profile: Optional[str] = None):
+        """
+        初始化音频缓存
+
+        Args:
+            cache_dir: 持久化存储目录，默认见 AudioStore
+            max_bytes: 存储容量上限（字节）
+            max_workers: 预加载并发数，默认读取环境变量 DICTATION_PRELOAD_WORKERS（4）
+            batch_size: MiniMax 预加载时每个请求合成的单词数，默认读取环境变量
+                DICTATION_TTS_BATCH_SIZE（1，即逐个合成）
+            audio_profile: 音频规格名称，默认读取环境变量 DICTATION_AUDIO_PROFILE（compact）
+        """
+        self.store = AudioStore(cache_dir, max_bytes=max_bytes)
+        self.cache_dir = self.store.root_dir
+        self.cache: Dict[str, str] = {}  # store_key -> audio_path（多个音色并存）
+        self._variants: Dict[str, set] = {}  # f"{word}_{mode}" -> 已缓存的 store_key
+        self._fallback_until: Dict[str, float] = {}  # 请求键 -> 回退音频的到期时间
         self.loading_status: Dict[str, str] = {}  # word -> status
         self._lock = threading.Lock()
-        self._tts_lock = threading.Lock()
-        self.preload_total = 0
-        self.preload_completed = 0
-        self.preload_errors = 0
-        self.preload_active = False
-        self.preload_finished = False
+        if max_workers is None:
+            max_workers = int(os.getenv("DICTATION_PRELOAD_WORKERS", "4"))
+        self.max_workers = max(1, max_workers)
+        if batch_size is None:
+            batch_size = int(os.getenv("DICTATION_TTS_BATCH_SIZE", "1"))
+        self.batch_size = max(1, batch_size)
+        self.profile = get_audio_profile(audio_profile)
+        # 是否可以转码在创建时确定：结果参与存储键，运行中不能变化
+        self.can_transcode = transcode_available()
+        self._stretch_warned = False  # 没有 ffmpeg 的提示只打印一次
+        self._inflight: Dict[str, Future] = {}  # store_key -> 进行中的合成
+        # 本轮预加载任务（上次全部结束后开始的任务），进度只保存在各自的 PreloadJob 上
+        self._jobs: List[PreloadJob] = []
         self._minimax_engine: Optional[MiniMaxTTSEngine] = None
-    
+        self.registry = TTSRegistry()
+        self._register_builtin_engines()
+        self.metrics = AudioMetrics()
+        self.store.on_evict = self._on_evict
+
+    def _register_builtin_engines(self):
+        """
+        登记内置引擎：MiniMax → Edge TTS → 本地 pyttsx3（离线、可批量），各带熔断器
+
+        pyttsx3 输出 WAV，需经 ffmpeg 转为 MP3 后才能入库（存储与音频服务都按 MP3 处理），
+        没有 ffmpeg 时本地引擎不参与路由。
+        """
+        self.registry.register(MINIMAX_INFO, self._render_minimax,
+                               breaker=self._make_breaker(MINIMAX_INFO.name))
+        self.registry.register(EDGE_INFO, self._render_edge,
+                               breaker=self._make_breaker(EDGE_INFO.name))
+        self.registry.register(LOCAL_INFO, self._render_local,
+                               render_batch=self._render_local_batch,
+                               available=lambda: tts_engine.local_tts is not None and self.can_transcode,
+                               breaker=self._make_breaker(LOCAL_INFO.name))
+
+    def _make_breaker(self, engine: str) -> CircuitBreaker:
+        return CircuitBreaker(latency_budget=self.LATENCY_BUDGETS.get(engine))
+
     def _get_minimax_engine(self) -> Optional[MiniMaxTTSEngine]:
         """获取或创建 MiniMax 引擎"""
         if self._minimax_engine is None:
             # MiniMaxTTSEngine 内部已有默认 API Key
-            self._minimax_engine = MiniMaxTTSEngine()
+            engine = MiniMaxTTSEngine()
+            # 连接超时短、读超时按延迟预算（批量请求按单词数放宽），服务故障时不再每个单词等 60 秒
+            engine.timeout = (self.CONNECT_TIMEOUT,
+                              self.LATENCY_BUDGETS[MINIMAX_INFO.name] * self.batch_size)
+            self._minimax_engine = engine
         return self._minimax_engine
+
+    def _audio_spec(self, mode: str, accent: str = "us", use_minimax: bool = True,
+                    voice_en: str = "expressive_narrator",
+                    voice_cn: str = "xiaoxiao") -> Dict:
+        """首选引擎（MiniMax 或 Edge TTS）的合成参数，见 _engine_spec"""
+        engine = MINIMAX_INFO.name if use_minimax else EDGE_INFO.name
+        return self._engine_spec(engine, mode, accent, voice_en, voice_cn)
+
+    def _engine_spec(self, engine: str, mode: str, accent: str = "us",
+                     voice_en: str = "expressive_narrator",
+                     voice_cn: str = "xiaoxiao") -> Dict:
+        """
+        解析一次合成实际使用的引擎参数（同时也是存储键的组成部分）
+
+        Returns:
+            {"engine", "voice", "model", "speed", "sample_rate", "bitrate"}
+        """
+        if engine == MINIMAX_INFO.name:
+            minimax = self._get_minimax_engine()
+            if mode == "en":
+                voice = MiniMaxTTSEngine.resolve_voice(voice_en, is_english=True)
+            else:
+                voice = MiniMaxTTSEngine.resolve_voice(voice_cn, is_english=False)
+            return {
+                "engine": engine,
+                "voice": voice,
+                "model": minimax.model,
+                "speed": 1.0,
+                "sample_rate": self.profile.sample_rate,
+                "bitrate": self.profile.bitrate,
+            }
+
+        if engine == EDGE_INFO.name:
+            if mode == "en":
+                voice_type = "us_female" if accent == "us" else "uk_female"
+            else:
+                voice_type = "chinese"
+            voice = TTSEngine.VOICES[voice_type]
+            sample_rate, bitrate = TTSEngine.OUTPUT_SAMPLE_RATE, TTSEngine.OUTPUT_BITRATE
+        else:
+            # 本地或自定义引擎：输出规格未知
+            voice = mode if engine == LOCAL_INFO.name else ""
+            sample_rate, bitrate = 0, 0
+
+        if self.can_transcode and (bitrate == 0 or self.profile.bitrate < bitrate):
+            # 引擎输出规格固定，入库前转码
+            sample_rate, bitrate = self.profile.sample_rate, self.profile.bitrate
+        return {
+            "engine": engine,
+            "voice": voice,
+            "model": "",
+            "speed": 1.0,
+            "sample_rate": sample_rate,
+            "bitrate": bitrate,
+        }
+
+    def _lookup_labels(self, mode: str, accent: str, use_minimax: bool,
+                       voice_en: str, voice_cn: str) -> Dict[str, str]:
+        """命中率统计使用的标签：请求的引擎与音色"""
+        spec = self._audio_spec(mode, accent, use_minimax, voice_en, voice_cn)
+        return {"engine": spec["engine"], "voice": spec["voice"]}
+
+    def _store_key(self, word: str, mode: str, spec: Dict) -> str:
+        """根据文本（规范化后）与合成参数生成存储键"""
+        return AudioStore.make_key(normalize_text(word, mode), mode, **spec)
+
+    def _request_key(self, word: str, mode: str, accent: str = "us",
+                     use_minimax: bool = True,
+                     voice_en: str = "expressive_narrator",
+                     voice_cn: str = "xiaoxiao") -> str:
+        """一次音频请求（单词 + 音色/口音/引擎）对应的存储键"""
+        spec = self._audio_spec(mode, accent, use_minimax, voice_en, voice_cn)
+        return self._store_key(word, mode, spec)
+
+    def _remember(self, word: str, mode: str, key: str, path: str):
+        """
+        登记到内存索引
+
+        path 是回退引擎的音频（不是 key 本身的音频）时只在 FALLBACK_TTL 内有效，
+        到期后重新尝试首选引擎，见 _fallback_expired。
+        """
+        with self._lock:
+            self.cache[key] = path
+            self._variants.setdefault(f"{normalize_text(word, mode)}_{mode}", set()).add(key)
+            if AudioStore.key_of(path) == key:
+                self._fallback_until.pop(key, None)
+            else:
+                self._fallback_until[key] = time.monotonic() + self.FALLBACK_TTL
+
+    def _fallback_expired(self, key: str) -> bool:
+        """请求键下记录的回退音频是否已到期（到期后不再直接命中）"""
+        with self._lock:
+            deadline = self._fallback_until.get(key)
+        return deadline is not None and time.monotonic() >= deadline
+
+    def _lookup_store(self, word: str, mode: str, accent: str = "us",
+                      use_minimax: bool = True,
+                      voice_en: str = "expressive_narrator",
+                      voice_cn: str = "xiaoxiao") -> Optional[str]:
+        """在持久化存储中查找音频（首选引擎未命中时也接受此前回退引擎生成的音频）"""
+        for engine in self._engine_chain(mode, use_minimax):
+            spec = self._engine_spec(engine, mode, accent, voice_en, voice_cn)
+            path = self.store.get(self._store_key(word, mode, spec), text=word)
+            if path:
+                return path
+        return None
+
+    def _engine_chain(self, mode: str, use_minimax: bool = True) -> List[str]:
+        """
+        按路由顺序返回应尝试的引擎
+
+        不使用 MiniMax 时首选 Edge TTS，且不会回退到 MiniMax（付费引擎）。
+        """
+        preferred = MINIMAX_INFO.name if use_minimax else EDGE_INFO.name
+        chain = self.registry.route(mode, preferred=preferred)
+        if not use_minimax:
+            chain = [engine for engine in chain if engine != MINIMAX_INFO.name]
+        return chain
+
+    def _synthesize_routed(self, word: str, mode: str, accent: str = "us",
+                           use_minimax: bool = True,
+                           voice_en: str = "expressive_narrator",
+                           voice_cn: str = "xiaoxiao",
+                           exclude: Tuple[str, ...] = ()) -> str:
+        """
+        按路由顺序尝试各引擎合成，记录每个引擎的成功与失败
+
+        熔断中的引擎直接跳过，不等待其超时。
+
+        Args:
+            exclude: 本次不再尝试的引擎（例如刚在批量调用中失败的引擎）
+
+        Returns:
+            音频路径
+
+        Raises:
+            RuntimeError: 所有引擎都失败
+        """
+        errors = []
+        preferred = self._preferred_engine(use_minimax)
+        for engine in self._engine_chain(mode, use_minimax):
+            if engine in exclude:
+                continue
+            if not self.registry.acquire(engine):
+                errors.append(f"{engine}: 熔断中")
+                continue
+            spec = self._engine_spec(engine, mode, accent, voice_en, voice_cn)
+            start = time.monotonic()
+            try:
+                path = self._synthesize(word, mode, spec)
+            except Exception as e:
+                self.registry.report_failure(engine)
+                self.metrics.failures.inc(engine=engine)
+                print(f"{engine} 合成失败 {word}: {e}")
+                errors.append(f"{engine}: {e}")
+                continue
+            latency = time.monotonic() - start
+            self.registry.report_success(engine, latency)
+            self._record_synthesis(engine, path, latency, preferred)
+            self._remember(word, mode, self._store_key(word, mode, spec), path)
+            return path
+        raise RuntimeError(f"所有 TTS 引擎均失败: {'; '.join(errors) or '没有可用的引擎'}")
+
+    @staticmethod
+    def _preferred_engine(use_minimax: bool) -> str:
+        return MINIMAX_INFO.name if use_minimax else EDGE_INFO.name
+
+    def _record_synthesis(self, engine: str, path: str, latency: Optional[float] = None,
+                          preferred: Optional[str] = None):
+        """记录一次成功的合成：数量、字节数、耗时，以及是否为回退"""
+        self.metrics.synthesized.inc(engine=engine)
+        try:
+            self.metrics.bytes_generated.inc(os.path.getsize(path), engine=engine)
+        except OSError:
+            pass
+        if latency is not None:
+            self.metrics.synth_latency.observe(latency, engine=engine)
+        if preferred is not None and engine != preferred:
+            self.metrics.fallbacks.inc(**{"from": preferred, "to": engine})
+
+    def _on_evict(self, key: str, size: int):
+        self.metrics.evictions.inc()
+        self.metrics.evicted_bytes.inc(size)
+
+    def _render(self, word: str, mode: str, spec: Dict, tmp_path: str) -> str:
+        """
+        调用 spec["engine"] 对应的引擎把音频写入临时文件
+
+        音色/语速/模型按次传入引擎，不修改共享引擎的状态，因此无需加锁，可并行合成。
+        """
+        return self.registry.renderer(spec["engine"])(word, spec, tmp_path)
+
+    def _render_minimax(self, word: str, spec: Dict, tmp_path: str) -> str:
+        return self._get_minimax_engine().speak(
+            word, save_path=tmp_path,
+            voice=spec["voice"], speed=spec["speed"], model=spec["model"],
+            sample_rate=spec["sample_rate"], bitrate=spec["bitrate"]
+        )
+
+    def _render_edge(self, word: str, spec: Dict, tmp_path: str) -> str:
+        # 只使用 Edge TTS：失败时由路由决定下一个引擎，而不是在这里回退到本地 TTS
+        path = get_tts_loop().run(asyncio.wait_for(
+            tts_engine.aspeak(word, tmp_path, voice=spec["voice"],
+                              rate=TTSEngine.speed_to_rate(spec["speed"])),
+            self.LATENCY_BUDGETS[EDGE_INFO.name]
+        ))
+        return self._apply_profile(path, spec)
+
+    def _render_local(self, word: str, spec: Dict, tmp_path: str) -> str:
+        result = self._render_local_batch([(word, spec, tmp_path)])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _render_local_batch(self, items: List[tuple]) -> List[Union[str, Exception]]:
+        """本地 TTS 一次合成多个单词"""
+        results = tts_engine.speak_local_batch([(word, tmp_path) for word, _, tmp_path in items])
+        for i, (result, (_, spec, _)) in enumerate(zip(results, items)):
+            if not isinstance(result, Exception):
+                try:
+                    self._apply_profile(result, spec)
+                except Exception as e:
+                    results[i] = e
+        return results
+
+    @staticmethod
+    def _apply_profile(path: str, spec: Dict) -> str:
+        """引擎输出与存储键记录的规格不一致时转码"""
+        native = TTSEngine.OUTPUT_BITRATE if spec["engine"] == EDGE_INFO.name else 0
+        if spec["engine"] != MINIMAX_INFO.name and spec["bitrate"] != native:
+            transcode_mp3(path, spec["sample_rate"], spec["bitrate"])
+        return path
+
+    def _synthesize(self, word: str, mode: str, spec: Dict) -> str:
+        """按给定参数合成音频并原子写入存储"""
+        return self._produce(self._store_key(word, mode, spec), word,
+                             lambda tmp_path: self._render(word, mode, spec, tmp_path))
+
+    def _produce(self, key: str, word: str, writer: Callable[[str], Optional[str]]) -> str:
+        """
+        存储中没有 key 时调用 writer 生成音频并原子写入
+
+        同一存储键的并发请求只会触发一次生成，其余调用方等待同一结果。
+        """
+        with self._lock:
+            flight = self._inflight.get(key)
+            is_owner = flight is None
+            if is_owner:
+                flight = Future()
+                self._inflight[key] = flight
+
+        if not is_owner:
+            try:
+                return flight.result()
+            except CancelledError:
+                # 发起方的预加载被取消，由本次调用重新合成
+                return self._produce(key, word, writer)
+
+        try:
+            # 等锁期间可能已由其他会话写入
+            path = self.store.get(key, text=word)
+            if path is None:
+                path = self.store.put_with(key, writer, text=word)
+            flight.set_result(path)
+            return path
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
         
-    def get_cache_path(self, word: str, mode: str = "en") -> str:
+    def _synthesize_batch(self, words: List[str], mode: str,
+                          spec: Dict) -> List[Union[str, Exception]]:
+        """
+        用 MiniMax 批量接口一次合成多个单词，每个单词各自写入存储
+
+        与 _synthesize 一样参与单飞；批量结果无法切分时回退为逐个合成，
+        MiniMax 熔断或请求失败时整批返回异常，由调用方换用其他引擎。
+
+        Returns:
+            与 words 对应的音频路径，失败的位置为异常对象
+        """
+        results: List[Union[str, Exception, None]] = [None] * len(words)
+        owned = []    # (index, key, flight)
+        waiting = []  # (index, flight)
+
+        for i, word in enumerate(words):
+            key = self._store_key(word, mode, spec)
+            path = self.store.get(key, text=word)
+            if path:
+                results[i] = path
+                continue
+
+            with self._lock:
+                flight = self._inflight.get(key)
+                is_owner = flight is None
+                if is_owner:
+                    flight = Future()
+                    self._inflight[key] = flight
+
+            if is_owner:
+                owned.append((i, key, flight))
+            else:
+                waiting.append((i, flight))
+
+        try:
+            clips = None
+            batch_latency = None
+            batch_error = None
+            if owned and not self.registry.acquire(MINIMAX_INFO.name):
+                batch_error = RuntimeError("MiniMax 熔断中")
+            elif owned:
+                start = time.monotonic()
+                try:
+                    clips = self._get_minimax_engine().speak_batch(
+                        [words[i] for i, _, _ in owned],
+                        voice=spec["voice"], speed=spec["speed"], model=spec["model"],
+                        sample_rate=spec["sample_rate"], bitrate=spec["bitrate"]
+                    )
+                except BatchSplitError as e:
+                    # 服务正常，只是结果无法切分：改为逐个合成
+                    self.registry.report_success(MINIMAX_INFO.name)
+                    print(f"批量结果无法切分，改为逐个合成: {e}")
+                except Exception as e:
+                    # 服务故障：不再逐个重试同一引擎，由调用方换用其他引擎
+                    self.registry.report_failure(MINIMAX_INFO.name)
+                    batch_error = e
+                    print(f"批量合成失败: {e}")
+                else:
+                    batch_latency = (time.monotonic() - start) / len(owned)
+                    self.registry.report_success(MINIMAX_INFO.name, batch_latency)
+
+            for n, (i, key, flight) in enumerate(owned):
+                word = words[i]
+                try:
+                    if batch_error is not None:
+                        raise batch_error
+                    if clips is not None:
+                        path = self.store.put_bytes(key, clips[n], text=word)
+                        latency = batch_latency
+                    else:
+                        start = time.monotonic()
+                        path = self.store.put_with(
+                            key, lambda tmp_path: self._render(word, mode, spec, tmp_path),
+                            text=word
+                        )
+                        latency = time.monotonic() - start
+                    self._record_synthesis(MINIMAX_INFO.name, path, latency)
+                    flight.set_result(path)
+                    results[i] = path
+                except Exception as e:
+                    self.metrics.failures.inc(engine=MINIMAX_INFO.name)
+                    flight.set_exception(e)
+                    results[i] = e
+                finally:
+                    with self._lock:
+                        self._inflight.pop(key, None)
+        finally:
+            # 异常中止时，确保等待方不会永久阻塞
+            for i, key, flight in owned:
+                if not flight.done():
+                    flight.set_exception(RuntimeError(f"合成中断: {words[i]}"))
+                    with self._lock:
+                        self._inflight.pop(key, None)
+
+        for i, flight in waiting:
+            try:
+                results[i] = flight.result()
+            except Exception as e:
+                results[i] = e
+        return results
+
+    def synthesize_many(self, words: List[str], mode: str = "en", accent: str = "us",
+                        use_minimax: bool = True,
+                        voice_en: str = "expressive_narrator",
+                        voice_cn: str = "xiaoxiao") -> List[Union[str, Exception]]:
+        """
+        获取一批同语言单词的音频（已缓存的直接返回），结果登记到内存索引
+
+        使用 MiniMax 且多于一个单词时一次批量请求（见 _synthesize_batch），否则逐个 get_audio。
+
+        Returns:
+            与 words 对应的音频路径，失败的位置为异常对象
+        """
+        if use_minimax and len(words) > 1:
+            spec = self._audio_spec(mode, accent, use_minimax, voice_en, voice_cn)
+            try:
+                results = self._synthesize_batch(words, mode, spec)
+            except Exception as e:
+                return [e] * len(words)
+            for word, path in zip(words, results):
+                if not isinstance(path, Exception):
+                    self._remember(word, mode, self._store_key(word, mode, spec), path)
+            return results
+
+        results = []
+        for word in words:
+            try:
+                path = self.get_audio(word, mode, accent, use_minimax, voice_en, voice_cn)
+                results.append(path or RuntimeError(f"合成失败: {word}"))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def get_cache_path(self, word: str, mode: str = "en", accent: str = "us",
+                       use_minimax: bool = True,
+                       voice_en: str = "expressive_narrator",
+                       voice_cn: str = "xiaoxiao") -> str:
         """获取缓存文件路径"""
-        safe_word = "".join(c for c in word if c.isalnum() or c in ' _-').strip()
-        return os.path.join(self.cache_dir, f"{safe_word}_{mode}.mp3")
+        spec = self._audio_spec(mode, accent, use_minimax, voice_en, voice_cn)
+        return self.store.path_for(self._store_key(word, mode, spec), text=word)
     
-    def is_cached(self, word: str, mode: str = "en") -> bool:
-        """检查是否已缓存"""
-        cache_key = f"{word}_{mode}"
-        return cache_key in self.cache and os.path.exists(self.cache[cache_key])
+    def is_cached(self, word: str, mode: str = "en", accent: Optional[str] = None,
+                  use_minimax: Optional[bool] = None,
+                  voice_en: Optional[str] = None,
+                  voice_cn: Optional[str] = None) -> bool:
+        """
+        检查是否已缓存
+
+        未指定任何音色参数时，只要该单词有任意音色的音频即视为已缓存；
+        指定后检查对应音色：先查内存索引，再按路由顺序查持久化存储
+        （与 get_audio 一致，回退引擎此前生成的音频也算已缓存）。
+        """
+        if accent is None and use_minimax is None and voice_en is None and voice_cn is None:
+            variant = f"{normalize_text(word, mode)}_{mode}"
+            with self._lock:
+                paths = [self.cache[k] for k in self._variants.get(variant, ())]
+            return any(os.path.exists(path) for path in paths)
+
+        voice = (
+            accent or "us",
+            True if use_minimax is None else use_minimax,
+            voice_en or "expressive_narrator",
+            voice_cn or "xiaoxiao",
+        )
+        path = self.cache.get(self._request_key(word, mode, *voice))
+        if path is not None and os.path.exists(path):
+            return True
+        return self._lookup_store(word, mode, *voice) is not None
     
     def get_audio(self, word: str, mode: str = "en", accent: str = "us",
                   use_minimax: bool = True,
                   voice_en: str = "expressive_narrator",
-                  voice_cn: str = "xiaoxiao") -> Optional[str]:
-        """获取音频路径"""
-        cache_key = f"{word}_{mode}"
-        
-        if self.is_cached(word, mode):
-            return self.cache[cache_key]
+                  voice_cn: str = "xiaoxiao",
+                  speed: float = 1.0) -> Optional[str]:
+        """
+        获取音频路径（读音相同的写法共用同一音频，见 text_normalizer；未缓存时按原文合成）
+
+        speed 不为 1.0 时从 1.0× 音频本地派生变速版本，不会再次调用 TTS，见 _speed_variant。
+        """
+        speed = round(max(0.5, min(2.0, speed)), 3)
+        if speed != 1.0:
+            base_path = self.get_audio(word, mode, accent, use_minimax, voice_en, voice_cn)
+            return base_path and self._speed_variant(word, mode, base_path, speed)
+
+        key = self._request_key(word, mode, accent, use_minimax, voice_en, voice_cn)
+
+        labels = self._lookup_labels(mode, accent, use_minimax, voice_en, voice_cn)
+
+        # 内存索引按音色区分，切换音色也是 O(1) 查表
+        path = self.cache.get(key)
+        retry_preferred = path is not None and self._fallback_expired(key)
+        if path and os.path.exists(path) and not retry_preferred:
+            self.metrics.hits.inc(layer="memory", **labels)
+            return path
+
+        # 持久化存储命中，无需网络请求（回退音频到期后只接受首选引擎的音频）
+        if retry_preferred:
+            stored_path = self.store.get(key, text=word)
+        else:
+            stored_path = self._lookup_store(word, mode, accent, use_minimax, voice_en, voice_cn)
+        if stored_path:
+            self.metrics.hits.inc(layer="store", **labels)
+            self._remember(word, mode, key, stored_path)
+            return stored_path
         
         # 如果未缓存，同步生成
-        return self._generate_audio_sync(word, mode, accent=accent,
-                                        use_minimax=use_minimax,
-                                        voice_en=voice_en, voice_cn=voice_cn)
+        self.metrics.misses.inc(**labels)
+        path = self._generate_audio_sync(word, mode, accent=accent,
+                                         use_minimax=use_minimax,
+                                         voice_en=voice_en, voice_cn=voice_cn)
+        if path:
+            # 回退引擎生成的音频也记到请求键下（有效期 FALLBACK_TTL），期间直接命中内存索引
+            self._remember(word, mode, key, path)
+        return path
     
+    def _speed_variant(self, word: str, mode: str, base_path: str, speed: float) -> str:
+        """
+        从 1.0× 音频派生变速版本（atempo，保持音高），作为独立条目写入存储
+
+        变速版本的键由源音频的键与倍速决定，源音频换了引擎或音色时变速版本随之不同。
+        没有 ffmpeg 或处理失败时返回源音频（按原速播放）。
+        """
+        base_key = AudioStore.key_of(base_path)
+        if base_key is None or not self.can_transcode:
+            if not self._stretch_warned:
+                self._stretch_warned = True
+                print("未安装 ffmpeg，无法生成变速音频，按原速播放")
+            return base_path
+
+        sample_rate, bitrate = self.profile.sample_rate, self.profile.bitrate
+        key = AudioStore.make_key(base_key, mode, self.STRETCH_ENGINE, "", speed=speed,
+                                  sample_rate=sample_rate, bitrate=bitrate)
+        path = self.cache.get(key)
+        if path and os.path.exists(path):
+            return path
+
+        def stretch(tmp_path: str) -> str:
+            time_stretch_mp3(base_path, tmp_path, speed, sample_rate, bitrate)
+            self.metrics.speed_variants.inc(speed=f"{speed:g}")
+            return tmp_path
+
+        try:
+            path = self._produce(key, word, stretch)
+        except Exception as e:
+            print(f"生成变速音频失败 {word}: {e}")
+            return base_path
+        self._remember(word, mode, key, path)
+        return path
+
+    def stream_voice(self, word: str, mode: str, voice: str) -> Iterator[bytes]:
+        """按语言与音色流式获取音频（音频服务 /stream 的来源）"""
+        if mode == "en":
+            return self.stream_audio(word, mode="en", voice_en=voice or "expressive_narrator")
+        return self.stream_audio(word, mode="cn", voice_cn=voice or "xiaoxiao")
+
+    def stream_audio(self, word: str, mode: str = "en", accent: str = "us",
+                     use_minimax: bool = True,
+                     voice_en: str = "expressive_narrator",
+                     voice_cn: str = "xiaoxiao",
+                     chunk_size: int = 16384) -> Iterator[bytes]:
+        """
+        以字节块形式获取音频，未缓存时边合成边产出（首块音频无需等待整段合成）
+
+        流式合成的内容同时写入存储，完整结束后才提交为缓存条目；
+        调用方中途停止迭代或合成出错时丢弃不完整的文件。
+
+        Yields:
+            MP3 音频块
+        """
+        key = self._request_key(word, mode, accent, use_minimax, voice_en, voice_cn)
+        labels = self._lookup_labels(mode, accent, use_minimax, voice_en, voice_cn)
+        path = self.cache.get(key)
+        retry_preferred = path is not None and self._fallback_expired(key)
+        if path and os.path.exists(path) and not retry_preferred:
+            self.metrics.hits.inc(layer="memory", **labels)
+        else:
+            if retry_preferred:
+                path = self.store.get(key, text=word)
+            else:
+                path = self._lookup_store(word, mode, accent, use_minimax, voice_en, voice_cn)
+            if path:
+                self.metrics.hits.inc(layer="store", **labels)
+                self._remember(word, mode, key, path)
+            else:
+                self.metrics.misses.inc(**labels)
+
+        flight = None
+        if path is None and use_minimax and self.registry.is_healthy(MINIMAX_INFO.name):
+            with self._lock:
+                flight = self._inflight.get(key)
+                is_owner = flight is None
+                if is_owner:
+                    flight = Future()
+                    self._inflight[key] = flight
+            if not is_owner:
+                # 其他请求正在合成同一音频，等待其完成后读取文件
+                try:
+                    path = flight.result()
+                except Exception:
+                    path = None
+                flight = None
+            elif not self.registry.acquire(MINIMAX_INFO.name):
+                # 半开探测名额已被其他请求占用
+                with self._lock:
+                    self._inflight.pop(key, None)
+                flight.set_exception(RuntimeError("MiniMax 熔断中"))
+                flight = None
+
+        exclude = ()
+        if flight is not None:
+            spec = self._audio_spec(mode, accent, use_minimax, voice_en, voice_cn)
+            tmp_path = self.store.reserve(key, text=word)
+            sent = False
+            start = time.monotonic()
+            try:
+                for chunk in self._get_minimax_engine().speak_stream(
+                        word, tmp_path, voice=spec["voice"], speed=spec["speed"],
+                        model=spec["model"], sample_rate=spec["sample_rate"],
+                        bitrate=spec["bitrate"]):
+                    sent = True
+                    yield chunk
+                path = self.store.commit(key, tmp_path, text=word)
+                self.registry.report_success(MINIMAX_INFO.name, time.monotonic() - start)
+                self._record_synthesis(MINIMAX_INFO.name, path, time.monotonic() - start)
+                self._remember(word, mode, key, path)
+                flight.set_result(path)
+                return
+            except Exception as e:
+                self.store.discard(tmp_path)
+                flight.set_exception(e)
+                self.registry.report_failure(MINIMAX_INFO.name)
+                self.metrics.failures.inc(engine=MINIMAX_INFO.name)
+                print(f"流式合成失败 {word}: {e}")
+                if sent:
+                    return
+                exclude = (MINIMAX_INFO.name,)
+            except BaseException:
+                # 调用方提前关闭了生成器
+                self.store.discard(tmp_path)
+                flight.set_exception(RuntimeError(f"流式合成被中断: {word}"))
+                if sent:
+                    self.registry.report_success(MINIMAX_INFO.name)
+                raise
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+        if path is None:
+            # Edge TTS 没有流式接口（或 MiniMax 流式失败），整段生成后再读取
+            path = self._generate_audio_sync(word, mode, accent=accent,
+                                             use_minimax=use_minimax,
+                                             voice_en=voice_en, voice_cn=voice_cn,
+                                             exclude=exclude)
+            if path is None:
+                return
+
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
     def _generate_audio_sync(self, word: str, mode: str, accent: str = "us", 
                              use_minimax: bool = True,
                              voice_en: str = "expressive_narrator",
-                             voice_cn: str = "xiaoxiao") -> Optional[str]:
-        """同步生成音频"""
+                             voice_cn: str = "xiaoxiao",
+                             exclude: Tuple[str, ...] = ()) -> Optional[str]:
+        """同步生成音频（按引擎路由依次回退）"""
         try:
-            cache_path = self.get_cache_path(word, mode)
-            
-            # 判断是否使用 MiniMax
-            if use_minimax:
-                minimax = self._get_minimax_engine()
-                if minimax:
-                    with self._tts_lock:
-                        if mode == "en":
-                            minimax.set_voice(voice_en, is_english=True)
-                            minimax.set_rate(1.0)  # MiniMax 语速单独控制
-                            audio_path = minimax.speak(word, save_path=cache_path)
-                        else:  # cn
-                            minimax.set_voice(voice_cn, is_english=False)
-                            audio_path = minimax.speak(word, save_path=cache_path)
-                else:
-                    # MiniMax 初始化失败，回退到 Edge TTS
-                    raise RuntimeError("MiniMax 引擎未初始化")
-            else:
-                # 使用 Edge TTS
-                en_voice = "us_female" if accent == "us" else "uk_female"
-                with self._tts_lock:
-                    if mode == "en":
-                        tts_engine.set_voice(en_voice)
-                        audio_path = tts_engine.speak(word, save_path=cache_path)
-                    else:  # cn
-                        tts_engine.set_voice("chinese")
-                        audio_path = tts_engine.speak(word, save_path=cache_path)
-            
-            cache_key = f"{word}_{mode}"
-            with self._lock:
-                self.cache[cache_key] = audio_path
-            
-            return audio_path
+            return self._synthesize_routed(word, mode, accent, use_minimax, voice_en, voice_cn,
+                                           exclude=exclude)
         except Exception as e:
             print(f"生成音频失败 {word}: {e}")
-            # 如果 MiniMax 失败，尝试回退到 Edge TTS
-            if use_minimax:
-                print(f"尝试使用 Edge TTS 回退...")
-                return self._generate_audio_sync(word, mode, accent, use_minimax=False)
             return None
     
-    def preload_words(self, words: List[Dict], mode: str = "en_to_cn", accent: str = "us",
-                      use_minimax: bool = True,
-                      voice_en: str = "expressive_narrator",
-                      voice_cn: str = "xiaoxiao") -> None:
-        """
-        预加载单词音频
-        
-        Args:
-            words: 单词列表
-            mode: 听写模式
-            accent: 英语口音，"us" 或 "uk"
-            use_minimax: 是否使用 MiniMax
-            voice_en: 英文音色
-            voice_cn: 中文音色
-        """
-        # 准备任务列表
+    @staticmethod
+    def word_tasks(words: List[Dict], mode: str) -> List[tuple]:
+        """听写模式需要的 (文本, 语言) 列表"""
         tasks = []
         for word_data in words:
             # 兼容两种 key 格式
@@ -138,15 +775,11 @@ class AudioCache:
                     tasks.append((en, "en"))
                 if cn:
                     tasks.append((cn, "cn"))
+        return tasks
 
-        self._preload_tasks(tasks, accent=accent, use_minimax=use_minimax,
-                           voice_en=voice_en, voice_cn=voice_cn)
-
-    def preload_all_required(self, words: List[Dict], accent: str = "us",
-                            use_minimax: bool = True,
-                            voice_en: str = "expressive_narrator",
-                            voice_cn: str = "xiaoxiao") -> None:
-        """预加载听写可能用到的所有音频（英文+中文，自动去重）"""
+    @staticmethod
+    def _all_tasks(words: List[Dict]) -> List[tuple]:
+        """听写可能用到的所有 (文本, 语言)：英文 + 中文"""
         tasks = []
         for word_data in words:
             # 兼容两种 key 格式
@@ -157,104 +790,539 @@ class AudioCache:
                 tasks.append((en, "en"))
             if cn:
                 tasks.append((cn, "cn"))
+        return tasks
+
+    def preload_words(self, words: List[Dict], mode: str = "en_to_cn", accent: str = "us",
+                      use_minimax: bool = True,
+                      voice_en: str = "expressive_narrator",
+                      voice_cn: str = "xiaoxiao") -> None:
+        """
+        预加载单词音频（阻塞直到完成，非阻塞版本见 preload_words_async）
+        
+        Args:
+            words: 单词列表
+            mode: 听写模式
+            accent: 英语口音，"us" 或 "uk"
+            use_minimax: 是否使用 MiniMax
+            voice_en: 英文音色
+            voice_cn: 中文音色
+        """
+        self._preload_tasks(self.word_tasks(words, mode), accent=accent,
+                            use_minimax=use_minimax, voice_en=voice_en, voice_cn=voice_cn)
+
+    def preload_all_required(self, words: List[Dict], accent: str = "us",
+                            use_minimax: bool = True,
+                            voice_en: str = "expressive_narrator",
+                            voice_cn: str = "xiaoxiao") -> None:
+        """预加载听写可能用到的所有音频（英文+中文，自动去重）"""
+        self._preload_tasks(self._all_tasks(words), accent=accent,
+                            use_minimax=use_minimax, voice_en=voice_en, voice_cn=voice_cn)
+
+    def preload_words_async(self, words: List[Dict], mode: str = "en_to_cn",
+                            accent: str = "us", use_minimax: bool = True,
+                            voice_en: str = "expressive_narrator",
+                            voice_cn: str = "xiaoxiao") -> PreloadJob:
+        """
+        在后台预加载单词音频，立即返回任务句柄
+
+        Returns:
+            PreloadJob，可 cancel() / wait(timeout) / iter_progress()
+        """
+        return self._start_preload(self.word_tasks(words, mode), accent=accent,
+                                   use_minimax=use_minimax, voice_en=voice_en, voice_cn=voice_cn)
+
+    def preload_all_required_async(self, words: List[Dict], accent: str = "us",
+                                   use_minimax: bool = True,
+                                   voice_en: str = "expressive_narrator",
+                                   voice_cn: str = "xiaoxiao") -> PreloadJob:
+        """在后台预加载听写可能用到的所有音频，立即返回任务句柄"""
+        return self._start_preload(self._all_tasks(words), accent=accent,
+                                   use_minimax=use_minimax, voice_en=voice_en, voice_cn=voice_cn)
 
-        self._preload_tasks(tasks, accent=accent, use_minimax=use_minimax,
-                           voice_en=voice_en, voice_cn=voice_cn)
+    def _start_preload(self, tasks: List[tuple], **kwargs) -> PreloadJob:
+        """在后台线程中执行 _preload_tasks"""
+        job = PreloadJob()
+        self.track_job(job)
+
+        def run():
+            try:
+                self._preload_tasks(tasks, job=job, **kwargs)
+            except Exception as e:
+                print(f"预加载失败: {e}")
+            finally:
+                job._finish()
+
+        threading.Thread(target=run, daemon=True).start()
+        return job
 
     def _preload_tasks(self, tasks: List[tuple], accent: str = "us",
                        use_minimax: bool = True,
                        voice_en: str = "expressive_narrator",
-                       voice_cn: str = "xiaoxiao") -> None:
-        """统一预加载实现，带进度统计"""
+                       voice_cn: str = "xiaoxiao",
+                       max_workers: Optional[int] = None,
+                       job: Optional[PreloadJob] = None) -> None:
+        """
+        统一预加载实现，带进度统计（max_workers 默认取实例配置）
+
+        传入 job 时同步更新其进度；job 被取消后尚未开始的合成直接跳过。
+        """
+        if job is not None:
+            self.track_job(job)
+            self._run_preload(tasks, job, accent, use_minimax, voice_en, voice_cn, max_workers)
+            return
+
+        # 同步预加载：任务句柄随调用结束
+        job = PreloadJob()
+        self.track_job(job)
+        try:
+            self._run_preload(tasks, job, accent, use_minimax, voice_en, voice_cn, max_workers)
+        finally:
+            job._finish()
+
+    def track_job(self, job: PreloadJob):
+        """
+        登记一个预加载任务，计入 get_preload_status 与 preload_pending
+
+        之前登记的任务全部结束后，新任务开始新的一轮（旧任务不再计入）。
+        """
+        with self._lock:
+            if job in self._jobs:
+                return
+            if all(j.done() for j in self._jobs):
+                self._jobs = []
+            self._jobs.append(job)
+
+    def _run_preload(self, tasks: List[tuple], job: PreloadJob, accent: str,
+                     use_minimax: bool, voice_en: str, voice_cn: str,
+                     max_workers: Optional[int]) -> None:
         import concurrent.futures
 
-        # 去重，避免相同文本重复生成
+        # 规范化后去重，读音相同的写法只合成一次（按首次出现的原文合成）
         deduped_tasks = []
         seen = set()
-        for item in tasks:
+        for word, audio_mode in tasks:
+            item = (normalize_text(word, audio_mode), audio_mode)
             if item in seen:
                 continue
             seen.add(item)
-            deduped_tasks.append(item)
-
-        with self._lock:
-            self.preload_total = len(deduped_tasks)
-            self.preload_completed = 0
-            self.preload_errors = 0
-            self.preload_active = bool(deduped_tasks)
-            self.preload_finished = not deduped_tasks
-
-        if not deduped_tasks:
-            return
+            deduped_tasks.append((word, audio_mode))
 
         # 初始化 MiniMax 引擎（如果需要）
         minimax = None
         if use_minimax:
             minimax = self._get_minimax_engine()
+        use_minimax = minimax is not None
 
-        # 根据是否使用 MiniMax 选择音色
-        if minimax:
-            en_voice_selected = voice_en
-        else:
-            en_voice_selected = "us_female" if accent == "us" else "uk_female"
+        # 已按当前音色缓存的直接跳过，只为缺失的音频发起合成
+        missing_tasks = [
+            (word, audio_mode) for word, audio_mode in deduped_tasks
+            if not self.is_cached(word, audio_mode, accent, use_minimax, voice_en, voice_cn)
+        ]
+
+        job._set_total(len(deduped_tasks), completed=len(deduped_tasks) - len(missing_tasks))
+
+        if not missing_tasks:
+            return
+
+        # 按路由选择本次预加载的主引擎（首选引擎降级或不可用时自动换用下一个）
+        langs = {audio_mode for _, audio_mode in missing_tasks}
+        engine = next(
+            (name for name in self._engine_chain(next(iter(langs)), use_minimax)
+             if langs <= set(self.registry.info(name).languages)),
+            None
+        )
+
+        if engine == EDGE_INFO.name:
+            # Edge TTS 直接在共享事件循环上并发合成
+            self._preload_edge(missing_tasks, accent, use_minimax, voice_en, voice_cn,
+                               max_workers=max_workers or self.max_workers, job=job)
+            return
+
+        if engine != MINIMAX_INFO.name and self.registry.batch_renderer(engine):
+            # 本地等支持批量的引擎：一次调用合成多个单词
+            self._preload_batch_engine(engine, missing_tasks, accent, use_minimax, voice_en, voice_cn,
+                                       max_workers=max_workers or self.max_workers, job=job)
+            return
 
         def generate_one(item):
+            if job.cancelled:
+                return []
             word, audio_mode = item
-            cache_path = self.get_cache_path(word, audio_mode)
+            key = self._request_key(word, audio_mode, accent, use_minimax, voice_en, voice_cn)
+            try:
+                # 持久化存储已有则直接复用
+                stored_path = self._lookup_store(word, audio_mode, accent, use_minimax,
+                                                 voice_en, voice_cn)
+                if stored_path:
+                    return [(word, audio_mode, key, stored_path)]
+
+                return [(word, audio_mode, key, self._synthesize_routed(
+                    word, audio_mode, accent, use_minimax, voice_en, voice_cn))]
+            except Exception as e:
+                return [(word, audio_mode, key, e)]
+
+        def generate_batch(batch):
+            if job.cancelled:
+                return []
+            audio_mode = batch[0][1]
+            spec = self._audio_spec(audio_mode, accent, use_minimax, voice_en, voice_cn)
+            results, pending = [], []
+            for word, _ in batch:
+                key = self._store_key(word, audio_mode, spec)
+                stored_path = self._lookup_store(word, audio_mode, accent, use_minimax,
+                                                 voice_en, voice_cn)
+                if stored_path:
+                    results.append((word, audio_mode, key, stored_path))
+                else:
+                    pending.append((word, key))
+            if pending:
+                try:
+                    paths = self._synthesize_batch([word for word, _ in pending], audio_mode, spec)
+                except Exception as e:
+                    paths = [e] * len(pending)
+                for (word, key), path in zip(pending, paths):
+                    if isinstance(path, Exception) and not job.cancelled:
+                        # MiniMax 失败的单词交给下一个健康的引擎
+                        try:
+                            path = self._synthesize_routed(word, audio_mode, accent, use_minimax,
+                                                           voice_en, voice_cn,
+                                                           exclude=(MINIMAX_INFO.name,))
+                        except Exception as e:
+                            path = e
+                    results.append((word, audio_mode, key, path))
+            return results
 
-            if os.path.exists(cache_path):
-                return word, audio_mode, cache_path
+        if self.batch_size > 1 and engine == MINIMAX_INFO.name:
+            jobs = [(generate_batch, batch)
+                    for batch in self._plan_batches(missing_tasks, self.batch_size)]
+        else:
+            jobs = [(generate_one, task) for task in missing_tasks]
 
-            with self._tts_lock:
-                if minimax:
-                    # 使用 MiniMax
-                    if audio_mode == "en":
-                        minimax.set_voice(en_voice_selected, is_english=True)
+        # 引擎按次传参、无全局锁，并发数即实际并行度
+        workers = max(1, max_workers or self.max_workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(func, arg) for func, arg in jobs]
+
+            for future in concurrent.futures.as_completed(futures):
+                for word, audio_mode, key, result in future.result():
+                    if isinstance(result, Exception):
+                        self._mark_preload_done(result, job)
                     else:
-                        minimax.set_voice(voice_cn, is_english=False)
-                    minimax.speak(word, save_path=cache_path)
+                        self._remember(word, audio_mode, key, result)
+                        self._mark_preload_done(job=job)
+
+    @staticmethod
+    def _plan_batches(tasks: List[tuple], batch_size: int) -> List[List[tuple]]:
+        """按语言分组并切分批次（同一批次共用音色，且不超过单次请求的文本长度上限）"""
+        batches = []
+        for audio_mode in ("en", "cn"):
+            current, chars = [], 0
+            for word, task_mode in tasks:
+                if task_mode != audio_mode:
+                    continue
+                if current and (len(current) >= batch_size or
+                                chars + len(word) > MiniMaxTTSEngine.BATCH_MAX_CHARS):
+                    batches.append(current)
+                    current, chars = [], 0
+                current.append((word, task_mode))
+                chars += len(word) + 8  # 预留标点与停顿标记
+            if current:
+                batches.append(current)
+        return batches
+
+    def _mark_preload_done(self, error: Optional[Exception] = None,
+                           job: Optional[PreloadJob] = None):
+        """记录一个预加载任务完成"""
+        if job is not None:
+            job._advance(error=error is not None)
+        if error is not None:
+            print(f"预加载失败: {error}")
+
+    def _preload_batch_engine(self, engine: str, tasks: List[tuple], accent: str,
+                              use_minimax: bool, voice_en: str, voice_cn: str,
+                              max_workers: int, job: Optional[PreloadJob] = None):
+        """
+        用支持批量的引擎（如本地 TTS）预加载：每 LOCAL_BATCH_SIZE 个单词调用一次引擎
+
+        与同步路径一样参与单飞；job 被取消后尚未开始的批次直接跳过。
+        引擎失败或熔断后，剩余单词交给下一个健康的引擎。
+        """
+        render_batch = self.registry.batch_renderer(engine)
+        owned = []    # (word, mode, key, flight, tmp_path, spec)
+        waiting = []  # (word, mode, key, flight)
+        reroute = []  # (word, mode)
+
+        for word, audio_mode in tasks:
+            spec = self._engine_spec(engine, audio_mode, accent, voice_en, voice_cn)
+            key = self._store_key(word, audio_mode, spec)
+
+            stored_path = self.store.get(key, text=word)
+            if stored_path:
+                self._remember(word, audio_mode, key, stored_path)
+                self._mark_preload_done(job=job)
+                continue
+
+            with self._lock:
+                flight = self._inflight.get(key)
+                is_owner = flight is None
+                if is_owner:
+                    flight = Future()
+                    self._inflight[key] = flight
+
+            if is_owner:
+                owned.append((word, audio_mode, key, flight, self.store.reserve(key, text=word), spec))
+            else:
+                waiting.append((word, audio_mode, key, flight))
+
+        try:
+            for i in range(0, len(owned), self.LOCAL_BATCH_SIZE):
+                chunk = owned[i:i + self.LOCAL_BATCH_SIZE]
+                if job is not None and job.cancelled:
+                    for word, _, key, flight, tmp_path, _ in chunk:
+                        self.store.discard(tmp_path)
+                        flight.set_exception(CancelledError())
+                    continue
+
+                acquired = self.registry.acquire(engine)
+                start = time.monotonic()
+                if not acquired:
+                    results = [RuntimeError(f"{engine} 熔断中")] * len(chunk)
                 else:
-                    # 使用 Edge TTS
-                    if audio_mode == "en":
-                        tts_engine.set_voice(en_voice_selected)
+                    try:
+                        results = render_batch([(word, spec, tmp_path)
+                                                for word, _, _, _, tmp_path, spec in chunk])
+                    except Exception as e:
+                        results = [e] * len(chunk)
+                elapsed = (time.monotonic() - start) / max(1, len(chunk))
+
+                for (word, audio_mode, key, flight, tmp_path, _), result in zip(chunk, results):
+                    try:
+                        if isinstance(result, Exception):
+                            raise result
+                        if result != tmp_path:
+                            shutil.move(result, tmp_path)
+                        path = self.store.commit(key, tmp_path, text=word)
+                    except Exception as e:
+                        self.store.discard(tmp_path)
+                        flight.set_exception(e)
+                        if acquired:
+                            self.registry.report_failure(engine)
+                            self.metrics.failures.inc(engine=engine)
+                        reroute.append((word, audio_mode))
                     else:
-                        tts_engine.set_voice("chinese")
-                    tts_engine.speak(word, save_path=cache_path)
+                        self._remember(word, audio_mode, key, path)
+                        flight.set_result(path)
+                        self.registry.report_success(engine, elapsed)
+                        self._record_synthesis(engine, path, elapsed,
+                                               self._preferred_engine(use_minimax))
+                        self._mark_preload_done(job=job)
+        finally:
+            for word, audio_mode, key, flight, tmp_path, _ in owned:
+                if not flight.done():
+                    self.store.discard(tmp_path)
+                    error = RuntimeError(f"合成中断: {word}")
+                    flight.set_exception(error)
+                    self._mark_preload_done(error, job)
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+        self._reroute_preload(reroute, engine, accent, use_minimax, voice_en, voice_cn,
+                              max_workers, job)
+
+        for word, audio_mode, key, flight in waiting:
+            try:
+                self._remember(word, audio_mode, key, flight.result())
+            except CancelledError:
+                continue
+            except Exception as e:
+                self._mark_preload_done(e, job)
+            else:
+                self._mark_preload_done(job=job)
 
-            return word, audio_mode, cache_path
+    def _reroute_preload(self, tasks: List[tuple], failed_engine: str, accent: str,
+                         use_minimax: bool, voice_en: str, voice_cn: str,
+                         max_workers: int, job: Optional[PreloadJob] = None):
+        """预加载中某个引擎失败（或熔断后未执行）的单词，逐个交给路由中的其他引擎"""
+        if not tasks:
+            return
 
-        # MiniMax API 调用比 edge-tts 更稳定，可以适当提高并发
+        def generate(item):
+            word, audio_mode = item
+            if job is not None and job.cancelled:
+                return item, CancelledError()
+            try:
+                return item, self._synthesize_routed(word, audio_mode, accent, use_minimax,
+                                                     voice_en, voice_cn, exclude=(failed_engine,))
+            except Exception as e:
+                return item, e
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-            futures = [executor.submit(generate_one, task) for task in deduped_tasks]
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for (word, audio_mode), result in executor.map(generate, tasks):
+                if isinstance(result, CancelledError):
+                    continue
+                if isinstance(result, Exception):
+                    self._mark_preload_done(result, job)
+                else:
+                    # 同时记到首选引擎的请求键下，is_cached 按当前设置即可命中
+                    key = self._request_key(word, audio_mode, accent, use_minimax, voice_en, voice_cn)
+                    self._remember(word, audio_mode, key, result)
+                    self._mark_preload_done(job=job)
 
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    word, audio_mode, path = future.result()
-                    if path:
-                        cache_key = f"{word}_{audio_mode}"
-                        with self._lock:
-                            self.cache[cache_key] = path
-                except Exception as e:
-                    with self._lock:
-                        self.preload_errors += 1
-                    print(f"预加载失败: {e}")
-                finally:
+    def _preload_edge(self, tasks: List[tuple], accent: str, use_minimax: bool,
+                      voice_en: str, voice_cn: str,
+                      max_workers: int, job: Optional[PreloadJob] = None):
+        """
+        通过 TTSEngine.speak_many 在共享事件循环上批量合成 Edge 音频
+
+        与同步路径一样参与单飞：已有其他请求在合成的键只等待其结果。
+        job 被取消后，尚未开始的合成直接跳过；失败的单词以及 Edge TTS 熔断后
+        尚未开始的单词交给下一个健康的引擎。
+        """
+        owned = []    # (word, mode, key, flight, tmp_path, spec)
+        waiting = []  # (word, mode, key, flight)
+        reroute = []  # (word, mode)
+        breaker = self.registry.breaker(EDGE_INFO.name)
+        preferred = self._preferred_engine(use_minimax)
+        started: Dict[int, float] = {}  # 序号 -> 开始合成的时间
+
+        for word, audio_mode in tasks:
+            spec = self._audio_spec(audio_mode, accent, False, voice_en, voice_cn)
+            key = self._store_key(word, audio_mode, spec)
+
+            stored_path = self.store.get(key, text=word)
+            if stored_path:
+                self._remember(word, audio_mode, key, stored_path)
+                self._mark_preload_done(job=job)
+                continue
+
+            with self._lock:
+                flight = self._inflight.get(key)
+                is_owner = flight is None
+                if is_owner:
+                    flight = Future()
+                    self._inflight[key] = flight
+
+            if is_owner:
+                owned.append((word, audio_mode, key, flight, self.store.reserve(key, text=word), spec))
+            else:
+                waiting.append((word, audio_mode, key, flight))
+
+        def finish(index, result):
+            word, audio_mode, key, flight, tmp_path, spec = owned[index]
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                self._apply_profile(tmp_path, spec)
+                path = self.store.commit(key, tmp_path, text=word)
+                self._remember(word, audio_mode, key, path)
+                flight.set_result(path)
+            except CancelledError as e:
+                self.store.discard(tmp_path)
+                flight.set_exception(e)
+                if not (job is not None and job.cancelled):
+                    # 因熔断跳过，改用其他引擎；已取消的不计入完成数与错误数
+                    reroute.append((word, audio_mode))
+            except Exception as e:
+                self.store.discard(tmp_path)
+                flight.set_exception(e)
+                self.registry.report_failure(EDGE_INFO.name)
+                self.metrics.failures.inc(engine=EDGE_INFO.name)
+                reroute.append((word, audio_mode))
+            else:
+                latency = time.monotonic() - started[index] if index in started else None
+                self.registry.report_success(EDGE_INFO.name, latency)
+                self._record_synthesis(EDGE_INFO.name, path, latency, preferred)
+                self._mark_preload_done(job=job)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+        # 需要转码时在线程池中完成，避免阻塞共享事件循环
+        finisher = None
+        if any(spec["bitrate"] != TTSEngine.OUTPUT_BITRATE for *_, spec in owned):
+            finisher = ThreadPoolExecutor(max_workers=max_workers)
+
+        def should_stop():
+            return (job is not None and job.cancelled) or (breaker is not None and not breaker.ready())
+
+        def on_done(index, result):
+            if finisher is not None:
+                finisher.submit(finish, index, result)
+            else:
+                finish(index, result)
+
+        items = [
+            {
+                "text": word,
+                "save_path": tmp_path,
+                "voice": spec["voice"],
+                "rate": TTSEngine.speed_to_rate(spec["speed"]),
+            }
+            for word, _, _, _, tmp_path, spec in owned
+        ]
+
+        try:
+            if items:
+                # Edge 失败不在引擎内部回退到本地 TTS（会存到 Edge 的键下），由路由统一回退
+                tts_engine.speak_many(items, concurrency=max_workers, on_done=on_done,
+                                      should_stop=should_stop,
+                                      timeout=self.LATENCY_BUDGETS[EDGE_INFO.name],
+                                      fallback_local=False,
+                                      on_start=lambda index: started.__setitem__(index, time.monotonic()))
+        finally:
+            if finisher is not None:
+                finisher.shutdown(wait=True)
+            # 事件循环异常中止时，确保等待方不会永久阻塞
+            for word, audio_mode, key, flight, tmp_path, _ in owned:
+                if not flight.done():
+                    self.store.discard(tmp_path)
+                    error = RuntimeError(f"合成中断: {word}")
+                    flight.set_exception(error)
+                    self._mark_preload_done(error, job)
                     with self._lock:
-                        self.preload_completed += 1
+                        self._inflight.pop(key, None)
+
+        self._reroute_preload(reroute, EDGE_INFO.name, accent, use_minimax, voice_en, voice_cn,
+                              max_workers, job)
+
+        for word, audio_mode, key, flight in waiting:
+            try:
+                self._remember(word, audio_mode, key, flight.result())
+            except CancelledError:
+                continue
+            except Exception as e:
+                self._mark_preload_done(e, job)
+            else:
+                self._mark_preload_done(job=job)
 
+    @property
+    def preload_active(self) -> bool:
+        """是否有尚未结束的预加载任务"""
         with self._lock:
-            self.preload_active = False
-            self.preload_finished = True
+            jobs = list(self._jobs)
+        return any(not job.done() for job in jobs)
+
+    @property
+    def preload_pending(self) -> int:
+        """尚未结束的预加载任务中还没完成的音频数"""
+        with self._lock:
+            jobs = list(self._jobs)
+        return sum(max(0, job.total - job.completed) for job in jobs if not job.done())
 
     def get_preload_status(self) -> Dict[str, float]:
-        """返回后台预加载状态"""
+        """
+        返回本轮预加载的汇总状态（所有会话的任务之和）
+
+        单个任务的进度请使用 preload_words_async 等返回的 PreloadJob。
+        """
         with self._lock:
-            total = self.preload_total
-            completed = self.preload_completed
-            errors = self.preload_errors
-            active = self.preload_active
-            finished = self.preload_finished
+            jobs = list(self._jobs)
+        statuses = [job.progress() for job in jobs]
+        total = sum(status["total"] for status in statuses)
+        completed = sum(status["completed"] for status in statuses)
+        errors = sum(status["errors"] for status in statuses)
+        finished = bool(statuses) and all(status["finished"] for status in statuses)
+        active = bool(statuses) and not finished
 
         progress = (completed / total) if total else 1.0
         return {
@@ -266,39 +1334,128 @@ class AudioCache:
             "progress": progress,
         }
     
+    def get_stats(self) -> Dict:
+        """
+        缓存与合成统计，用于评估缓存容量与 MiniMax 配额
+
+        Returns:
+            {
+                "hits", "misses", "hit_rate": 总体命中情况,
+                "by_voice": [{"engine", "voice", "hits", "misses", "hit_rate"}, ...],
+                "engines": {引擎: {"synthesized", "bytes", "failures", "latency", "health"}},
+                "fallbacks": [{"from", "to", "count"}, ...],
+                "speed_variants": {倍速: 本地派生的变速音频数},
+                "store": 存储占用与淘汰次数,
+                "queue": {"inflight": 进行中的合成, "preload_pending": 待预加载},
+            }
+        """
+        metrics = self.metrics
+        hits, misses = metrics.hits.get(), metrics.misses.get()
+
+        voices = {}
+        for counter, field in ((metrics.hits, "hits"), (metrics.misses, "misses")):
+            for labels, value in counter.items():
+                entry = voices.setdefault((labels["engine"], labels["voice"]), {
+                    "engine": labels["engine"], "voice": labels["voice"], "hits": 0, "misses": 0
+                })
+                entry[field] += value
+        for entry in voices.values():
+            total = entry["hits"] + entry["misses"]
+            entry["hit_rate"] = entry["hits"] / total if total else 0.0
+
+        health = self.registry.get_health()
+        engines = {
+            name: {
+                "synthesized": metrics.synthesized.get(engine=name),
+                "bytes": metrics.bytes_generated.get(engine=name),
+                "failures": metrics.failures.get(engine=name),
+                "latency": metrics.synth_latency.summary(engine=name),
+                "health": health[name],
+            }
+            for name in self.registry.names()
+        }
+
+        with self._lock:
+            inflight = len(self._inflight)
+        pending = self.preload_pending
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "by_voice": sorted(voices.values(), key=lambda e: (e["engine"], e["voice"])),
+            "engines": engines,
+            "fallbacks": [{"from": labels["from"], "to": labels["to"], "count": value}
+                          for labels, value in metrics.fallbacks.items()],
+            "speed_variants": {labels["speed"]: value
+                               for labels, value in metrics.speed_variants.items()},
+            "store": self.store.get_usage(),
+            "queue": {"inflight": inflight, "preload_pending": pending},
+        }
+
+    def render_metrics(self) -> str:
+        """以 Prometheus 文本格式导出指标（供音频服务的 /metrics 使用）"""
+        stats = self.get_stats()
+        usage = stats["store"]
+        return self.metrics.render_prometheus({
+            "dictation_audio_store_bytes": ("持久化存储占用字节数", usage["bytes"]),
+            "dictation_audio_store_max_bytes": ("持久化存储容量上限", usage["max_bytes"]),
+            "dictation_audio_store_entries": ("持久化存储中的音频数", usage["entries"]),
+            "dictation_audio_inflight": ("进行中的合成数", stats["queue"]["inflight"]),
+            "dictation_audio_preload_pending": ("尚未完成的预加载数", stats["queue"]["preload_pending"]),
+            "dictation_tts_circuit_open": (
+                "引擎熔断器是否断开（1 为断开）",
+                [({"engine": name}, 0 if info["health"]["healthy"] else 1)
+                 for name, info in stats["engines"].items()]
+            ),
+        })
+
     def get_progress(self) -> tuple:
-        """获取加载进度"""
-        total = len(self.cache)
-        loaded = sum(1 for path in self.cache.values() if os.path.exists(path))
-        return loaded, total
+        """获取加载进度（按存储索引判断文件是否仍在，不逐个访问磁盘）"""
+        with self._lock:
+            paths = list(self.cache.values())
+        live = self.store.live_paths()
+        return sum(1 for path in paths if path in live), len(paths)
     
     def reset(self):
-        """重置缓存目录和状态，用于切换到新词库。"""
-        self.cleanup()
-        self.cache_dir = tempfile.mkdtemp(prefix="dictation_audio_")
+        """重置缓存状态，用于切换到新词库（持久化音频保留，可跨词库复用）。"""
         with self._lock:
             self.cache = {}
+            self._variants = {}
+            self._fallback_until = {}
             self.loading_status = {}
-            self.preload_total = 0
-            self.preload_completed = 0
-            self.preload_errors = 0
-            self.preload_active = False
-            self.preload_finished = False
+            self._jobs = []
 
     def cleanup(self):
-        """清理缓存"""
-        try:
-            import shutil
-            shutil.rmtree(self.cache_dir, ignore_errors=True)
-        except:
-            pass
+        """清理内存中的缓存索引（磁盘音频保留，彻底清空请调用 store.clear()）"""
+        with self._lock:
+            self.cache = {}
+            self._variants = {}
+            self._fallback_until = {}
+            self.loading_status = {}
+
+
+# 进程级共享的缓存实例（所有浏览器会话共用）
+_shared_audio_cache: Optional[AudioCache] = None
+_shared_audio_cache_lock = threading.Lock()
+
+
+def get_shared_audio_cache() -> AudioCache:
+    """获取进程级共享的音频缓存实例"""
+    global _shared_audio_cache
+    if _shared_audio_cache is None:
+        with _shared_audio_cache_lock:
+            if _shared_audio_cache is None:
+                _shared_audio_cache = AudioCache()
+                set_metrics_source(_shared_audio_cache.render_metrics)
+                set_stream_source(_shared_audio_cache.stream_voice)
+    return _shared_audio_cache
 
 
-# Session state中存储的缓存实例
 def get_audio_cache() -> AudioCache:
-    """获取或创建音频缓存实例"""
-    if 'audio_cache' not in st.session_state:
-        st.session_state.audio_cache = AudioCache()
+    """获取音频缓存实例（会话中保存的是共享实例的引用）"""
+    if st.session_state.get('audio_cache') is None:
+        st.session_state.audio_cache = get_shared_audio_cache()
     return st.session_state.audio_cache
 
 
@@ -0,0 +1,184 @@
+"""
+音频缓存指标 - 计数器与直方图
+
+用于统计缓存命中率、合成延迟、生成字节数、引擎回退次数等，
+通过 AudioCache.get_stats() 读取，或由音频服务的 /metrics 以 Prometheus 文本格式导出。
+"""
+import bisect
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# 标签以排好序的 (名称, 值) 元组作为字典键
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# 瞬时值：单个数值，或 [(标签, 数值), ...]
+GaugeValue = Union[float, List[Tuple[Dict[str, str], float]]]
+
+# 合成延迟直方图的桶边界（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """按标签区分的单调计数器"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, value: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def get(self, **labels) -> float:
+        """指定标签的值；部分标签时返回所有匹配项之和"""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(value for key, value in self._values.items() if wanted <= set(key))
+
+    def items(self) -> List[Tuple[Dict[str, str], float]]:
+        with self._lock:
+            return [(dict(key), value) for key, value in self._values.items()]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value:g}")
+        return lines
+
+
+class _Series:
+    def __init__(self, bucket_count: int, reservoir: int):
+        self.buckets = [0] * (bucket_count + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=reservoir)
+
+
+class Histogram:
+    """
+    按标签区分的直方图
+
+    桶计数用于 Prometheus 导出；另保留最近的样本用于计算准确的分位数。
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = LATENCY_BUCKETS,
+                 reservoir: int = 1024):
+        self.name = name
+        self.help = help_text
+        self.bounds = sorted(buckets)
+        self.reservoir = reservoir
+        self._lock = threading.Lock()
+        self._series: Dict[LabelKey, _Series] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.bounds), self.reservoir)
+            series.buckets[bisect.bisect_left(self.bounds, value)] += 1
+            series.count += 1
+            series.sum += value
+            series.recent.append(value)
+
+    def summary(self, **labels) -> Dict[str, float]:
+        """样本数、平均值与 p50/p90/p99（按最近的样本计算，部分标签时合并所有匹配项）"""
+        wanted = set(_label_key(labels))
+        with self._lock:
+            matched = [s for key, s in self._series.items() if wanted <= set(key)]
+            count = sum(s.count for s in matched)
+            total = sum(s.sum for s in matched)
+            samples = sorted(v for s in matched for v in s.recent)
+
+        def percentile(q: float) -> float:
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": percentile(0.5),
+            "p90": percentile(0.9),
+            "p99": percentile(0.99),
+        }
+
+    def label_sets(self) -> List[Dict[str, str]]:
+        with self._lock:
+            return [dict(key) for key in self._series]
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, n in zip(self.bounds, series.buckets):
+                    cumulative += n
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', f'{bound:g}')])} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {series.count}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series.sum:g}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series.count}")
+        return lines
+
+
+class AudioMetrics:
+    """AudioCache 使用的全部指标"""
+
+    def __init__(self):
+        self.hits = Counter("dictation_audio_cache_hits_total",
+                            "缓存命中次数（layer=memory 内存索引，store 持久化存储）")
+        self.misses = Counter("dictation_audio_cache_misses_total", "缓存未命中、需要合成的次数")
+        self.synth_latency = Histogram("dictation_audio_synthesis_seconds",
+                                       "单个单词的合成耗时（秒）")
+        self.synthesized = Counter("dictation_audio_synthesized_total", "合成成功的音频数")
+        self.bytes_generated = Counter("dictation_audio_generated_bytes_total", "合成写入的音频字节数")
+        self.failures = Counter("dictation_audio_synthesis_failures_total", "各引擎合成失败次数")
+        self.fallbacks = Counter("dictation_audio_fallbacks_total",
+                                 "首选引擎失败或熔断后改用其他引擎的次数")
+        self.evictions = Counter("dictation_audio_store_evictions_total", "容量超限被淘汰的音频数")
+        self.evicted_bytes = Counter("dictation_audio_store_evicted_bytes_total", "被淘汰的音频字节数")
+        self.speed_variants = Counter("dictation_audio_speed_variants_total",
+                                      "从 1.0× 音频本地派生的变速音频数（不调用 TTS）")
+
+    def counters(self) -> List[Counter]:
+        return [self.hits, self.misses, self.synthesized, self.bytes_generated,
+                self.failures, self.fallbacks, self.evictions, self.evicted_bytes,
+                self.speed_variants]
+
+    def render_prometheus(self, gauges: Optional[Dict[str, Tuple[str, GaugeValue]]] = None) -> str:
+        """
+        以 Prometheus 文本格式导出
+
+        Args:
+            gauges: 导出时才计算的瞬时值 {名称: (说明, 值或 [(标签, 值), ...])}
+        """
+        lines = []
+        for counter in self.counters():
+            lines.extend(counter.render())
+        lines.extend(self.synth_latency.render())
+        for name, (help_text, value) in (gauges or {}).items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            samples = value if isinstance(value, list) else [({}, value)]
+            for labels, sample in samples:
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {sample:g}")
+        return "\n".join(lines) + "\n"
+
@@ -0,0 +1,130 @@
+"""
+音频规格 - 控制缓存音频的采样率与比特率
+
+单个单词的朗读不需要 32kHz/128kbps 的音质，降低规格可以同时缩小磁盘缓存
+和浏览器下载（或 base64 内联）的数据量。规格是存储键的一部分，
+切换规格不会读到旧规格的音频。
+
+MiniMax 在合成时直接按规格输出；Edge TTS 固定输出 24kHz/48kbps，
+安装了 ffmpeg 时在入库前转码，否则保留原始音频（存储键记录实际规格）。
+
+变速版本（0.75×/1.25× 等）不再重新合成，而是用 ffmpeg 的 atempo 滤镜
+从 1.0× 音频本地派生（保持音高），见 time_stretch_mp3。
+
+环境变量：
+    DICTATION_AUDIO_PROFILE  规格名称（hifi / standard / compact），默认 compact
+"""
+import functools
+import os
+import shutil
+import subprocess
+from typing import Dict, NamedTuple, Optional
+
+
+class AudioProfile(NamedTuple):
+    """一种音频输出规格（MP3 单声道）"""
+    name: str
+    sample_rate: int
+    bitrate: int
+
+
+AUDIO_PROFILES: Dict[str, AudioProfile] = {
+    # 与 MiniMax 原有请求参数一致
+    "hifi": AudioProfile("hifi", 32000, 128000),
+    "standard": AudioProfile("standard", 24000, 64000),
+    # 16kHz 足以覆盖语音频段，单词约 2KB
+    "compact": AudioProfile("compact", 16000, 32000),
+}
+
+DEFAULT_AUDIO_PROFILE = "compact"
+
+
+def get_audio_profile(name: Optional[str] = None) -> AudioProfile:
+    """
+    获取音频规格
+
+    Args:
+        name: 规格名称，默认读取环境变量 DICTATION_AUDIO_PROFILE
+
+    Returns:
+        音频规格，名称无效时返回默认规格
+    """
+    name = name or os.getenv("DICTATION_AUDIO_PROFILE", DEFAULT_AUDIO_PROFILE)
+    profile = AUDIO_PROFILES.get(name.lower())
+    if profile is None:
+        print(f"未知的音频规格 {name}，使用 {DEFAULT_AUDIO_PROFILE}")
+        profile = AUDIO_PROFILES[DEFAULT_AUDIO_PROFILE]
+    return profile
+
+
+@functools.lru_cache(maxsize=None)
+def transcode_available() -> bool:
+    """是否可以转码（需要 ffmpeg；每个进程只检测一次）"""
+    return shutil.which("ffmpeg") is not None
+
+
+def transcode_mp3(path: str, sample_rate: int, bitrate: int) -> str:
+    """
+    把音频文件原地转码为指定规格的单声道 MP3
+
+    Args:
+        path: 音频文件路径
+        sample_rate: 目标采样率
+        bitrate: 目标比特率
+
+    Returns:
+        音频文件路径（与输入相同）
+
+    Raises:
+        RuntimeError: ffmpeg 转码失败
+    """
+    out_path = f"{path}.transcode.mp3"
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error", "-i", path,
+        "-ac", "1", "-ar", str(sample_rate), "-b:a", str(bitrate),
+        "-map_metadata", "-1", "-f", "mp3", out_path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=30)
+        if result.returncode != 0:
+            raise RuntimeError(f"音频转码失败: {result.stderr.decode('utf-8', 'ignore').strip()}")
+        os.replace(out_path, path)
+    finally:
+        if os.path.exists(out_path):
+            os.remove(out_path)
+    return path
+
+
+# 界面可选的语速
+SPEED_OPTIONS = (0.75, 1.0, 1.25)
+
+
+def time_stretch_mp3(src_path: str, dst_path: str, speed: float,
+                     sample_rate: int, bitrate: int) -> str:
+    """
+    把音频变速（保持音高）后写入新的单声道 MP3
+
+    Args:
+        src_path: 源音频路径
+        dst_path: 输出路径
+        speed: 倍速（0.5 - 2.0，atempo 单级支持的范围）
+        sample_rate: 输出采样率
+        bitrate: 输出比特率
+
+    Returns:
+        输出文件路径
+
+    Raises:
+        RuntimeError: ffmpeg 处理失败
+    """
+    speed = max(0.5, min(2.0, speed))
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error", "-i", src_path,
+        "-filter:a", f"atempo={speed:g}",
+        "-ac", "1", "-ar", str(sample_rate), "-b:a", str(bitrate),
+        "-map_metadata", "-1", "-f", "mp3", dst_path,
+    ]
+    result = subprocess.run(cmd, capture_output=True, timeout=30)
+    if result.returncode != 0:
+        raise RuntimeError(f"音频变速失败: {result.stderr.decode('utf-8', 'ignore').strip()}")
+    return dst_path
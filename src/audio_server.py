@@ -0,0 +1,341 @@
+"""
+音频静态服务 - 通过 URL 提供 AudioStore 中的缓存音频
+
+音频按内容寻址、文件内容不会变化，因此以内容键作为 ETag 并允许浏览器永久缓存：
+重复播放同一单词时浏览器直接使用本地缓存，服务端不再发送任何音频字节。
+
+GET /metrics 以 Prometheus 文本格式返回音频缓存指标（命中率、合成延迟、回退、淘汰等）。
+
+GET /stream?text=&lang=&voice= 以 chunked 编码边合成边返回尚未缓存的音频（首块音频无需等待
+整段合成）；合成结果同时写入存储，之后的播放使用上面的静态地址。
+
+环境变量：
+    DICTATION_AUDIO_SERVER    设为 0 时禁用（播放器回退为 base64 内联）
+    DICTATION_AUDIO_HOST      监听地址，默认 127.0.0.1
+    DICTATION_AUDIO_PORT      监听端口，默认 8502（0 表示自动分配）
+    DICTATION_AUDIO_BASE_URL  浏览器访问音频服务使用的地址（反向代理/远程部署时设置）
+"""
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlencode, urlparse
+
+from src.audio_store import DEFAULT_STORE_DIR, AudioStore
+
+
+CONTENT_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+}
+
+# 内容寻址的文件永不改变
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_PATH_PATTERN = re.compile(r"^/audio/([0-9a-f]{2})/([^/]+)$")
+
+# 流式合成的文本长度上限（单词或短语）
+MAX_STREAM_TEXT = 200
+
+# (文本, 语言, 音色) -> 音频块
+StreamSource = Callable[[str, str, str], Iterator[bytes]]
+
+
+class AudioServer:
+    """在后台线程中运行的音频静态文件服务"""
+
+    def __init__(self, root_dir: str, host: str = "127.0.0.1", port: int = 0,
+                 base_url: Optional[str] = None,
+                 metrics_source: Optional[Callable[[], str]] = None,
+                 stream_source: Optional[StreamSource] = None):
+        """
+        Args:
+            root_dir: 音频存储目录（AudioStore.root_dir）
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+            base_url: 浏览器访问使用的地址，默认为 http://host:port
+            metrics_source: 返回 /metrics 内容的函数，默认使用 set_metrics_source 登记的来源
+            stream_source: /stream 的音频来源，默认使用 set_stream_source 登记的来源
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        self.metrics_source = metrics_source
+        self.stream_source = stream_source
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self.base_url = (base_url or self.local_url).rstrip("/")
+
+    @property
+    def local_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "AudioServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def url_for(self, audio_path: str) -> Optional[str]:
+        """
+        获取音频文件的访问 URL
+
+        Returns:
+            URL，文件不在存储目录中时返回 None
+        """
+        rel = os.path.relpath(os.path.abspath(audio_path), self.root_dir)
+        parts = rel.split(os.sep)
+        if len(parts) != 2 or not _PATH_PATTERN.match(f"/audio/{parts[0]}/{parts[1]}"):
+            return None
+        return f"{self.base_url}/audio/{parts[0]}/{parts[1]}"
+
+    def stream_url(self, text: str, lang: str, voice: str = "") -> str:
+        """边合成边播放的 URL"""
+        return f"{self.base_url}/stream?" + urlencode({"text": text, "lang": lang, "voice": voice})
+
+    def resolve(self, url_path: str) -> Optional[Tuple[str, str]]:
+        """
+        把请求路径解析为 (文件路径, ETag)
+
+        只接受存储目录下 "<分片>/<文件名>" 形式、文件名带内容键的文件。
+        """
+        match = _PATH_PATTERN.match(unquote(urlparse(url_path).path))
+        if not match:
+            return None
+        shard, filename = match.groups()
+        key = AudioStore._parse_key(filename)
+        ext = os.path.splitext(filename)[1]
+        if key is None or not key.startswith(shard) or ext not in CONTENT_TYPES:
+            return None
+
+        path = os.path.join(self.root_dir, shard, filename)
+        if not os.path.isfile(path):
+            return None
+        return path, f'"{key}"'
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == "/metrics":
+                    self._serve_metrics()
+                    return
+                if path == "/stream":
+                    self._serve_stream()
+                    return
+                self._serve(send_body=True)
+
+            def do_HEAD(self):
+                self._serve(send_body=False)
+
+            def do_OPTIONS(self):
+                self.send_response(204)
+                self._send_common_headers()
+                self.send_header("Access-Control-Allow-Methods", "GET, HEAD, OPTIONS")
+                self.send_header("Access-Control-Allow-Headers", "Range, If-None-Match")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _send_common_headers(self):
+                self.send_header("Access-Control-Allow-Origin", "*")
+
+            def _send_empty(self, status: int, headers: Optional[dict] = None):
+                self.send_response(status)
+                self._send_common_headers()
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _serve_metrics(self):
+                source = server.metrics_source or _metrics_source
+                if source is None:
+                    self._send_empty(404)
+                    return
+                try:
+                    body = source().encode("utf-8")
+                except Exception as e:
+                    print(f"导出指标失败: {e}")
+                    self._send_empty(500)
+                    return
+                self.send_response(200)
+                self._send_common_headers()
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Cache-Control", "no-store")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _serve_stream(self):
+                source = server.stream_source or _stream_source
+                query = parse_qs(urlparse(self.path).query)
+                text = query.get("text", [""])[0]
+                lang = query.get("lang", ["en"])[0]
+                voice = query.get("voice", [""])[0]
+                if source is None or not text or len(text) > MAX_STREAM_TEXT or lang not in ("en", "cn"):
+                    self._send_empty(404)
+                    return
+
+                chunks = source(text, lang, voice)
+                try:
+                    # 拿到第一块音频后再发送响应头，合成失败时可以返回错误状态
+                    chunk = next(chunks, None)
+                except Exception as e:
+                    print(f"流式合成失败 {text}: {e}")
+                    self._send_empty(502)
+                    return
+                if chunk is None:
+                    self._send_empty(404)
+                    return
+
+                self.send_response(200)
+                self._send_common_headers()
+                self.send_header("Content-Type", CONTENT_TYPES[".mp3"])
+                self.send_header("Cache-Control", "no-store")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    while chunk is not None:
+                        if chunk:
+                            self.wfile.write(b"%X\r\n%s\r\n" % (len(chunk), chunk))
+                        chunk = next(chunks, None)
+                    self.wfile.write(b"0\r\n\r\n")
+                except Exception as e:
+                    # 客户端断开或合成中途失败：不发送结束块，浏览器会当作不完整的响应
+                    print(f"流式播放中断 {text}: {e}")
+                    self.close_connection = True
+                finally:
+                    # 提前结束时让来源丢弃不完整的文件
+                    close = getattr(chunks, "close", None)
+                    if close:
+                        close()
+
+            def _serve(self, send_body: bool):
+                resolved = server.resolve(self.path)
+                if resolved is None:
+                    self._send_empty(404)
+                    return
+                path, etag = resolved
+
+                cache_headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+                if etag in (self.headers.get("If-None-Match") or ""):
+                    self._send_empty(304, cache_headers)
+                    return
+
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    self._send_empty(404)
+                    return
+
+                start, end = 0, size - 1
+                status = 200
+                byte_range = self.headers.get("Range")
+                if byte_range:
+                    parsed = self._parse_range(byte_range, size)
+                    if parsed is None:
+                        self._send_empty(416, {"Content-Range": f"bytes */{size}"})
+                        return
+                    start, end = parsed
+                    status = 206
+
+                self.send_response(status)
+                self._send_common_headers()
+                for name, value in cache_headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", CONTENT_TYPES[os.path.splitext(path)[1]])
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Length", str(end - start + 1))
+                if status == 206:
+                    self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+                self.end_headers()
+
+                if send_body:
+                    with open(path, "rb") as f:
+                        f.seek(start)
+                        self.wfile.write(f.read(end - start + 1))
+
+            @staticmethod
+            def _parse_range(value: str, size: int) -> Optional[Tuple[int, int]]:
+                """解析单个 bytes 区间（不支持多区间）"""
+                match = re.match(r"^bytes=(\d*)-(\d*)$", value.strip())
+                if not match or match.groups() == ("", ""):
+                    return None
+                first, last = match.groups()
+                if first == "":
+                    # 后缀区间：最后 N 个字节
+                    start, end = max(0, size - int(last)), size - 1
+                else:
+                    start = int(first)
+                    end = min(int(last), size - 1) if last else size - 1
+                if start > end or start >= size:
+                    return None
+                return start, end
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+# 进程级共享的音频服务（所有会话共用）
+_audio_server: Optional[AudioServer] = None
+_metrics_source: Optional[Callable[[], str]] = None
+_stream_source: Optional[StreamSource] = None
+_audio_server_failed = False
+_audio_server_lock = threading.Lock()
+
+
+def set_metrics_source(source: Optional[Callable[[], str]]):
+    """登记 /metrics 的默认来源（进程级共享的音频缓存创建时调用）"""
+    global _metrics_source
+    _metrics_source = source
+
+
+def set_stream_source(source: Optional[StreamSource]):
+    """登记 /stream 的默认来源（进程级共享的音频缓存创建时调用）"""
+    global _stream_source
+    _stream_source = source
+
+
+def get_audio_server() -> Optional[AudioServer]:
+    """
+    获取（必要时启动）进程级共享的音频服务
+
+    Returns:
+        音频服务实例，禁用或端口无法绑定时返回 None
+    """
+    global _audio_server, _audio_server_failed
+    if _audio_server is not None or _audio_server_failed:
+        return _audio_server
+
+    with _audio_server_lock:
+        if _audio_server is None and not _audio_server_failed:
+            if os.getenv("DICTATION_AUDIO_SERVER", "1") == "0":
+                _audio_server_failed = True
+                return None
+            try:
+                _audio_server = AudioServer(
+                    os.getenv("DICTATION_AUDIO_CACHE_DIR", DEFAULT_STORE_DIR),
+                    host=os.getenv("DICTATION_AUDIO_HOST", "127.0.0.1"),
+                    port=int(os.getenv("DICTATION_AUDIO_PORT", "8502")),
+                    base_url=os.getenv("DICTATION_AUDIO_BASE_URL") or None,
+                ).start()
+            except OSError as e:
+                print(f"音频服务启动失败，回退为内联播放: {e}")
+                _audio_server_failed = True
+    return _audio_server
@@ -0,0 +1,328 @@
+"""
+持久化音频存储模块 - 按内容寻址的 TTS 音频仓库
+
+音频以 (文本, 语言, 引擎, 音色, 模型, 语速, 采样率) 的哈希作为键保存在磁盘上，
+进程重启、切换词库后依然可以直接命中，避免重复调用云端 TTS。
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+
+# 默认存储目录与容量，可通过环境变量覆盖
+DEFAULT_STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "audio_cache"
+)
+DEFAULT_MAX_MB = 512
+
+# 未完成写入的临时文件超过该时间（秒）视为残留，扫描时清理
+STALE_TMP_SECONDS = 3600
+
+KEY_LENGTH = 32
+
+
+class AudioStore:
+    """按内容寻址、容量受限（LRU 淘汰）的音频文件仓库"""
+
+    def __init__(self, root_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        初始化音频仓库
+
+        Args:
+            root_dir: 存储目录，默认读取环境变量 DICTATION_AUDIO_CACHE_DIR，
+                否则为 data/audio_cache
+            max_bytes: 容量上限（字节），默认读取环境变量 DICTATION_AUDIO_CACHE_MAX_MB
+        """
+        if root_dir is None:
+            root_dir = os.getenv("DICTATION_AUDIO_CACHE_DIR", DEFAULT_STORE_DIR)
+        if max_bytes is None:
+            max_mb = float(os.getenv("DICTATION_AUDIO_CACHE_MAX_MB", DEFAULT_MAX_MB))
+            max_bytes = int(max_mb * 1024 * 1024)
+
+        self.root_dir = os.path.abspath(root_dir)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (path, size)，按最近访问顺序排列（末尾为最新）
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        # 淘汰回调 (键, 字节数)，供指标统计使用
+        self.on_evict: Optional[Callable[[str, int], None]] = None
+
+        os.makedirs(self.root_dir, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def make_key(text: str, lang: str, engine: str, voice: str,
+                 model: str = "", speed: float = 1.0, sample_rate: int = 0,
+                 bitrate: int = 0) -> str:
+        """
+        生成音频内容键
+
+        Args:
+            text: 合成文本
+            lang: 语言（en/cn）
+            engine: 引擎名称（minimax/edge/...）
+            voice: 音色 ID
+            model: 模型名称
+            speed: 语速
+            sample_rate: 采样率
+            bitrate: 比特率
+
+        Returns:
+            十六进制哈希字符串
+        """
+        raw = json.dumps(
+            [text, lang, engine, voice, model, round(float(speed), 3), int(sample_rate), int(bitrate)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:KEY_LENGTH]
+
+    @staticmethod
+    def _slug(text: str) -> str:
+        """
+        生成便于人工辨认的文件名前缀（仅用于可读性，唯一性由键保证）
+
+        只保留字母数字并统一小写，同一键的不同写法（"Ice Cream"、"ice-cream"）
+        得到同一文件名，其他进程写入的文件才能按 path_for 找到。
+        """
+        safe = "".join(c if c.isalnum() else " " for c in unicodedata.normalize("NFKC", text))
+        safe = "-".join(safe.lower().split())
+        return safe[:40] or "clip"
+
+    @staticmethod
+    def _parse_key(filename: str) -> Optional[str]:
+        """从文件名中解析内容键"""
+        stem, _ = os.path.splitext(filename)
+        key = stem.rsplit("_", 1)[-1]
+        if len(key) == KEY_LENGTH and all(c in "0123456789abcdef" for c in key):
+            return key
+        return None
+
+    @classmethod
+    def key_of(cls, path: str) -> Optional[str]:
+        """从音频文件路径解析其内容键"""
+        return cls._parse_key(os.path.basename(path))
+
+    def path_for(self, key: str, text: str = "", ext: str = "mp3") -> str:
+        """获取键对应的目标文件路径（文件不一定存在）"""
+        return os.path.join(self.root_dir, key[:2], f"{self._slug(text)}_{key}.{ext}")
+
+    def _scan(self):
+        """扫描磁盘，重建索引（按修改时间近似恢复 LRU 顺序）"""
+        found = []
+        now = time.time()
+        for shard in os.scandir(self.root_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.endswith(".tmp"):
+                    if now - stat.st_mtime > STALE_TMP_SECONDS:
+                        self._remove_file(entry.path)
+                    continue
+                key = self._parse_key(entry.name)
+                if key:
+                    found.append((stat.st_mtime, key, entry.path, stat.st_size))
+
+        found.sort()
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            for _, key, path, size in found:
+                self._entries[key] = (path, size)
+                self._total_bytes += size
+        self._enforce_limit()
+
+    def get(self, key: str, text: str = "", ext: str = "mp3") -> Optional[str]:
+        """
+        查找音频并刷新其 LRU 位置
+
+        Args:
+            key: 内容键
+            text: 原始文本（用于发现其他进程写入的文件）
+            ext: 文件扩展名
+
+        Returns:
+            文件路径，未命中返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            # 可能是其他进程（如预热脚本）写入的文件
+            path = self.path_for(key, text, ext)
+            if not os.path.exists(path):
+                return None
+            self._track(key, path)
+            return path
+
+        path = entry[0]
+        if not os.path.exists(path):
+            self._forget(key)
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return path
+
+    def contains(self, key: str) -> bool:
+        """检查键是否存在（不影响 LRU 顺序）"""
+        with self._lock:
+            return key in self._entries
+
+    def put_bytes(self, key: str, data: bytes, text: str = "", ext: str = "mp3") -> str:
+        """原子写入音频字节"""
+        def write(tmp_path: str) -> str:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            return tmp_path
+
+        return self.put_with(key, write, text=text, ext=ext)
+
+    def put_with(self, key: str, writer: Callable[[str], Optional[str]],
+                 text: str = "", ext: str = "mp3") -> str:
+        """
+        通过回调写入音频，写入完成后原子提交
+
+        Args:
+            key: 内容键
+            writer: 接收临时文件路径并向其写入音频的回调（可返回实际写入路径）
+            text: 原始文本
+            ext: 文件扩展名
+
+        Returns:
+            仓库中的最终文件路径
+        """
+        tmp_path = self.reserve(key, text, ext)
+        try:
+            written = writer(tmp_path) or tmp_path
+            if written != tmp_path:
+                shutil.move(written, tmp_path)
+        except BaseException:
+            self.discard(tmp_path)
+            raise
+        return self.commit(key, tmp_path, text, ext)
+
+    def reserve(self, key: str, text: str = "", ext: str = "mp3") -> str:
+        """在目标目录分配临时文件，供调用方（如异步合成）自行写入后 commit"""
+        final_path = self.path_for(key, text, ext)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(final_path))
+        os.close(fd)
+        return tmp_path
+
+    def commit(self, key: str, tmp_path: str, text: str = "", ext: str = "mp3") -> str:
+        """把写完的临时文件原子地提交为正式条目"""
+        final_path = self.path_for(key, text, ext)
+        try:
+            if os.path.getsize(tmp_path) == 0:
+                raise RuntimeError("生成的音频文件为空")
+            os.replace(tmp_path, final_path)
+        except BaseException:
+            self.discard(tmp_path)
+            raise
+
+        self._track(key, final_path)
+        self._enforce_limit(keep=key)
+        return final_path
+
+    def discard(self, tmp_path: str):
+        """放弃未提交的临时文件"""
+        self._remove_file(tmp_path)
+
+    def _track(self, key: str, path: str):
+        """登记文件到索引"""
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._total_bytes -= old[1]
+            self._entries[key] = (path, size)
+            self._total_bytes += size
+
+    def _forget(self, key: str):
+        """从索引中移除"""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._total_bytes -= old[1]
+
+    def _enforce_limit(self, keep: Optional[str] = None):
+        """超过容量上限时按 LRU 顺序淘汰"""
+        victims = []
+        with self._lock:
+            while self._total_bytes > self.max_bytes and self._entries:
+                key, (path, size) = next(iter(self._entries.items()))
+                if key == keep and len(self._entries) == 1:
+                    break
+                if key == keep:
+                    self._entries.move_to_end(key)
+                    continue
+                del self._entries[key]
+                self._total_bytes -= size
+                self.evictions += 1
+                self.evicted_bytes += size
+                victims.append((key, path, size))
+
+        for key, path, size in victims:
+            self._remove_file(path)
+            if self.on_evict is not None:
+                self.on_evict(key, size)
+
+    @staticmethod
+    def _remove_file(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """清空仓库中的全部音频"""
+        with self._lock:
+            paths = [path for path, _ in self._entries.values()]
+            self._entries.clear()
+            self._total_bytes = 0
+        for path in paths:
+            self._remove_file(path)
+
+    def get_usage(self) -> Dict[str, int]:
+        """返回仓库占用情况"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "evicted_bytes": self.evicted_bytes,
+            }
+
+    def live_paths(self) -> set:
+        """索引中所有文件的路径（不访问磁盘）"""
+        with self._lock:
+            return {path for path, _ in self._entries.values()}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
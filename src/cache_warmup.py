@@ -0,0 +1,206 @@
+"""
+音频缓存预热 - 部署时为词库预先合成音频
+
+    python -m src.cache_warmup cet4 cet6 gaokao middle
+    python -m src.cache_warmup --all-builtin --engines minimax edge --voice-en expressive_narrator male_qn_qingse
+    python -m src.cache_warmup --list
+
+音频写入持久化存储（与应用共用，见 DICTATION_AUDIO_CACHE_DIR），已存在的音频直接跳过，
+因此中断（Ctrl+C）后重新运行会从中断处继续。
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from data.vocabulary_store import VocabularyStore
+from src.audio_cache import AudioCache
+from src.audio_profile import AUDIO_PROFILES
+from src.minimax_tts import MiniMaxTTSEngine
+from src.text_normalizer import normalize_text
+
+
+def resolve_vocabulary(store: VocabularyStore, name: str) -> Optional[Tuple[str, List[Dict]]]:
+    """
+    按名称查找词库：预置词库的文件名（如 cet4）或显示名称，其次是用户词库
+
+    Returns:
+        (词库名称, 单词列表)，找不到时返回 None
+    """
+    for vocab in store.list_builtin_vocabularies():
+        stem = os.path.splitext(os.path.basename(vocab["file_path"]))[0]
+        if name in (stem, vocab["name"]):
+            with open(vocab["file_path"], "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return vocab["name"], data.get("words", [])
+
+    data = store.load_vocabulary(name)
+    if data is not None:
+        return data.get("name", name), data.get("words", [])
+    return None
+
+
+def warmup_plan(words: List[Dict], engines: List[str], voices_en: List[str],
+                voices_cn: List[str], accents: List[str]) -> List[Dict]:
+    """
+    展开需要预热的音色组合
+
+    英文与中文分开预热：中文音频与英文音色、口音无关，不重复合成。
+
+    Returns:
+        [{"label", "mode", "kwargs"}, ...]，mode 为 preload_words_async 的听写模式
+    """
+    plan = []
+    if "minimax" in engines:
+        for voice in voices_en:
+            plan.append({"label": f"minimax en {voice}", "mode": "en_to_cn",
+                         "kwargs": {"use_minimax": True, "voice_en": voice}})
+        for voice in voices_cn:
+            plan.append({"label": f"minimax cn {voice}", "mode": "cn_to_en",
+                         "kwargs": {"use_minimax": True, "voice_cn": voice}})
+    if "edge" in engines:
+        for accent in accents:
+            plan.append({"label": f"edge en {accent}", "mode": "en_to_cn",
+                         "kwargs": {"use_minimax": False, "accent": accent}})
+        plan.append({"label": "edge cn", "mode": "cn_to_en",
+                     "kwargs": {"use_minimax": False}})
+    return plan
+
+
+def count_cached(cache: AudioCache, words: List[Dict], mode: str, kwargs: Dict) -> Tuple[int, int]:
+    """统计 (需要的音频数, 已缓存的音频数)，与预加载判断是否需要合成的规则相同"""
+    tasks = {(normalize_text(word, lang), lang) for word, lang in AudioCache.word_tasks(words, mode)}
+    cached = sum(1 for word, lang in tasks if cache.is_cached(word, lang, **kwargs))
+    return len(tasks), cached
+
+
+def run_warmup(cache: AudioCache, words: List[Dict], plan: List[Dict]) -> Dict:
+    """
+    按计划依次预热，打印进度与吞吐量
+
+    Returns:
+        {"total", "cached", "synthesized", "errors", "elapsed", "interrupted"}
+    """
+    summary = {"total": 0, "cached": 0, "synthesized": 0, "errors": 0,
+               "elapsed": 0.0, "interrupted": False}
+
+    for step in plan:
+        total, cached = count_cached(cache, words, step["mode"], step["kwargs"])
+        summary["total"] += total
+        summary["cached"] += cached
+        if cached == total:
+            print(f"[{step['label']}] {total} 条均已缓存，跳过")
+            continue
+
+        print(f"[{step['label']}] 共 {total} 条，已缓存 {cached} 条，开始合成...")
+        start = time.perf_counter()
+        job = cache.preload_words_async(words, step["mode"], **step["kwargs"])
+        try:
+            for status in job.iter_progress(timeout=5):
+                print(f"\r  {status['completed']}/{status['total']}  错误 {status['errors']}",
+                      end="", flush=True)
+        except KeyboardInterrupt:
+            print("\n已中断，等待进行中的合成完成（重新运行即可继续）...")
+            job.cancel()
+            job.wait()
+            summary["interrupted"] = True
+        elapsed = time.perf_counter() - start
+        print()
+
+        status = job.progress()
+        synthesized = count_cached(cache, words, step["mode"], step["kwargs"])[1] - cached
+        summary["synthesized"] += synthesized
+        summary["errors"] += status["errors"]
+        summary["elapsed"] += elapsed
+        rate = synthesized / elapsed if elapsed else 0.0
+        print(f"  合成 {synthesized} 条，错误 {status['errors']} 条，"
+              f"耗时 {elapsed:.1f}s，{rate:.1f} 条/秒")
+
+        if summary["interrupted"]:
+            break
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="为词库预先合成音频，填充持久化缓存")
+    parser.add_argument("vocabularies", nargs="*",
+                        help="词库名称：预置词库文件名（cet4/cet6/gaokao/middle）、显示名称或用户词库名")
+    parser.add_argument("--all-builtin", action="store_true", help="预热所有预置词库")
+    parser.add_argument("--list", action="store_true", help="列出可用的词库")
+    parser.add_argument("--engines", nargs="+", choices=["minimax", "edge"], default=["minimax"],
+                        help="合成引擎")
+    parser.add_argument("--voice-en", nargs="+", default=["expressive_narrator"],
+                        choices=list(MiniMaxTTSEngine.ENGLISH_VOICES), help="MiniMax 英文音色")
+    parser.add_argument("--voice-cn", nargs="+", default=["xiaoxiao"],
+                        choices=list(MiniMaxTTSEngine.CHINESE_VOICES), help="MiniMax 中文音色")
+    parser.add_argument("--accent", nargs="+", choices=["us", "uk"], default=["us"],
+                        help="Edge 英文口音")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="并发合成数，默认读取 DICTATION_PRELOAD_WORKERS（4）")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="MiniMax 每个请求合成的单词数，默认读取 DICTATION_TTS_BATCH_SIZE（1）")
+    parser.add_argument("--profile", choices=list(AUDIO_PROFILES), default=None,
+                        help="音频规格，默认读取 DICTATION_AUDIO_PROFILE（compact）")
+    parser.add_argument("--cache-dir", default=None,
+                        help="持久化存储目录，默认读取 DICTATION_AUDIO_CACHE_DIR")
+    parser.add_argument("--vocab-dir", default=None, help="用户词库目录（默认 data/vocabularies）")
+    args = parser.parse_args(argv)
+
+    store = VocabularyStore(args.vocab_dir)
+
+    if args.list:
+        print("预置词库：")
+        for vocab in store.list_builtin_vocabularies():
+            stem = os.path.splitext(os.path.basename(vocab["file_path"]))[0]
+            print(f"  {stem:<10} {vocab['name']}（{vocab['word_count']} 词）")
+        print("用户词库：")
+        for vocab in store.list_vocabularies():
+            print(f"  {vocab['name']}（{vocab.get('word_count', 0)} 词）")
+        return 0
+
+    names = list(args.vocabularies)
+    if args.all_builtin:
+        names += [os.path.splitext(os.path.basename(v["file_path"]))[0]
+                  for v in store.list_builtin_vocabularies()]
+    if not names:
+        parser.error("请指定词库名称或 --all-builtin")
+
+    words: List[Dict] = []
+    seen = set()
+    for name in names:
+        resolved = resolve_vocabulary(store, name)
+        if resolved is None:
+            print(f"找不到词库: {name}")
+            return 2
+        vocab_name, vocab_words = resolved
+        print(f"词库 {vocab_name}: {len(vocab_words)} 词")
+        for word in vocab_words:
+            key = (word.get("en", ""), word.get("cn", ""))
+            if key not in seen:
+                seen.add(key)
+                words.append(word)
+
+    cache = AudioCache(cache_dir=args.cache_dir, max_workers=args.workers,
+                       batch_size=args.batch_size, audio_profile=args.profile)
+    print(f"共 {len(words)} 个单词，存储目录 {cache.cache_dir}，"
+          f"音频规格 {cache.profile.name}，并发 {cache.max_workers}")
+
+    plan = warmup_plan(words, args.engines, args.voice_en, args.voice_cn, args.accent)
+    summary = run_warmup(cache, words, plan)
+
+    rate = summary["synthesized"] / summary["elapsed"] if summary["elapsed"] else 0.0
+    print(f"\n完成：共 {summary['total']} 条音频，原已缓存 {summary['cached']} 条，"
+          f"本次合成 {summary['synthesized']} 条，错误 {summary['errors']} 条，"
+          f"合成耗时 {summary['elapsed']:.1f}s（{rate:.1f} 条/秒）")
+    usage = cache.store.get_usage()
+    print(f"存储占用 {usage['entries']} 个文件，{usage['bytes'] / 1024 / 1024:.1f} MB")
+
+    if summary["interrupted"]:
+        return 130
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
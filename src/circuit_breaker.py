@@ -0,0 +1,162 @@
+"""
+熔断器 - 按失败率与延迟预算隔离不健康的后端
+
+三种状态：
+- closed: 正常放行，在最近 window 次调用中统计失败率（超过延迟预算的调用也算失败）
+- open: 失败率达到阈值后断开，cooldown 秒内直接拒绝，调用方立即换用下一个后端
+- half_open: 冷却结束后只放行一个探测请求，成功则恢复 closed，失败则重新 open
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+class CircuitBreaker:
+    """线程安全的失败率熔断器"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_calls: int = 3,
+                 cooldown: float = 30.0, latency_budget: Optional[float] = None):
+        """
+        Args:
+            failure_rate: 断开阈值（最近 window 次调用中失败所占比例）
+            window: 统计失败率的调用次数
+            min_calls: 至少有多少次调用才开始判断（避免一次失败就断开）
+            cooldown: 断开后多少秒允许探测
+            latency_budget: 单次调用的延迟预算（秒），超出的成功调用按失败计，None 表示不限
+        """
+        self.failure_rate = failure_rate
+        self.window = max(1, window)
+        self.min_calls = max(1, min_calls)
+        self.cooldown = cooldown
+        self.latency_budget = latency_budget
+
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=self.window)  # True 表示失败
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_started = None  # 半开状态下探测请求的开始时间
+        self.successes = 0
+        self.failures = 0
+        self.rejected = 0
+        self.slow_calls = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == self.OPEN and now - self._opened_at >= self.cooldown:
+            return self.HALF_OPEN
+        return self._state
+
+    def ready(self) -> bool:
+        """是否值得尝试（不占用探测名额，供路由排序使用）"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN:
+                return not self._probe_pending(now)
+            return False
+
+    def allow(self) -> bool:
+        """
+        申请一次调用
+
+        Returns:
+            True 表示可以调用（调用结束后必须 record_success 或 record_failure），
+            False 表示熔断中，应直接换用其他后端
+        """
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_pending(now):
+                self._state = self.HALF_OPEN
+                self._probe_started = now
+                return True
+            self.rejected += 1
+            return False
+
+    def _probe_pending(self, now: float) -> bool:
+        # 探测请求迟迟没有结果（例如调用方异常退出）时，超过冷却时间后允许新的探测
+        return (self._state == self.HALF_OPEN and self._probe_started is not None
+                and now - self._probe_started < self.cooldown)
+
+    def record_success(self, latency: Optional[float] = None):
+        """记录一次成功；latency 超出预算时按失败计"""
+        if self.latency_budget is not None and latency is not None and latency > self.latency_budget:
+            with self._lock:
+                self.slow_calls += 1
+            self.record_failure()
+            return
+
+        with self._lock:
+            self.successes += 1
+            if self._state == self.OPEN:
+                # 断开前发出的调用迟到的结果，不影响冷却
+                return
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._probe_started = None
+                self._outcomes.clear()
+            self._outcomes.append(False)
+
+    def record_failure(self):
+        """记录一次失败，失败率达到阈值时断开"""
+        with self._lock:
+            now = time.monotonic()
+            self.failures += 1
+            if self._state == self.OPEN:
+                return
+            if self._state == self.HALF_OPEN:
+                # 探测失败：重新开始冷却
+                self._trip(now)
+                return
+            self._outcomes.append(True)
+            if len(self._outcomes) >= self.min_calls and \
+                    sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._trip(now)
+
+    def _trip(self, now: float):
+        if self._state == self.CLOSED:
+            self.times_opened += 1
+        self._state = self.OPEN
+        self._opened_at = now
+        self._probe_started = None
+        self._outcomes.clear()
+
+    def reset(self):
+        """恢复为 closed 并清空统计窗口"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._probe_started = None
+            self._outcomes.clear()
+
+    def snapshot(self) -> Dict:
+        """当前状态与计数"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            recent = len(self._outcomes)
+            return {
+                "state": state,
+                "failure_rate": (sum(self._outcomes) / recent) if recent else 0.0,
+                "recent_calls": recent,
+                "retry_in": max(0.0, self.cooldown - (now - self._opened_at)) if state == self.OPEN else 0.0,
+                "successes": self.successes,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+                "latency_budget": self.latency_budget,
+            }
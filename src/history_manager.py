@@ -1,56 +1,63 @@
 """
 学习历史记录管理模块
 记录每次听写的成绩、时间、词库等信息
+
+统计数据（见 src.history_stats）在每次增删记录时增量更新，并由存储后端与记录一起保存，
+get_statistics / get_wrong_words_frequency 不再遍历全部记录。
 """
-import json
-import os
+import threading
+import uuid
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from src.history_stats import RECENT_COUNT, HistoryStats
+from src.storage import HistoryBackend, create_history_backend
+
+# 写入记录与更新统计作为一个整体串行执行（多个会话共用同一份数据）
+_write_lock = threading.RLock()
+
 
 class HistoryManager:
     """历史记录管理类"""
 
-    def __init__(self, history_file: str = None):
+    def __init__(self, history_file: str = None, backend: Optional[HistoryBackend] = None):
         """
         初始化历史记录管理器
 
         Args:
             history_file: 历史记录文件路径，默认为 data/history.json
-        """
-        if history_file is None:
-            # 获取项目根目录
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            project_dir = os.path.dirname(current_dir)
-            history_file = os.path.join(project_dir, "data", "history.json")
-
-        self.history_file = history_file
-
-        # 确保目录存在
-        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-
-        # 如果文件不存在，创建空记录
-        if not os.path.exists(self.history_file):
-            self._save_data({"records": []})
-
-    def _load_data(self) -> Dict:
-        """加载历史记录数据"""
-        try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"加载历史记录失败: {e}")
-            return {"records": []}
-
-    def _save_data(self, data: Dict) -> bool:
-        """保存历史记录数据"""
-        try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            return True
-        except Exception as e:
-            print(f"保存历史记录失败: {e}")
-            return False
+                （指定文件时总是使用 JSON 文件，否则按 DICTATION_STORAGE 选择后端）
+            backend: 存储后端，默认见 src.storage
+        """
+        self.backend = backend or create_history_backend(history_file)
+        self._cached_stats: Optional[HistoryStats] = None
+
+    def _stats(self) -> HistoryStats:
+        """
+        当前统计数据
+
+        依次使用内存中的、后端保存的统计数据，版本（fingerprint）与数据不一致时
+        （例如其他进程写入过，或旧版本的数据）从全部记录重建一次。
+        """
+        with _write_lock:
+            fingerprint = self.backend.fingerprint()
+            stats = self._cached_stats
+            if stats is None or stats.fingerprint != fingerprint:
+                saved = self.backend.load_stats()
+                stats = HistoryStats.from_dict(saved) if saved else None
+                if stats is None or stats.fingerprint != fingerprint:
+                    stats = HistoryStats.build(self.backend.list())
+                    self._commit_stats(stats)
+                self._cached_stats = stats
+            return stats
+
+    def _commit_stats(self, stats: HistoryStats):
+        """写入记录后保存统计数据（记录已写入，版本取写入后的值）"""
+        if stats.recent_stale:
+            stats.set_recent(self.backend.list(limit=RECENT_COUNT))
+        stats.fingerprint = self.backend.fingerprint()
+        self.backend.save_stats(stats.to_dict())
+        self._cached_stats = stats
 
     def add_record(
         self,
@@ -77,10 +84,10 @@ class HistoryManager:
         Returns:
             str: 记录ID
         """
-        data = self._load_data()
-
-        # 生成记录ID（时间戳）
-        record_id = datetime.now().strftime("%Y%m%d%H%M%S")
+        # 生成记录ID（时间戳 + 随机后缀：同一秒内的多条记录 ID 也不重复，
+        # 否则删除时会删掉所有同 ID 的记录，统计数据却只减去一条）
+        now = datetime.now()
+        record_id = f"{now:%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
 
         # 计算分数
         score = round((correct_count / total_words * 100) if total_words > 0 else 0, 2)
@@ -88,7 +95,7 @@ class HistoryManager:
         # 构建记录
         record = {
             "id": record_id,
-            "date": datetime.now().isoformat(),
+            "date": now.isoformat(),
             "mode": mode,
             "vocabulary_name": vocabulary_name,
             "total_words": total_words,
@@ -99,13 +106,14 @@ class HistoryManager:
             "user_answers": user_answers or {}
         }
 
-        # 添加到记录列表
-        data["records"].append(record)
-
-        # 保存
-        if self._save_data(data):
-            return record_id
-        return ""
+        # 追加保存
+        with _write_lock:
+            stats = self._stats()
+            if not self.backend.append(record):
+                return ""
+            stats.add(record)
+            self._commit_stats(stats)
+        return record_id
 
     def get_all_records(self, limit: int = None) -> List[Dict]:
         """
@@ -117,15 +125,7 @@ class HistoryManager:
         Returns:
             List[Dict]: 历史记录列表，按时间倒序
         """
-        data = self._load_data()
-        records = data.get("records", [])
-
-        # 按时间倒序排序
-        records.sort(key=lambda x: x.get("date", ""), reverse=True)
-
-        if limit:
-            return records[:limit]
-        return records
+        return self.backend.list(limit)
 
     def get_record_by_id(self, record_id: str) -> Optional[Dict]:
         """
@@ -137,14 +137,7 @@ class HistoryManager:
         Returns:
             Dict: 记录详情，不存在返回None
         """
-        data = self._load_data()
-        records = data.get("records", [])
-
-        for record in records:
-            if record.get("id") == record_id:
-                return record
-
-        return None
+        return self.backend.get(record_id)
 
     def delete_record(self, record_id: str) -> bool:
         """
@@ -156,17 +149,14 @@ class HistoryManager:
         Returns:
             bool: 是否删除成功
         """
-        data = self._load_data()
-        records = data.get("records", [])
-
-        # 过滤掉要删除的记录
-        new_records = [r for r in records if r.get("id") != record_id]
-
-        if len(new_records) < len(records):
-            data["records"] = new_records
-            return self._save_data(data)
-
-        return False
+        with _write_lock:
+            stats = self._stats()
+            record = self.backend.get(record_id)
+            if record is None or not self.backend.delete(record_id):
+                return False
+            stats.remove(record)
+            self._commit_stats(stats)
+        return True
 
     def clear_all_records(self) -> bool:
         """
@@ -175,7 +165,11 @@ class HistoryManager:
         Returns:
             bool: 是否清空成功
         """
-        return self._save_data({"records": []})
+        with _write_lock:
+            if not self.backend.clear():
+                return False
+            self._commit_stats(HistoryStats())
+        return True
 
     def get_statistics(self) -> Dict:
         """
@@ -190,49 +184,12 @@ class HistoryManager:
                 "average_score": 平均分,
                 "total_duration": 总时长（秒）,
                 "mode_stats": {模式: 次数},
-                "recent_scores": [最近10次分数]
+                "score_distribution": {分数段: 次数},
+                "recent_scores": [最近10次分数],
+                "recent_average": 最近10次平均分
             }
         """
-        records = self.get_all_records()
-
-        if not records:
-            return {
-                "total_sessions": 0,
-                "total_words": 0,
-                "total_correct": 0,
-                "average_score": 0,
-                "total_duration": 0,
-                "mode_stats": {},
-                "recent_scores": []
-            }
-
-        total_sessions = len(records)
-        total_words = sum(r.get("total_words", 0) for r in records)
-        total_correct = sum(r.get("correct_count", 0) for r in records)
-        total_duration = sum(r.get("duration_seconds", 0) for r in records)
-
-        # 计算平均分
-        scores = [r.get("score", 0) for r in records]
-        average_score = round(sum(scores) / len(scores), 2) if scores else 0
-
-        # 统计各模式次数
-        mode_stats = {}
-        for r in records:
-            mode = r.get("mode", "unknown")
-            mode_stats[mode] = mode_stats.get(mode, 0) + 1
-
-        # 最近10次分数（按时间倒序）
-        recent_scores = [r.get("score", 0) for r in records[:10]]
-
-        return {
-            "total_sessions": total_sessions,
-            "total_words": total_words,
-            "total_correct": total_correct,
-            "average_score": average_score,
-            "total_duration": total_duration,
-            "mode_stats": mode_stats,
-            "recent_scores": recent_scores
-        }
+        return self._stats().summary()
 
     def get_wrong_words_frequency(self, limit: int = 20) -> List[Dict]:
         """
@@ -242,32 +199,9 @@ class HistoryManager:
             limit: 返回前N个高频错词
 
         Returns:
-            List[Dict]: [{"word": "apple", "cn": "苹果", "count": 5}, ...]
+            List[Dict]: [{"en": "apple", "cn": "苹果", "count": 5}, ...]
         """
-        records = self.get_all_records()
-
-        # 统计错词频率
-        wrong_freq = {}
-        for record in records:
-            wrong_words = record.get("wrong_words", [])
-            for word in wrong_words:
-                en = word.get("en", "")
-                cn = word.get("cn", "")
-                key = f"{en}|{cn}"
-
-                if key not in wrong_freq:
-                    wrong_freq[key] = {
-                        "en": en,
-                        "cn": cn,
-                        "count": 0
-                    }
-                wrong_freq[key]["count"] += 1
-
-        # 转换为列表并排序
-        result = list(wrong_freq.values())
-        result.sort(key=lambda x: x["count"], reverse=True)
-
-        return result[:limit]
+        return self._stats().wrong_words.top(limit)
 
     def export_to_csv(self, output_file: str) -> bool:
         """
@@ -0,0 +1,215 @@
+"""
+历史记录统计 - 随记录增删增量更新的汇总数据
+
+HistoryManager 在 add_record / delete_record 时更新汇总，并通过存储后端与数据一起保存，
+统计页面读取汇总即可，不再遍历全部历史记录：
+- 总次数、总单词数、总正确数、总时长、分数分布、各模式次数：O(1) 更新
+- 最近 10 次分数：新增时 O(1)；删除其中一条时从存储中补齐（只读取最近 10 条）
+- 高频错词：按错误次数分桶，加减一次 O(1)，取前 K 个无需排序
+"""
+from typing import Dict, List, Optional
+
+# 分数分布区间（名称, 下限），从高到低
+SCORE_BANDS = (("90-100", 90), ("80-89", 80), ("70-79", 70), ("60-69", 60), ("0-59", 0))
+
+RECENT_COUNT = 10
+
+
+def score_band(score: float) -> str:
+    for name, low in SCORE_BANDS:
+        if score >= low:
+            return name
+    return SCORE_BANDS[-1][0]
+
+
+class WrongWordCounter:
+    """
+    错词出现次数
+
+    按次数分桶（与 LFU 缓存相同的结构）：次数加减只需在相邻的桶之间移动，
+    取前 K 个从最高的桶向下读取。次数相同的单词按达到该次数的先后排列。
+    """
+
+    def __init__(self):
+        self._words: Dict[str, Dict] = {}  # "en|cn" -> {"en", "cn", "count"}
+        self._buckets: Dict[int, Dict[str, None]] = {}  # 次数 -> 有序的键集合
+        self._max = 0
+
+    def add(self, en: str, cn: str, delta: int = 1):
+        """次数加 delta（减到 0 时移除）"""
+        key = f"{en}|{cn}"
+        entry = self._words.get(key)
+        old = entry["count"] if entry else 0
+        new = old + delta
+        if old:
+            bucket = self._buckets[old]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[old]
+        if new <= 0:
+            self._words.pop(key, None)
+        else:
+            if entry is None:
+                entry = self._words[key] = {"en": en, "cn": cn, "count": 0}
+            entry["count"] = new
+            self._buckets.setdefault(new, {})[key] = None
+            self._max = max(self._max, new)
+        while self._max and self._max not in self._buckets:
+            self._max -= 1
+
+    def top(self, limit: int) -> List[Dict]:
+        """次数最多的 limit 个 [{"en", "cn", "count"}, ...]"""
+        result = []
+        count = self._max
+        while count > 0 and len(result) < limit:
+            for key in self._buckets.get(count, ()):
+                result.append(dict(self._words[key]))
+                if len(result) >= limit:
+                    break
+            count -= 1
+        return result
+
+    def to_list(self) -> List[Dict]:
+        return self.top(len(self._words))
+
+    @classmethod
+    def from_list(cls, entries: List[Dict]) -> "WrongWordCounter":
+        counter = cls()
+        for entry in entries:
+            counter.add(entry["en"], entry["cn"], entry["count"])
+        return counter
+
+
+class HistoryStats:
+    """历史记录的汇总数据"""
+
+    def __init__(self):
+        self.total_sessions = 0
+        self.total_words = 0
+        self.total_correct = 0
+        self.total_duration = 0
+        self.score_sum = 0.0
+        self.mode_stats: Dict[str, int] = {}
+        self.score_distribution: Dict[str, int] = {name: 0 for name, _ in SCORE_BANDS}
+        self.recent: List[Dict] = []  # 最近的记录 [{"id", "score"}, ...]，新的在前
+        self.recent_stale = False  # 删除了最近记录中的一条，需要从存储中补齐
+        self.wrong_words = WrongWordCounter()
+        # 汇总对应的数据版本（见 HistoryBackend.fingerprint），不一致时需要重建
+        self.fingerprint = ""
+
+    def add(self, record: Dict, newest: bool = True):
+        """
+        计入一条记录
+
+        Args:
+            record: 历史记录
+            newest: 是否是最新的记录（重建时按由新到旧的顺序计入，此时为 False）
+        """
+        self._apply(record, 1)
+        entry = {"id": record.get("id", ""), "score": record.get("score", 0)}
+        if newest:
+            self.recent.insert(0, entry)
+            del self.recent[RECENT_COUNT:]
+        elif len(self.recent) < RECENT_COUNT:
+            self.recent.append(entry)
+
+    def remove(self, record: Dict):
+        """扣除一条被删除的记录"""
+        self._apply(record, -1)
+        if any(entry["id"] == record.get("id") for entry in self.recent):
+            self.recent_stale = True
+
+    def _apply(self, record: Dict, sign: int):
+        score = record.get("score", 0)
+        self.total_sessions += sign
+        self.total_words += sign * record.get("total_words", 0)
+        self.total_correct += sign * record.get("correct_count", 0)
+        self.total_duration += sign * record.get("duration_seconds", 0)
+        self.score_sum += sign * score
+
+        mode = record.get("mode", "unknown")
+        count = self.mode_stats.get(mode, 0) + sign
+        if count > 0:
+            self.mode_stats[mode] = count
+        else:
+            self.mode_stats.pop(mode, None)
+
+        band = score_band(score)
+        self.score_distribution[band] = max(0, self.score_distribution[band] + sign)
+
+        for word in record.get("wrong_words", []):
+            self.wrong_words.add(word.get("en", ""), word.get("cn", ""), sign)
+
+    def set_recent(self, records: List[Dict]):
+        """用存储中最近的记录（由新到旧）重置最近分数"""
+        self.recent = [{"id": r.get("id", ""), "score": r.get("score", 0)}
+                       for r in records[:RECENT_COUNT]]
+        self.recent_stale = False
+
+    @classmethod
+    def build(cls, records: List[Dict]) -> "HistoryStats":
+        """由全部记录（由新到旧）重建"""
+        stats = cls()
+        for record in records:
+            stats.add(record, newest=False)
+        return stats
+
+    def summary(self) -> Dict:
+        """HistoryManager.get_statistics 的返回值"""
+        recent_scores = [entry["score"] for entry in self.recent]
+        if self.total_sessions <= 0:
+            return {
+                "total_sessions": 0,
+                "total_words": 0,
+                "total_correct": 0,
+                "average_score": 0,
+                "total_duration": 0,
+                "mode_stats": {},
+                "score_distribution": {name: 0 for name, _ in SCORE_BANDS},
+                "recent_scores": [],
+                "recent_average": 0
+            }
+        return {
+            "total_sessions": self.total_sessions,
+            "total_words": self.total_words,
+            "total_correct": self.total_correct,
+            "average_score": round(self.score_sum / self.total_sessions, 2),
+            "total_duration": self.total_duration,
+            "mode_stats": dict(self.mode_stats),
+            "score_distribution": dict(self.score_distribution),
+            "recent_scores": recent_scores,
+            "recent_average": round(sum(recent_scores) / len(recent_scores), 2) if recent_scores else 0
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "total_sessions": self.total_sessions,
+            "total_words": self.total_words,
+            "total_correct": self.total_correct,
+            "total_duration": self.total_duration,
+            "score_sum": self.score_sum,
+            "mode_stats": self.mode_stats,
+            "score_distribution": self.score_distribution,
+            "recent": self.recent,
+            "wrong_words": self.wrong_words.to_list(),
+            "fingerprint": self.fingerprint,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> Optional["HistoryStats"]:
+        """从保存的数据恢复，格式不对时返回 None（由调用方重建）"""
+        try:
+            stats = cls()
+            stats.total_sessions = data["total_sessions"]
+            stats.total_words = data["total_words"]
+            stats.total_correct = data["total_correct"]
+            stats.total_duration = data["total_duration"]
+            stats.score_sum = data["score_sum"]
+            stats.mode_stats = dict(data["mode_stats"])
+            stats.score_distribution.update(data["score_distribution"])
+            stats.recent = list(data["recent"])
+            stats.wrong_words = WrongWordCounter.from_list(data["wrong_words"])
+            stats.fingerprint = data["fingerprint"]
+            return stats
+        except (KeyError, TypeError):
+            return None
@@ -0,0 +1,111 @@
+"""
+HTTP 客户端工具 - 连接池、重试退避与客户端限流
+
+供云端 TTS 等 HTTP 接口复用：
+- create_session: 可在线程间共享的连接池会话（keep-alive）
+- RetryPolicy: 带抖动的指数退避
+- RateLimiter: 令牌桶限流，匹配服务端配额
+"""
+import random
+import threading
+import time
+from typing import Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+def create_session(pool_size: int = 8) -> requests.Session:
+    """
+    创建带连接池的会话
+
+    Args:
+        pool_size: 每个主机保持的最大连接数（应不小于并发线程数）
+
+    Returns:
+        requests.Session（重试由 RetryPolicy 负责，适配器本身不重试）
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class RetryPolicy:
+    """带全抖动（full jitter）的指数退避重试策略"""
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0,
+                 retry_statuses: Iterable[int] = (429, 500, 502, 503, 504)):
+        """
+        Args:
+            max_retries: 最大重试次数（不含首次请求）
+            backoff_base: 首次退避上限（秒）
+            backoff_max: 单次退避上限（秒）
+            retry_statuses: 需要重试的 HTTP 状态码
+        """
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = set(retry_statuses)
+
+    def should_retry_status(self, status_code: int) -> bool:
+        return status_code in self.retry_statuses
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        计算第 attempt 次重试前的等待时间
+
+        Args:
+            attempt: 已失败的次数（从 0 开始）
+            retry_after: 服务端返回的 Retry-After 头（秒），优先采用
+        """
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+
+class RateLimiter:
+    """线程安全的令牌桶限流器"""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None):
+        """
+        Args:
+            rate_per_minute: 每分钟允许的请求数
+            burst: 桶容量（允许的瞬时突发数），默认 1
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        获取一个令牌，必要时阻塞等待
+
+        Returns:
+            是否在超时前拿到令牌
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
@@ -2,10 +2,20 @@
 MiniMax TTS 引擎 - 高质量云端语音合成
 文档: https://platform.minimax.io/docs/api-reference/speech-t2a-http
 """
+import json
 import os
+import re
+import time
 import requests
 import tempfile
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Union
+
+from src.http_client import RateLimiter, RetryPolicy, create_session
+from src.mp3_utils import get_duration, slice_by_time
+
+
+class BatchSplitError(RuntimeError):
+    """批量合成结果无法按字幕切分（调用方应回退到逐个合成）"""
 
 
 class MiniMaxTTSEngine:
@@ -39,16 +49,30 @@ class MiniMaxTTSEngine:
         "male_qn_badao": "male-qn-badao",         # 男声-青年-霸道
     }
     
+    # base_resp 中可重试的业务错误码：1001 超时、1002 RPM 限流、1039 TPM 限流
+    RETRYABLE_CODES = {1001, 1002, 1039}
+    
+    # 批量合成：每段文本之后插入的停顿（秒）与单次请求的文本长度上限
+    BATCH_PAUSE = 0.4
+    BATCH_MAX_CHARS = 3000
+
     # 内置 API Key（项目使用）- 优先从环境变量读取
     DEFAULT_API_KEY = os.getenv("MINIMAX_API_KEY", "sk-api-vgkUWazo08PYHpD0TDyKkLYxifoJYn9woKcDDzcHvToQDxSOp454WsBs9UoGca4rS-1QrdjMqVA5bWNVlN6pZ-4Boyv-MxcNC6Ha_y5KrPEqp5_WDEX4fFo")
     
-    def __init__(self, api_key: Optional[str] = None, group_id: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, group_id: Optional[str] = None,
+                 api_url: Optional[str] = None, pool_size: Optional[int] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
         """
         初始化 MiniMax TTS 引擎
 
         Args:
             api_key: MiniMax API Key（可选，默认从环境变量 MINIMAX_API_KEY 读取）
             group_id: MiniMax Group ID (部分账号需要)
+            api_url: 接口地址（可选，默认从环境变量 MINIMAX_API_URL 读取，用于代理或本地测试桩）
+            pool_size: 连接池大小，默认读取环境变量 MINIMAX_POOL_SIZE（8）
+            retry_policy: 重试策略，默认按环境变量 MINIMAX_MAX_RETRIES（3）重试 429/5xx
+            rate_limiter: 客户端限流器，默认按环境变量 MINIMAX_RPM 创建（未设置则不限流）
         """
         # 优先使用传入的 api_key，其次从环境变量读取，最后使用默认值
         if api_key is None:
@@ -60,12 +84,34 @@ class MiniMaxTTSEngine:
         self.speed = 1.0
         self.vol = 1.0
         self.pitch = 0
+        self.sample_rate = 32000
+        self.bitrate = 128000
         self.use_fast_endpoint = True  # 使用更快响应的 endpoint
+        self.api_url = api_url or os.getenv("MINIMAX_API_URL", "")
+        self.timeout = 60  # MiniMax 可能需要一些时间
+
+        # 连接池会话在线程间共享，复用 TCP/TLS 连接
+        if pool_size is None:
+            pool_size = int(os.getenv("MINIMAX_POOL_SIZE", "8"))
+        self.session = create_session(pool_size)
+        if retry_policy is None:
+            retry_policy = RetryPolicy(max_retries=int(os.getenv("MINIMAX_MAX_RETRIES", "3")))
+        self.retry_policy = retry_policy
+        if rate_limiter is None and os.getenv("MINIMAX_RPM"):
+            rate_limiter = RateLimiter(float(os.getenv("MINIMAX_RPM")),
+                                       burst=int(os.getenv("MINIMAX_RPM_BURST", "1")))
+        self.rate_limiter = rate_limiter
         
     def set_api_key(self, api_key: str):
         """设置 API Key"""
         self.api_key = api_key
         
+    @classmethod
+    def resolve_voice(cls, voice_type: str, is_english: bool = True) -> str:
+        """音色名称 -> voice_id（未登记的名称按 voice_id 原样使用）"""
+        voices = cls.ENGLISH_VOICES if is_english else cls.CHINESE_VOICES
+        return voices.get(voice_type, voice_type)
+
     def set_voice(self, voice_type: str = "expressive_narrator", is_english: bool = True):
         """
         设置音色
@@ -74,16 +120,7 @@ class MiniMaxTTSEngine:
             voice_type: 音色名称
             is_english: 是否是英文音色
         """
-        if is_english:
-            if voice_type in self.ENGLISH_VOICES:
-                self.voice = self.ENGLISH_VOICES[voice_type]
-            else:
-                self.voice = voice_type  # 支持直接传入 voice_id
-        else:
-            if voice_type in self.CHINESE_VOICES:
-                self.voice = self.CHINESE_VOICES[voice_type]
-            else:
-                self.voice = voice_type
+        self.voice = self.resolve_voice(voice_type, is_english)
     
     def set_model(self, model_name: str = "turbo"):
         """
@@ -104,13 +141,24 @@ class MiniMaxTTSEngine:
         """
         self.speed = max(0.5, min(2.0, speed))
     
-    def speak(self, text: str, save_path: Optional[str] = None) -> str:
+    def speak(self, text: str, save_path: Optional[str] = None,
+              voice: Optional[str] = None, speed: Optional[float] = None,
+              model: Optional[str] = None, sample_rate: Optional[int] = None,
+              bitrate: Optional[int] = None) -> str:
         """
         合成语音
+
+        voice/speed/model/sample_rate/bitrate 按次传入时只作用于本次请求，不修改实例状态，
+        因此同一引擎实例可以被多个线程并发使用。
         
         Args:
             text: 要合成的文本
             save_path: 保存路径，None 则创建临时文件
+            voice: 本次使用的 voice_id（默认使用实例设置）
+            speed: 本次语速（默认使用实例设置）
+            model: 本次模型名称（默认使用实例设置）
+            sample_rate: 本次采样率（默认使用实例设置）
+            bitrate: 本次比特率（默认使用实例设置）
             
         Returns:
             音频文件路径
@@ -121,9 +169,217 @@ class MiniMaxTTSEngine:
         if not text or not text.strip():
             raise ValueError("文本不能为空")
         
-        # 构建请求
-        url = self.API_URL_FAST if self.use_fast_endpoint else self.API_URL
+        payload = self._build_payload(text, voice=voice, speed=speed, model=model,
+                                      sample_rate=sample_rate, bitrate=bitrate)
+        result = self._post(payload)
+        self._check_result(result)
+        
+        # 获取音频数据
+        data = result.get("data", {})
+        if not data or "audio" not in data:
+            raise RuntimeError("MiniMax 返回数据格式错误")
         
+        # hex 解码
+        import binascii
+        audio_hex = data["audio"]
+        audio_bytes = binascii.unhexlify(audio_hex)
+        
+        # 保存文件
+        if save_path is None:
+            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
+                save_path = f.name
+        
+        with open(save_path, "wb") as f:
+            f.write(audio_bytes)
+        
+        return save_path
+    
+    def iter_speak(self, text: str, voice: Optional[str] = None,
+                   speed: Optional[float] = None,
+                   model: Optional[str] = None, sample_rate: Optional[int] = None,
+                   bitrate: Optional[int] = None) -> Iterator[bytes]:
+        """
+        流式合成：逐块产出音频字节
+
+        使用 stream=True 的 SSE 接口，每收到一个事件就解码其中的音频块，
+        不等待整段合成完成，也不在内存中保留完整的 hex 响应。
+
+        Args:
+            text: 要合成的文本
+            voice: 本次使用的 voice_id
+            speed: 本次语速
+            model: 本次模型名称
+            sample_rate: 本次采样率
+            bitrate: 本次比特率
+
+        Yields:
+            MP3 音频块
+        """
+        if not self.api_key:
+            raise ValueError("MiniMax API Key 未设置")
+
+        if not text or not text.strip():
+            raise ValueError("文本不能为空")
+
+        payload = self._build_payload(text, voice=voice, speed=speed, model=model,
+                                      sample_rate=sample_rate, bitrate=bitrate)
+        payload["stream"] = True
+        # 结束事件默认会再附带一份完整音频，流式场景下不需要
+        payload["stream_options"] = {"exclude_aggregated_audio": True}
+
+        response = self._post(payload, stream=True)
+        try:
+            for line in response.iter_lines():
+                if not line or not line.startswith(b"data:"):
+                    continue
+                event = json.loads(line[5:].strip())
+                if "base_resp" in event:
+                    self._check_result(event)
+
+                data = event.get("data") or {}
+                # status 2 为结束事件，其中的 audio 是前面所有块的汇总
+                if data.get("status") == 2:
+                    break
+                if data.get("audio"):
+                    yield bytes.fromhex(data["audio"])
+        finally:
+            response.close()
+
+    def speak_stream(self, text: str, save_path: str, voice: Optional[str] = None,
+                     speed: Optional[float] = None,
+                     model: Optional[str] = None, sample_rate: Optional[int] = None,
+                     bitrate: Optional[int] = None) -> Iterator[bytes]:
+        """
+        流式合成并同时写入文件：边产出音频块边落盘
+
+        调用方中途停止迭代时文件内容不完整，由调用方负责丢弃。
+
+        Args:
+            text: 要合成的文本
+            save_path: 保存路径
+            voice: 本次使用的 voice_id
+            speed: 本次语速
+            model: 本次模型名称
+            sample_rate: 本次采样率
+            bitrate: 本次比特率
+
+        Yields:
+            MP3 音频块
+        """
+        with open(save_path, "wb") as f:
+            for chunk in self.iter_speak(text, voice=voice, speed=speed, model=model,
+                                         sample_rate=sample_rate, bitrate=bitrate):
+                f.write(chunk)
+                f.flush()
+                yield chunk
+
+    def speak_batch(self, texts: List[str], voice: Optional[str] = None,
+                    speed: Optional[float] = None,
+                    model: Optional[str] = None, sample_rate: Optional[int] = None,
+                    bitrate: Optional[int] = None) -> List[bytes]:
+        """
+        一次请求合成多段文本，再按字幕时间戳切分为每段独立的 MP3
+
+        各段之间插入停顿标记，切分点取相邻两段之间停顿的中点，
+        因此每段音频首尾各带一小段静音，与单独合成的效果一致。
+
+        Args:
+            texts: 要合成的文本列表（拼接后不应超过 BATCH_MAX_CHARS）
+            voice: 本次使用的 voice_id
+            speed: 本次语速
+            model: 本次模型名称
+            sample_rate: 本次采样率
+            bitrate: 本次比特率
+
+        Returns:
+            与 texts 一一对应的音频字节
+
+        Raises:
+            BatchSplitError: 字幕缺失或与输入文本对不上
+        """
+        if not self.api_key:
+            raise ValueError("MiniMax API Key 未设置")
+        if not texts or any(not text or not text.strip() for text in texts):
+            raise ValueError("文本不能为空")
+
+        payload = self._build_payload(self._join_batch(texts), voice=voice, speed=speed, model=model,
+                                      sample_rate=sample_rate, bitrate=bitrate)
+        payload["subtitle_enable"] = True
+        result = self._post(payload)
+        self._check_result(result)
+
+        data = result.get("data", {})
+        if not data or "audio" not in data:
+            raise RuntimeError("MiniMax 返回数据格式错误")
+        audio = bytes.fromhex(data["audio"])
+
+        subtitle_url = data.get("subtitle_file")
+        if not subtitle_url:
+            raise BatchSplitError("MiniMax 未返回字幕文件")
+        try:
+            response = self.session.get(subtitle_url, timeout=self.timeout)
+            response.raise_for_status()
+            subtitles = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            raise BatchSplitError(f"获取字幕失败: {e}")
+
+        return self._split_batch(audio, texts, subtitles)
+
+    def _join_batch(self, texts: List[str]) -> str:
+        """拼接批量文本：每段补齐句末标点（保证字幕按段切分），段间插入停顿标记"""
+        parts = []
+        for text in texts:
+            text = text.strip()
+            if text[-1].isalnum():
+                text += "。" if self._has_cjk(text) else "."
+            parts.append(text)
+        return f" <#{self.BATCH_PAUSE}#> ".join(parts)
+
+    @staticmethod
+    def _has_cjk(text: str) -> bool:
+        return any("\u4e00" <= c <= "\u9fff" for c in text)
+
+    @staticmethod
+    def _normalize_subtitle(text: str) -> str:
+        """去掉停顿标记与标点，用于比对字幕与原文"""
+        text = re.sub(r"<#[\d.]+#>", "", text)
+        return "".join(c for c in text.casefold() if c.isalnum())
+
+    def _split_batch(self, audio: bytes, texts: List[str], subtitles) -> List[bytes]:
+        """按字幕时间戳把整段音频切成与 texts 对应的片段"""
+        if isinstance(subtitles, dict):
+            subtitles = subtitles.get("subtitles", [])
+        if not isinstance(subtitles, list) or len(subtitles) != len(texts):
+            raise BatchSplitError(
+                f"字幕段数与文本数不一致: {len(subtitles) if isinstance(subtitles, list) else '?'} != {len(texts)}"
+            )
+
+        spans = []
+        for text, item in zip(texts, subtitles):
+            expected = self._normalize_subtitle(text)
+            if expected not in self._normalize_subtitle(str(item.get("text", ""))):
+                raise BatchSplitError(f"字幕与文本不匹配: {text}")
+            spans.append((float(item["time_begin"]) / 1000, float(item["time_end"]) / 1000))
+
+        total = get_duration(audio)
+        clips = []
+        for i in range(len(spans)):
+            start = 0.0 if i == 0 else (spans[i - 1][1] + spans[i][0]) / 2
+            end = total if i == len(spans) - 1 else (spans[i][1] + spans[i + 1][0]) / 2
+            clip = slice_by_time(audio, start, end)
+            if not clip:
+                raise BatchSplitError(f"切分结果为空: {texts[i]}")
+            clips.append(clip)
+        return clips
+
+    def _endpoint(self) -> str:
+        """接口地址"""
+        if self.api_url:
+            return self.api_url
+        return self.API_URL_FAST if self.use_fast_endpoint else self.API_URL
+
+    def _headers(self) -> Dict[str, str]:
+        """请求头"""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -132,70 +388,106 @@ class MiniMaxTTSEngine:
         # Group ID (如果配置了)
         if self.group_id:
             headers["Group-Id"] = self.group_id
-        
-        payload = {
-            "model": self.model,
+        return headers
+
+    def _build_payload(self, text: str, voice: Optional[str] = None,
+                       speed: Optional[float] = None, model: Optional[str] = None,
+                       sample_rate: Optional[int] = None,
+                       bitrate: Optional[int] = None) -> Dict:
+        """构建合成请求体（按次参数优先，否则使用实例设置）"""
+        return {
+            "model": model or self.model,
             "text": text.strip(),
             "stream": False,
             "output_format": "hex",
             "language_boost": "auto",
             "voice_setting": {
-                "voice_id": self.voice,
-                "speed": self.speed,
+                "voice_id": voice or self.voice,
+                "speed": max(0.5, min(2.0, speed)) if speed is not None else self.speed,
                 "vol": self.vol,
                 "pitch": self.pitch
             },
             "audio_setting": {
-                "sample_rate": 32000,
-                "bitrate": 128000,
+                "sample_rate": sample_rate or self.sample_rate,
+                "bitrate": bitrate or self.bitrate,
                 "format": "mp3",
                 "channel": 1
             }
         }
-        
-        # 发送请求
-        try:
-            response = requests.post(
-                url,
-                headers=headers,
-                json=payload,
-                timeout=60  # MiniMax 可能需要一些时间
-            )
-            response.raise_for_status()
-        except requests.exceptions.Timeout:
-            raise RuntimeError("MiniMax API 请求超时，请稍后重试")
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"MiniMax API 请求失败: {e}")
-        
-        # 解析响应
-        result = response.json()
-        
-        # 检查响应状态
+
+    def _post(self, payload: Dict, stream: bool = False) -> Union[requests.Response, Dict]:
+        """
+        发送请求：经过客户端限流，对 429/5xx、网络错误及可重试的业务错误码做抖动退避重试
+
+        Returns:
+            解析后的响应 JSON（只解析一次，调用方无需再次解析）；
+            stream=True 时返回状态正常的响应，由调用方负责读取与关闭
+        """
+        policy = self.retry_policy
+        last_error = "未知错误"
+        retry_after = None
+
+        for attempt in range(policy.max_retries + 1):
+            if attempt:
+                time.sleep(policy.delay(attempt - 1, retry_after))
+                retry_after = None
+
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+
+            try:
+                response = self.session.post(
+                    self._endpoint(),
+                    headers=self._headers(),
+                    json=payload,
+                    timeout=self.timeout,
+                    stream=stream
+                )
+            except requests.exceptions.Timeout:
+                last_error = "MiniMax API 请求超时，请稍后重试"
+                continue
+            except requests.exceptions.RequestException as e:
+                last_error = f"MiniMax API 请求失败: {e}"
+                continue
+
+            if policy.should_retry_status(response.status_code):
+                retry_after = response.headers.get("Retry-After")
+                last_error = f"MiniMax API 请求失败: HTTP {response.status_code}"
+                response.close()
+                continue
+
+            try:
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                response.close()
+                raise RuntimeError(f"MiniMax API 请求失败: {e}")
+
+            if stream:
+                return response
+
+            # 限流等业务错误以 HTTP 200 + base_resp 返回
+            try:
+                result = response.json()
+            except ValueError:
+                result = None
+            if not isinstance(result, dict):
+                raise RuntimeError("MiniMax 返回数据格式错误")
+            base_resp = result.get("base_resp", {})
+            if base_resp.get("status_code") in self.RETRYABLE_CODES:
+                last_error = f"MiniMax 合成失败: {base_resp.get('status_msg', '限流')}"
+                continue
+            return result
+
+        raise RuntimeError(last_error)
+
+    @staticmethod
+    def _check_result(result: Dict):
+        """检查响应状态"""
         base_resp = result.get("base_resp", {})
         if base_resp.get("status_code") != 0:
             error_msg = base_resp.get("status_msg", "未知错误")
             raise RuntimeError(f"MiniMax 合成失败: {error_msg}")
-        
-        # 获取音频数据
-        data = result.get("data", {})
-        if not data or "audio" not in data:
-            raise RuntimeError("MiniMax 返回数据格式错误")
-        
-        # hex 解码
-        import binascii
-        audio_hex = data["audio"]
-        audio_bytes = binascii.unhexlify(audio_hex)
-        
-        # 保存文件
-        if save_path is None:
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
-                save_path = f.name
-        
-        with open(save_path, "wb") as f:
-            f.write(audio_bytes)
-        
-        return save_path
-    
+
     def get_audio_bytes(self, text: str) -> bytes:
         """获取音频二进制数据"""
         path = self.speak(text)
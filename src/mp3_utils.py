@@ -0,0 +1,198 @@
+"""
+MP3 帧工具 - 纯 Python 的 MPEG Layer III 帧解析、切分、拼接与静音生成
+
+只做帧级别的"流复制"操作，不解码音频：
+- iter_frames / get_duration: 遍历音频帧、计算时长
+- slice_by_time: 按时间区间截取帧
+- make_silence: 生成指定时长的静音帧
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# 比特率表（kbps），索引 0 为 free、15 为非法
+_BITRATES_V1 = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+_BITRATES_V2 = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+
+# 采样率表：版本 -> [索引 0, 1, 2]
+_SAMPLE_RATES = {
+    "1": [44100, 48000, 32000],
+    "2": [22050, 24000, 16000],
+    "2.5": [11025, 12000, 8000],
+}
+_VERSION_BITS = {0b11: "1", 0b10: "2", 0b00: "2.5"}
+
+
+def _id3v2_size(data: bytes) -> int:
+    """返回开头 ID3v2 标签的总长度（无标签返回 0）"""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = 0
+        for b in data[6:10]:
+            size = (size << 7) | (b & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def parse_frame_header(header: bytes) -> Optional[Dict]:
+    """
+    解析 4 字节帧头
+
+    Returns:
+        {"version", "bitrate", "sample_rate", "channels", "padding",
+         "frame_length", "samples"}，不是合法 Layer III 帧头返回 None
+    """
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+
+    version = _VERSION_BITS.get((header[1] >> 3) & 0b11)
+    layer = (header[1] >> 1) & 0b11
+    bitrate_index = (header[2] >> 4) & 0x0F
+    sample_rate_index = (header[2] >> 2) & 0b11
+    if version is None or layer != 0b01 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    padding = (header[2] >> 1) & 0b1
+    channels = 1 if (header[3] >> 6) == 0b11 else 2
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    table = _BITRATES_V1 if version == "1" else _BITRATES_V2
+    bitrate = table[bitrate_index] * 1000
+
+    if version == "1":
+        samples = 1152
+        frame_length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 576
+        frame_length = 72 * bitrate // sample_rate + padding
+
+    return {
+        "version": version,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "channels": channels,
+        "padding": padding,
+        "frame_length": frame_length,
+        "samples": samples,
+    }
+
+
+def _side_info_size(info: Dict) -> int:
+    if info["version"] == "1":
+        return 17 if info["channels"] == 1 else 32
+    return 9 if info["channels"] == 1 else 17
+
+
+def _is_info_frame(frame: bytes, info: Dict) -> bool:
+    """Xing/Info/VBRI 元数据帧（不含音频，拼接或切分时应丢弃）"""
+    offset = 4 + _side_info_size(info)
+    tag = frame[offset:offset + 4]
+    return tag in (b"Xing", b"Info") or frame[36:40] == b"VBRI"
+
+
+def iter_frames(data: bytes, skip_info: bool = True) -> Iterator[Tuple[int, int, Dict]]:
+    """
+    遍历音频帧
+
+    Args:
+        data: MP3 字节
+        skip_info: 是否跳过 Xing/Info 元数据帧
+
+    Yields:
+        (偏移, 帧长度, 帧头信息)
+    """
+    pos = _id3v2_size(data)
+    end = len(data)
+    # 末尾 ID3v1 标签
+    if end - pos >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+
+    first = True
+    while pos + 4 <= end:
+        info = parse_frame_header(data[pos:pos + 4])
+        if info is None or pos + info["frame_length"] > end:
+            # 失去同步，向后寻找下一个帧头
+            pos += 1
+            continue
+        length = info["frame_length"]
+        if not (first and skip_info and _is_info_frame(data[pos:pos + length], info)):
+            yield pos, length, info
+        first = False
+        pos += length
+
+
+def get_audio_params(data: bytes) -> Optional[Dict]:
+    """返回第一帧的参数（版本/采样率/声道/比特率），无合法帧返回 None"""
+    for _, _, info in iter_frames(data):
+        return info
+    return None
+
+
+def get_duration(data: bytes) -> float:
+    """计算音频时长（秒）"""
+    total = 0.0
+    for _, _, info in iter_frames(data):
+        total += info["samples"] / info["sample_rate"]
+    return total
+
+
+def slice_by_time(data: bytes, start: float, end: Optional[float] = None) -> bytes:
+    """
+    按时间区间截取帧（帧起点落在 [start, end) 内的帧）
+
+    Args:
+        data: MP3 字节
+        start: 起始时间（秒）
+        end: 结束时间（秒），None 表示到结尾
+    """
+    chunks: List[bytes] = []
+    t = 0.0
+    for offset, length, info in iter_frames(data):
+        if t >= start and (end is None or t < end):
+            chunks.append(data[offset:offset + length])
+        t += info["samples"] / info["sample_rate"]
+        if end is not None and t >= end:
+            break
+    return b"".join(chunks)
+
+
+def _header_bytes(sample_rate: int, bitrate: int, channels: int) -> Tuple[bytes, Dict]:
+    """构造无 CRC、无填充的帧头"""
+    for version_bits, version in _VERSION_BITS.items():
+        rates = _SAMPLE_RATES[version]
+        if sample_rate in rates:
+            break
+    else:
+        raise ValueError(f"不支持的采样率: {sample_rate}")
+
+    table = _BITRATES_V1 if version == "1" else _BITRATES_V2
+    kbps = bitrate // 1000
+    if kbps not in table[1:]:
+        raise ValueError(f"MPEG-{version} 不支持的比特率: {bitrate}")
+
+    channel_mode = 0b11 if channels == 1 else 0b00
+    header = bytes([
+        0xFF,
+        0xE0 | (version_bits << 3) | (0b01 << 1) | 0b1,
+        (table.index(kbps) << 4) | (rates.index(sample_rate) << 2),
+        (channel_mode << 6),
+    ])
+    return header, parse_frame_header(header)
+
+
+def make_silence(duration: float, sample_rate: int = 24000, bitrate: int = 32000,
+                 channels: int = 1) -> bytes:
+    """
+    生成指定时长的静音帧（侧信息与主数据全零，解码为静音）
+
+    Args:
+        duration: 时长（秒），按帧向上取整
+        sample_rate: 采样率，需与待拼接音频一致
+        bitrate: 比特率
+        channels: 声道数
+    """
+    if duration <= 0:
+        return b""
+    header, info = _header_bytes(sample_rate, bitrate, channels)
+    frame = header + bytes(info["frame_length"] - 4)
+    frame_seconds = info["samples"] / sample_rate
+    count = int(-(-duration // frame_seconds))
+    return frame * count
@@ -0,0 +1,387 @@
+"""
+预加载调度器 - 按播放顺序优先合成音频
+
+听写时学生最先听到的单词应最先合成：调度器以当前播放位置为基准，
+优先合成即将播放的单词；用户前进/后退时重新排序；取消已不再选中的单词。
+
+PreloadJob 是后台预加载的任务句柄（AudioCache 的异步预加载与调度器共用）。
+"""
+import heapq
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class PreloadJob:
+    """后台预加载任务句柄：可取消、可等待、可实时获取进度"""
+
+    def __init__(self, total: int = 0, on_cancel: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            total: 任务总数（可在开始后再设置）
+            on_cancel: 取消时的回调（用于停止尚未开始的合成）
+        """
+        self._cond = threading.Condition()
+        self.total = total
+        self.completed = 0
+        self.errors = 0
+        self._cancelled = False
+        self._finished = False
+        self._on_cancel = on_cancel
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self):
+        """取消尚未开始的合成（正在进行的合成会继续完成）"""
+        with self._cond:
+            if self._finished or self._cancelled:
+                return
+            self._cancelled = True
+            self._cond.notify_all()
+        if self._on_cancel:
+            self._on_cancel()
+
+    def done(self) -> bool:
+        """是否已结束（完成或取消后收尾完毕）"""
+        return self._finished
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待任务结束，返回是否在超时前结束"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._finished, timeout=timeout)
+
+    def progress(self) -> Dict:
+        """
+        当前进度
+
+        Returns:
+            {"total", "completed", "errors", "progress", "finished", "cancelled"}
+        """
+        with self._cond:
+            return self._status()
+
+    def iter_progress(self, timeout: Optional[float] = None) -> Iterator[Dict]:
+        """
+        进度流：每当进度变化时产出一次状态，任务结束后停止
+
+        Args:
+            timeout: 最长等待变化的时间（秒），超时则重复产出当前状态
+        """
+        last = None
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._version() != last, timeout=timeout)
+                last = self._version()
+                status = self._status()
+            yield status
+            if status["finished"]:
+                return
+
+    def _version(self) -> tuple:
+        return (self.total, self.completed, self.errors, self._cancelled, self._finished)
+
+    def _status(self) -> Dict:
+        return {
+            "total": self.total,
+            "completed": self.completed,
+            "errors": self.errors,
+            "progress": (self.completed / self.total) if self.total else 1.0,
+            "finished": self._finished,
+            "cancelled": self._cancelled,
+        }
+
+    def _set_total(self, total: int, completed: int = 0):
+        with self._cond:
+            self.total = total
+            self.completed = completed
+            self._cond.notify_all()
+
+    def _advance(self, error: bool = False):
+        """记录一个任务完成"""
+        with self._cond:
+            self.completed += 1
+            if error:
+                self.errors += 1
+            self._cond.notify_all()
+
+    def _finish(self, cancelled: bool = False):
+        with self._cond:
+            self._finished = True
+            self._cancelled = self._cancelled or cancelled
+            self._cond.notify_all()
+
+
+def playback_tasks(words: List[Dict], order: List[int], mode: str) -> List[Tuple[str, str, int]]:
+    """
+    按播放顺序展开听写需要的音频
+
+    Args:
+        words: 单词列表
+        order: 播放顺序（索引列表）
+        mode: 听写模式（en_to_cn / cn_to_en / spell）
+
+    Returns:
+        [(文本, 语言, 播放位置), ...]
+    """
+    tasks = []
+    for position, idx in enumerate(order):
+        if idx >= len(words):
+            continue
+        word = words[idx]
+        en = word.get('english', word.get('en', ''))
+        cn = word.get('chinese', word.get('cn', ''))
+        if mode in ("en_to_cn", "spell") and en:
+            tasks.append((en, "en", position))
+        if mode in ("cn_to_en", "spell") and cn:
+            tasks.append((cn, "cn", position))
+    return tasks
+
+
+class PreloadScheduler:
+    """按与当前播放位置的距离排序的后台预加载调度器"""
+
+    # 已播放过的单词（可能被"上一个"回放）的优先级权重：
+    # 落后 1 个位置的单词排在前方第 4 个之后
+    BEHIND_WEIGHT = 4
+
+    def __init__(self, cache, max_workers: Optional[int] = None):
+        """
+        Args:
+            cache: AudioCache 实例
+            max_workers: 并发合成数，默认取缓存的 max_workers
+        """
+        self.cache = cache
+        self.max_workers = max(1, max_workers or cache.max_workers)
+        self.position = 0
+        self._voice: Dict = {}
+        self._cond = threading.Condition()
+        self._pending: Dict[Tuple[str, str], int] = {}  # (文本, 语言) -> 最早播放位置
+        self._heap: List[Tuple[int, int, Tuple[str, str]]] = []
+        self._running: set = set()  # (音色代数, (文本, 语言))
+        self._generation = 0
+        self._done: set = set()
+        self._failed: set = set()
+        self._workers = 0
+        self._job: Optional[PreloadJob] = None
+
+    def plan(self, tasks: List[Tuple[str, str, int]], position: int = 0,
+             accent: str = "us", use_minimax: bool = True,
+             voice_en: str = "expressive_narrator", voice_cn: str = "xiaoxiao") -> PreloadJob:
+        """
+        设置（或替换）需要预加载的音频，立即返回
+
+        不在新任务中的待合成音频会被取消；正在合成的音频会继续完成。
+
+        Args:
+            tasks: playback_tasks 生成的 [(文本, 语言, 播放位置), ...]
+            position: 当前播放位置
+            accent/use_minimax/voice_en/voice_cn: 音色参数，同 AudioCache.get_audio
+
+        Returns:
+            本次规划的任务句柄（被新的规划替换后视为已取消）
+        """
+        voice = {
+            "accent": accent,
+            "use_minimax": use_minimax,
+            "voice_en": voice_en,
+            "voice_cn": voice_cn,
+        }
+        with self._cond:
+            if voice != self._voice:
+                # 换了音色，之前完成（或正在合成）的音频不再适用
+                self._voice = voice
+                self._generation += 1
+                self._done.clear()
+                self._failed.clear()
+
+            pending: Dict[Tuple[str, str], int] = {}
+            items = set()
+            for text, lang, pos in tasks:
+                item = (text, lang)
+                items.add(item)
+                if item in self._done or (self._generation, item) in self._running:
+                    continue
+                pending[item] = min(pos, pending.get(item, pos))
+
+            if self._job is not None and not self._job.done():
+                self._job._finish(cancelled=True)
+            self._job = PreloadJob(on_cancel=self.cancel)
+            self._job._set_total(len(items), completed=len(items & self._done))
+            self.cache.track_job(self._job)
+
+            self._pending = pending
+            self.position = position
+            self._rebuild()
+            self._spawn_workers()
+            self._finish_if_idle()
+            return self._job
+
+    @property
+    def job(self) -> Optional[PreloadJob]:
+        """当前规划的任务句柄"""
+        return self._job
+
+    def set_position(self, position: int):
+        """播放位置变化（前进/后退）后重新排序"""
+        with self._cond:
+            if position == self.position:
+                return
+            self.position = position
+            self._rebuild()
+
+    def cancel(self):
+        """取消所有尚未开始的合成"""
+        with self._cond:
+            self._pending.clear()
+            self._heap = []
+            if self._job is not None:
+                with self._job._cond:
+                    self._job._cancelled = True
+            self._finish_if_idle()
+            self._cond.notify_all()
+
+    def _finish_if_idle(self):
+        """当前规划的任务全部结束时收尾（需持有锁）"""
+        if self._job is None or self._job.done():
+            return
+        running = any(gen == self._generation for gen, _ in self._running)
+        if not self._pending and not running:
+            self._job._finish()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待全部任务完成，返回是否在超时前完成"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._running, timeout=timeout
+            )
+
+    def get_status(self) -> Dict[str, int]:
+        """返回调度状态"""
+        with self._cond:
+            return {
+                "position": self.position,
+                "pending": len(self._pending),
+                "running": len(self._running),
+                "done": len(self._done),
+                "failed": len(self._failed),
+            }
+
+    def _priority(self, position: int) -> int:
+        if position >= self.position:
+            return position - self.position
+        return (self.position - position) * self.BEHIND_WEIGHT
+
+    def _rebuild(self):
+        """按当前播放位置重建优先队列（需持有锁）"""
+        self._heap = [(self._priority(pos), pos, item) for item, pos in self._pending.items()]
+        heapq.heapify(self._heap)
+
+    def _spawn_workers(self):
+        """按待合成数量补足工作线程（需持有锁），线程在队列清空后自行退出"""
+        while self._workers < min(self.max_workers, len(self._pending)):
+            self._workers += 1
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def _take(self) -> List[Tuple[str, str]]:
+        """
+        取出优先级最高的任务（需持有锁）
+
+        缓存开启批量合成时，再顺序取出同一语言的后续任务组成一批。
+        """
+        batch: List[Tuple[str, str]] = []
+        skipped = []
+        limit = getattr(self.cache, "batch_size", 1) if self._voice.get("use_minimax") else 1
+        while self._heap and len(batch) < limit:
+            entry = heapq.heappop(self._heap)
+            item = entry[2]
+            if item not in self._pending:
+                continue
+            if batch and item[1] != batch[0][1]:
+                skipped.append(entry)
+                continue
+            del self._pending[item]
+            self._running.add((self._generation, item))
+            batch.append(item)
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return batch
+
+    def _work(self):
+        while True:
+            with self._cond:
+                batch = self._take()
+                if not batch:
+                    self._workers -= 1
+                    return
+                generation = self._generation
+                voice = dict(self._voice)
+                job = self._job
+
+            results = self._synthesize(batch, voice)
+
+            with self._cond:
+                for item, ok in zip(batch, results):
+                    self._running.discard((generation, item))
+                    if generation == self._generation:
+                        (self._done if ok else self._failed).add(item)
+                        if job is self._job:
+                            job._advance(error=not ok)
+                self._finish_if_idle()
+                self._cond.notify_all()
+
+    def _synthesize(self, batch: List[Tuple[str, str]], voice: Dict) -> List[bool]:
+        """合成一个或一批音频（同一语言），返回每项是否成功"""
+        lang = batch[0][1]
+        words = [text for text, _ in batch]
+        try:
+            paths = self.cache.synthesize_many(words, lang, **voice)
+        except Exception as e:
+            print(f"预加载失败: {e}")
+            return [False] * len(batch)
+
+        results = []
+        for word, path in zip(words, paths):
+            if isinstance(path, Exception):
+                print(f"预加载失败 {word}: {path}")
+            results.append(not isinstance(path, Exception))
+        return results
+
+
+def sync_session_preload(session_state) -> PreloadJob:
+    """
+    让会话的后台预加载与当前单词选择、播放顺序、播放位置和音色保持一致（立即返回）
+
+    调度器保存在会话中；规划参数未变化时只更新播放位置。
+
+    Args:
+        session_state: Streamlit 的 st.session_state（或同样接口的字典）
+
+    Returns:
+        当前规划的任务句柄
+    """
+    scheduler = session_state.get('preload_scheduler')
+    if scheduler is None:
+        scheduler = PreloadScheduler(session_state['audio_cache'])
+        session_state['preload_scheduler'] = scheduler
+
+    plan_key = (
+        tuple((w.get('en', ''), w.get('cn', '')) for w in session_state['selected_words']),
+        tuple(session_state['dictation_order']),
+        session_state['dictation_mode'],
+        session_state['voice_en'],
+        session_state['voice_cn'],
+    )
+    if session_state.get('preload_plan_key') != plan_key or scheduler.job is None:
+        session_state['preload_plan_key'] = plan_key
+        return scheduler.plan(
+            playback_tasks(session_state['selected_words'],
+                           session_state['dictation_order'],
+                           session_state['dictation_mode']),
+            position=session_state['current_index'],
+            voice_en=session_state['voice_en'],
+            voice_cn=session_state['voice_cn'],
+        )
+
+    scheduler.set_position(session_state['current_index'])
+    return scheduler.job
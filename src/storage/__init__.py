@@ -0,0 +1,120 @@
+"""
+持久化存储 - 词库、历史记录、错题本的可替换存储后端
+
+- json（默认）: 与早期版本相同的 JSON 文件，每次修改重写整个文件
+- sqlite: 单个 SQLite 数据库（WAL 模式，带索引），追加与更新只写入相关的行
+- journal: 历史记录保存为分段追加日志（见 journal_backend.py），词库与错题本仍使用 JSON 文件
+
+环境变量：
+    DICTATION_STORAGE  存储后端（json / sqlite / journal），默认 json
+    DICTATION_DB_PATH  SQLite 数据库路径，默认 data/dictation.db
+
+首次打开 sqlite 数据库（或新建 data/history_journal 目录）时自动从 data/ 下的 JSON 文件
+迁移已有数据（见 migrate.py）。
+管理器显式指定了文件或目录路径时总是使用 JSON 文件。
+JSON 文件解析后缓存在进程内（document_cache，按文件 mtime/大小失效，document_cache.stats() 查看命中次数）。
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+from src.storage.base import HistoryBackend, VocabularyBackend, WrongAnswerBackend
+from src.storage.document_cache import DocumentCache, document_cache
+from src.storage.journal_backend import JournalHistoryBackend
+from src.storage.json_backend import JsonHistoryBackend, JsonVocabularyBackend, JsonWrongAnswerBackend
+from src.storage.sqlite_backend import (SqliteDatabase, SqliteHistoryBackend,
+                                        SqliteVocabularyBackend, SqliteWrongAnswerBackend)
+
+DATA_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data"
+)
+STORAGE_KINDS = ("json", "sqlite", "journal")
+DEFAULT_STORAGE = "json"
+
+_databases: Dict[str, SqliteDatabase] = {}
+_journals: Dict[str, JournalHistoryBackend] = {}
+_databases_lock = threading.Lock()
+
+
+def get_storage_kind() -> str:
+    """当前使用的存储后端（读取环境变量 DICTATION_STORAGE）"""
+    kind = os.getenv("DICTATION_STORAGE", DEFAULT_STORAGE).lower()
+    if kind not in STORAGE_KINDS:
+        print(f"未知的存储后端 {kind}，使用 {DEFAULT_STORAGE}")
+        kind = DEFAULT_STORAGE
+    return kind
+
+
+def default_db_path() -> str:
+    return os.getenv("DICTATION_DB_PATH", os.path.join(DATA_DIR, "dictation.db"))
+
+
+def open_database(path: Optional[str] = None) -> SqliteDatabase:
+    """
+    获取进程内共享的数据库连接
+
+    数据库文件新建时从 DATA_DIR 下的 JSON 文件迁移已有数据。
+    """
+    path = os.path.abspath(path or default_db_path())
+    with _databases_lock:
+        db = _databases.get(path)
+        if db is None:
+            created = not os.path.exists(path)
+            db = _databases[path] = SqliteDatabase(path)
+            if created:
+                from src.storage.migrate import migrate_json_to_sqlite
+                counts = migrate_json_to_sqlite(db, DATA_DIR)
+                if any(counts.values()):
+                    print(f"已从 JSON 文件迁移：词库 {counts['vocabularies']} 个，"
+                          f"历史记录 {counts['records']} 条，错题 {counts['wrong_words']} 个")
+        return db
+
+
+def open_journal(directory: Optional[str] = None) -> JournalHistoryBackend:
+    """
+    获取进程内共享的历史记录日志（同一目录只能有一个写入者）
+
+    目录新建时导入 DATA_DIR 下 history.json 中的记录。
+    """
+    directory = os.path.abspath(directory or os.path.join(DATA_DIR, "history_journal"))
+    with _databases_lock:
+        journal = _journals.get(directory)
+        if journal is None:
+            created = not os.path.exists(directory)
+            journal = _journals[directory] = JournalHistoryBackend(directory)
+            history_file = os.path.join(DATA_DIR, "history.json")
+            if created and os.path.exists(history_file):
+                records = JsonHistoryBackend(history_file).list()
+                records.sort(key=lambda x: x.get("date", ""))
+                if records and journal.import_records(records):
+                    print(f"已从 JSON 文件迁移：历史记录 {len(records)} 条")
+        return journal
+
+
+def create_vocabulary_backend(base_dir: Optional[str] = None) -> VocabularyBackend:
+    if base_dir is None and get_storage_kind() == "sqlite":
+        return SqliteVocabularyBackend(open_database())
+    return JsonVocabularyBackend(base_dir or os.path.join(DATA_DIR, "vocabularies"))
+
+
+def create_history_backend(history_file: Optional[str] = None) -> HistoryBackend:
+    if history_file is None and get_storage_kind() == "sqlite":
+        return SqliteHistoryBackend(open_database())
+    if history_file is None and get_storage_kind() == "journal":
+        return open_journal()
+    return JsonHistoryBackend(history_file or os.path.join(DATA_DIR, "history.json"))
+
+
+def create_wrong_answer_backend(data_file: Optional[str] = None) -> WrongAnswerBackend:
+    if data_file is None and get_storage_kind() == "sqlite":
+        return SqliteWrongAnswerBackend(open_database())
+    return JsonWrongAnswerBackend(data_file or os.path.join(DATA_DIR, "wrong_answers.json"))
+
+
+__all__ = [
+    "VocabularyBackend", "HistoryBackend", "WrongAnswerBackend", "DocumentCache", "document_cache",
+    "JsonVocabularyBackend", "JsonHistoryBackend", "JsonWrongAnswerBackend", "JournalHistoryBackend",
+    "SqliteDatabase", "SqliteVocabularyBackend", "SqliteHistoryBackend", "SqliteWrongAnswerBackend",
+    "get_storage_kind", "default_db_path", "open_database", "open_journal",
+    "create_vocabulary_backend", "create_history_backend", "create_wrong_answer_backend",
+]
@@ -0,0 +1,95 @@
+"""
+存储后端接口
+
+每类数据一个接口，管理器（VocabularyStore / HistoryManager / WrongAnswerManager）
+只通过这些方法读写，不关心数据保存在 JSON 文件还是数据库中。
+与管理器原有的约定一致：读写失败时打印错误并返回空结果或 False，不抛出异常。
+"""
+from typing import Dict, List, Optional, Tuple
+
+
+class VocabularyBackend:
+    """词库存储"""
+
+    def save(self, name: str, words: List[Dict], update_time: bool = True) -> bool:
+        """保存词库（已存在时保留创建时间）"""
+        raise NotImplementedError
+
+    def load(self, name: str) -> Optional[Dict]:
+        """加载词库 {"name", "words", "created_at", "updated_at", ...}，不存在返回 None"""
+        raise NotImplementedError
+
+    def list(self) -> List[Dict]:
+        """所有词库的摘要 [{"name", "word_count", "created_at", "updated_at"}, ...]（不要求排序）"""
+        raise NotImplementedError
+
+    def delete(self, name: str) -> bool:
+        """删除词库，不存在返回 False"""
+        raise NotImplementedError
+
+    def exists(self, name: str) -> bool:
+        raise NotImplementedError
+
+
+class HistoryBackend:
+    """听写历史记录存储"""
+
+    def append(self, record: Dict) -> bool:
+        """追加一条记录"""
+        raise NotImplementedError
+
+    def list(self, limit: Optional[int] = None) -> List[Dict]:
+        """按时间倒序返回记录，limit 为 None 时返回全部"""
+        raise NotImplementedError
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def delete(self, record_id: str) -> bool:
+        """删除记录，不存在返回 False"""
+        raise NotImplementedError
+
+    def clear(self) -> bool:
+        raise NotImplementedError
+
+    def fingerprint(self) -> str:
+        """
+        数据版本标识（代价应为 O(1)），任何写入后都会变化
+
+        用于判断保存的统计汇总是否与数据一致（例如其他进程写入过，或保存汇总前崩溃）。
+        """
+        return ""
+
+    def load_stats(self) -> Optional[Dict]:
+        """读取与数据一起保存的统计汇总（见 src.history_stats）"""
+        return None
+
+    def save_stats(self, stats: Dict):
+        pass
+
+
+class WrongAnswerBackend:
+    """错题本存储（同一英文单词不区分大小写，只保留一条）"""
+
+    def add(self, en: str, cn: str, user_answer: str, when: str):
+        """记一次错误：已存在时错误次数加一并更新最近答案与时间"""
+        raise NotImplementedError
+
+    def add_many(self, entries: List[Tuple[str, str, str]], when: str):
+        """批量记错误 [(en, cn, user_answer), ...]，每项等同于一次 add"""
+        for en, cn, user_answer in entries:
+            self.add(en, cn, user_answer, when)
+
+    def list(self) -> List[Dict]:
+        """所有错题（按首次收录顺序）"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        """{"total_wrong": 累计错误次数, "unique_words": 不同单词数}"""
+        raise NotImplementedError
+
+    def remove(self, en: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
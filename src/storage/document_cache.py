@@ -0,0 +1,84 @@
+"""
+JSON 文档缓存 - 进程内共享，避免每次读取都重新解析 JSON 文件
+
+以文件的 (mtime, 大小) 判断缓存是否有效：其他进程修改文件后下次读取自动重新解析；
+本进程写入成功后由写入方直接更新缓存（write-through），不必再读回。
+
+缓存的文档与所有读取方共享，JSON 后端返回给调用方前自行复制，修改前也只修改
+随后会整体写入的文档（写入失败时使缓存失效）。
+"""
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class DocumentCache:
+    """路径 -> (文件签名, 解析后的文档)"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self, path: str, loader: Callable[[str], Any]) -> Any:
+        """
+        读取文档：文件未变化时返回缓存，否则调用 loader(path) 解析并缓存
+
+        loader 抛出的异常直接传给调用方（不缓存）。
+        """
+        key = os.path.abspath(path)
+        signature = self._signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and signature is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        data = loader(path)
+        # 解析期间文件被修改时不缓存（下次读取重新解析）
+        if signature is not None and self._signature(key) == signature:
+            with self._lock:
+                self._entries[key] = (signature, data)
+        return data
+
+    def store(self, path: str, data: Any):
+        """本进程写入文件成功后更新缓存"""
+        key = os.path.abspath(path)
+        signature = self._signature(key)
+        with self._lock:
+            if signature is None:
+                self._entries.pop(key, None)
+            else:
+                self._entries[key] = (signature, data)
+
+    def invalidate(self, path: Optional[str] = None):
+        """使指定文件（默认全部）的缓存失效"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.path.abspath(path), None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+# 进程内共享的文档缓存（所有 JSON 后端共用）
+document_cache = DocumentCache()
@@ -0,0 +1,397 @@
+"""
+追加日志（JSONL）历史记录后端
+
+每次操作以一行 JSON 追加到当前日志段，不再读取或重写已有数据：
+    {"op": "add", "record": {...}}
+    {"op": "delete", "id": "..."}
+    {"op": "clear"}
+
+- 写入：每行写入后立即 flush（进程崩溃不丢数据），fsync 按批进行
+  （每 fsync_every 次写入或距上次 fsync 超过 fsync_interval 秒），掉电时最多丢失最近一批
+- 分段：日志段写满 segment_records 行后换新段；已写满的段达到 compact_segments 个时
+  由后台线程合并为一个快照（只保留仍然存在的记录），再删除已合并的段；
+  已写满的段不再修改，合并期间写入照常进行，只在替换文件时短暂持有锁
+- 恢复：打开时使用最新的快照，清理合并中断留下的文件，并截掉最后一段中未写完的行
+- 索引：内存中保存 记录 ID -> (文件, 偏移)，打开时重放一次建立，追加/删除/合并时更新，
+  get / delete 只读取一行
+- 读取：从最新的段向前逐行读取（快照从文件末尾反向读取），get_all_records(limit)
+  读够 limit 条即停止，不需要解析全部历史
+
+记录按追加顺序（即听写完成的时间顺序）由新到旧返回。同一目录只应由一个进程写入
+（进程内的多个会话通过锁串行追加）。
+"""
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.storage.base import HistoryBackend
+from src.storage.json_backend import _read_stats, _write_stats
+
+_FILE_PATTERN = re.compile(r"^(snapshot|segment)-(\d{8})\.jsonl$")
+
+# 记录所在的位置：(文件类型, 序号, 行的字节偏移)
+Location = Tuple[str, int, int]
+
+
+def _reverse_lines(path: str, block_size: int = 65536) -> Iterator[bytes]:
+    """从文件末尾开始逐行读取（不读入整个文件）"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            lines = (f.read(size) + tail).split(b"\n")
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if tail.strip():
+            yield tail
+
+
+class JournalHistoryBackend(HistoryBackend):
+    """以分段追加日志 + 快照保存历史记录"""
+
+    def __init__(self, directory: str, fsync_every: int = 32, fsync_interval: float = 1.0,
+                 segment_records: int = 1000, compact_segments: int = 8):
+        """
+        Args:
+            directory: 日志目录
+            fsync_every: 每多少次写入 fsync 一次
+            fsync_interval: 距上次 fsync 超过该时间（秒）时在下次写入后 fsync
+            segment_records: 每个日志段的最大行数
+            compact_segments: 已写满的日志段达到该数量时合并为快照
+        """
+        self.directory = directory
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self.segment_records = max(1, segment_records)
+        self.compact_segments = max(1, compact_segments)
+
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()  # 同一时间只进行一次合并
+        self._compactor: Optional[threading.Thread] = None
+        self._file = None  # 当前日志段（追加模式）
+        self._active = 0  # 当前日志段序号
+        self._active_lines = 0
+        self._pending = 0  # 尚未 fsync 的写入数
+        self._last_sync = time.monotonic()
+        self._index: Dict[str, Location] = {}
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+        self._build_index()
+        atexit.register(self.close)
+
+    # ---- 文件布局
+
+    def _path(self, kind: str, seq: int) -> str:
+        return os.path.join(self.directory, f"{kind}-{seq:08d}.jsonl")
+
+    def _scan(self) -> Tuple[Optional[int], List[int]]:
+        """(最新快照序号, 日志段序号列表)"""
+        snapshots, segments = [], []
+        for name in os.listdir(self.directory):
+            match = _FILE_PATTERN.match(name)
+            if match:
+                (snapshots if match.group(1) == "snapshot" else segments).append(int(match.group(2)))
+        return (max(snapshots) if snapshots else None), sorted(segments)
+
+    def _recover(self):
+        """清理合并中断留下的文件，截掉最后一段中未写完的行，确定当前日志段"""
+        snapshot, segments = self._scan()
+        for name in os.listdir(self.directory):
+            match = _FILE_PATTERN.match(name)
+            stale = name.endswith(".tmp") or (match and snapshot is not None and (
+                int(match.group(2)) < snapshot
+                or (match.group(1) == "segment" and int(match.group(2)) <= snapshot)))
+            if stale:
+                os.remove(os.path.join(self.directory, name))
+        segments = [seq for seq in segments if snapshot is None or seq > snapshot]
+
+        if not segments:
+            self._active = (snapshot or 0) + 1
+            self._active_lines = 0
+            return
+
+        self._active = segments[-1]
+        path = self._path("segment", self._active)
+        valid_bytes, lines = 0, 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                valid_bytes += len(line)
+                lines += 1
+        if valid_bytes < os.path.getsize(path):
+            print(f"历史记录日志 {os.path.basename(path)} 末尾有未写完的内容，已截断")
+            with open(path, 'r+b') as f:
+                f.truncate(valid_bytes)
+        self._active_lines = lines
+        if lines >= self.segment_records:
+            self._active += 1
+            self._active_lines = 0
+
+    # ---- 索引
+
+    def _build_index(self):
+        """按时间顺序重放快照与日志段，建立 记录 ID -> 位置 的索引"""
+        snapshot, segments = self._scan()
+        files = [("segment", seq) for seq in segments]
+        if snapshot is not None:
+            files.insert(0, ("snapshot", snapshot))
+
+        index: Dict[str, Location] = {}
+        for kind, seq in files:
+            offset = 0
+            with open(self._path(kind, seq), 'rb') as f:
+                for line in f:
+                    try:
+                        op = json.loads(line) if line.strip() else None
+                    except ValueError:
+                        op = None
+                    if op is not None:
+                        if kind == "snapshot":
+                            op = {"op": "add", "record": op}
+                        self._apply(index, op, (kind, seq, offset))
+                    offset += len(line)
+        with self._lock:
+            self._index = index
+
+    @staticmethod
+    def _apply(index: Dict[str, Location], op: Dict, location: Location):
+        kind = op.get("op")
+        if kind == "add":
+            index[op.get("record", {}).get("id")] = location
+        elif kind == "delete":
+            index.pop(op.get("id"), None)
+        elif kind == "clear":
+            index.clear()
+
+    def _read_at(self, location: Location) -> Dict:
+        kind, seq, offset = location
+        with open(self._path(kind, seq), 'rb') as f:
+            f.seek(offset)
+            data = json.loads(f.readline())
+        return data if kind == "snapshot" else data["record"]
+
+    # ---- 写入
+
+    def _write(self, op: Dict) -> bool:
+        line = (json.dumps(op, ensure_ascii=False) + "\n").encode("utf-8")
+        try:
+            with self._lock:
+                if self._file is None:
+                    self._file = open(self._path("segment", self._active), 'ab')
+                location = ("segment", self._active, self._file.tell())
+                self._file.write(line)
+                self._file.flush()
+                self._apply(self._index, op, location)
+                self._pending += 1
+                self._active_lines += 1
+                if self._pending >= self.fsync_every or \
+                        time.monotonic() - self._last_sync >= self.fsync_interval:
+                    self._sync()
+                if self._active_lines >= self.segment_records:
+                    self._roll()
+            return True
+        except OSError as e:
+            print(f"保存历史记录失败: {e}")
+            return False
+
+    def _sync(self):
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _roll(self):
+        """当前段已写满：关闭并换新段，必要时在后台合并"""
+        self._sync()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._active += 1
+        self._active_lines = 0
+        _, segments = self._scan()
+        if len([seq for seq in segments if seq < self._active]) >= self.compact_segments:
+            self._start_compaction()
+
+    def _start_compaction(self):
+        """启动后台合并（已有合并在进行时不重复启动）"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact_in_background,
+                                           name="journal-compact", daemon=True)
+        self._compactor.start()
+
+    def _compact_in_background(self):
+        try:
+            self.compact(include_active=False)
+        except (OSError, ValueError) as e:
+            # 合并失败不影响数据：原有的段保留，下次换段时重试
+            print(f"合并历史记录日志失败: {e}")
+
+    def wait_for_compaction(self, timeout: Optional[float] = None):
+        """等待后台合并结束"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def flush(self):
+        """立即 fsync 尚未落盘的写入"""
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        self.wait_for_compaction()
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def compact(self, include_active: bool = True):
+        """
+        把快照与所有已写满的日志段合并为新快照
+
+        Args:
+            include_active: 当前段是否也一并合并（之后写入新段）
+        """
+        with self._compact_lock:
+            with self._lock:
+                if include_active and self._active_lines:
+                    self._sync()
+                    if self._file is not None:
+                        self._file.close()
+                        self._file = None
+                    self._active += 1
+                    self._active_lines = 0
+                snapshot, segments = self._scan()
+                closed = [seq for seq in segments if seq < self._active]
+            if not closed:
+                return
+
+            # 已写满的段与快照不再修改，读取与写入新快照时不需要持有锁
+            upto = closed[-1]
+            live = list(self._records_newest_first(snapshot, closed))
+            path = self._path("snapshot", upto)
+            tmp_path = path + ".tmp"
+            offsets = {}
+            with open(tmp_path, 'wb') as f:
+                for record in reversed(live):
+                    offsets[record.get("id")] = f.tell()
+                    f.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+            with self._lock:
+                os.replace(tmp_path, path)
+                if snapshot is not None:
+                    os.remove(self._path("snapshot", snapshot))
+                for seq in closed:
+                    os.remove(self._path("segment", seq))
+                # 位于已合并文件中的记录改指向新快照（合并期间删除的记录已不在索引中）
+                for record_id, offset in offsets.items():
+                    location = self._index.get(record_id)
+                    if location is not None and (location[0] == "snapshot" or location[1] <= upto):
+                        self._index[record_id] = ("snapshot", upto, offset)
+
+    def import_records(self, records: List[Dict]) -> bool:
+        """把已有记录（按时间从旧到新）写入为快照，只用于迁移到空目录"""
+        with self._lock:
+            snapshot, segments = self._scan()
+            if snapshot is not None or segments:
+                return False
+            path = self._path("snapshot", 0)
+            with open(path + ".tmp", 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(path + ".tmp", path)
+            self._build_index()
+            return True
+
+    # ---- 读取
+
+    def _ops_newest_first(self, snapshot: Optional[int], segments: List[int]) -> Iterator[Dict]:
+        for seq in reversed(segments):
+            path = self._path("segment", seq)
+            if os.path.exists(path):
+                for line in _reverse_lines(path):
+                    yield json.loads(line)
+        if snapshot is not None:
+            for line in _reverse_lines(self._path("snapshot", snapshot)):
+                yield {"op": "add", "record": json.loads(line)}
+
+    def _records_newest_first(self, snapshot: Optional[int] = None,
+                              segments: Optional[List[int]] = None) -> Iterator[Dict]:
+        if segments is None:
+            snapshot, segments = self._scan()
+        deleted = set()
+        for op in self._ops_newest_first(snapshot, segments):
+            kind = op.get("op")
+            if kind == "clear":
+                return
+            if kind == "delete":
+                deleted.add(op.get("id"))
+            elif kind == "add":
+                record = op.get("record", {})
+                if record.get("id") not in deleted:
+                    yield record
+
+    def append(self, record: Dict) -> bool:
+        return self._write({"op": "add", "record": record})
+
+    def list(self, limit: Optional[int] = None) -> List[Dict]:
+        try:
+            with self._lock:
+                return list(islice(self._records_newest_first(), limit or None))
+        except (OSError, ValueError) as e:
+            print(f"加载历史记录失败: {e}")
+            return []
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        try:
+            with self._lock:
+                location = self._index.get(record_id)
+                return self._read_at(location) if location is not None else None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"加载历史记录失败: {e}")
+        return None
+
+    def delete(self, record_id: str) -> bool:
+        with self._lock:
+            if record_id not in self._index:
+                return False
+            return self._write({"op": "delete", "id": record_id})
+
+    def clear(self) -> bool:
+        return self._write({"op": "clear"})
+
+    def fingerprint(self) -> str:
+        # 每次写入都追加到当前段（或换新段），(段序号, 大小) 随之变化；
+        # 后台合并只改变已写满的段，不改变版本
+        with self._lock:
+            path = self._path("segment", self._active)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            return f"{self._active}:{size}"
+
+    def load_stats(self) -> Optional[Dict]:
+        return _read_stats(os.path.join(self.directory, "stats.json"))
+
+    def save_stats(self, stats: Dict):
+        _write_stats(os.path.join(self.directory, "stats.json"), stats)
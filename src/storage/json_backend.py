@@ -0,0 +1,346 @@
+"""
+JSON 文件存储后端
+
+文件格式与早期版本相同：每个词库一个 JSON 文件，历史记录与错题本各一个 JSON 文件。
+每次修改都会重写整个文件，数据量大时请使用 SQLite 后端（见 sqlite_backend.py）。
+解析后的文件内容保存在进程内共享的文档缓存中（见 document_cache.py），文件未变化时不再重新解析。
+"""
+import copy
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.storage.base import HistoryBackend, VocabularyBackend, WrongAnswerBackend
+from src.storage.document_cache import document_cache
+
+
+def _empty_wrong_data() -> Dict:
+    return {
+        'words': [],
+        'stats': {
+            'total_wrong': 0,
+            'unique_words': 0
+        }
+    }
+
+
+def _read_json(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json(path: str, data, indent: int):
+    """写入文件并更新文档缓存（失败时使缓存失效后抛出异常）"""
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=indent)
+    except Exception:
+        document_cache.invalidate(path)
+        raise
+    document_cache.store(path, data)
+
+
+def _read_stats(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"加载统计数据失败: {e}")
+        return None
+
+
+def _write_stats(path: str, stats: Dict):
+    """原子写入统计汇总（写入临时文件后替换）"""
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"保存统计数据失败: {e}")
+
+
+class JsonVocabularyBackend(VocabularyBackend):
+    """每个词库保存为 base_dir 下的一个 JSON 文件"""
+
+    def __init__(self, base_dir: str):
+        self.base_dir = base_dir
+
+        # 确保目录存在
+        if not os.path.exists(self.base_dir):
+            os.makedirs(self.base_dir)
+
+    def file_path(self, name: str) -> str:
+        """获取词库文件路径"""
+        # 安全文件名处理
+        safe_name = "".join(c for c in name if c.isalnum() or c in (' ', '-', '_')).strip()
+        if not safe_name:
+            safe_name = "vocabulary"
+        return os.path.join(self.base_dir, f"{safe_name}.json")
+
+    def save(self, name: str, words: List[Dict], update_time: bool = True) -> bool:
+        try:
+            file_path = self.file_path(name)
+
+            # 如果文件已存在，保留创建时间
+            created_at = datetime.now().isoformat()
+            if os.path.exists(file_path):
+                existing_data = self.load(name)
+                if existing_data and 'created_at' in existing_data:
+                    created_at = existing_data['created_at']
+
+            # 构建词库数据
+            vocabulary_data = {
+                "name": name,
+                "words": [dict(word) for word in words],  # 缓存中保存副本
+                "created_at": created_at,
+                "updated_at": datetime.now().isoformat() if update_time else created_at
+            }
+
+            # 保存到文件
+            _write_json(file_path, vocabulary_data, indent=2)
+
+            return True
+
+        except Exception as e:
+            print(f"保存词库失败: {e}")
+            return False
+
+    def load(self, name: str) -> Optional[Dict]:
+        try:
+            file_path = self.file_path(name)
+
+            if not os.path.exists(file_path):
+                return None
+
+            data = document_cache.load(file_path, _read_json)
+            # 返回深拷贝（调用方可能修改单词列表及其中的嵌套字段）
+            return copy.deepcopy(data)
+
+        except Exception as e:
+            print(f"加载词库失败: {e}")
+            return None
+
+    def list(self) -> List[Dict]:
+        vocabularies = []
+
+        if not os.path.exists(self.base_dir):
+            return vocabularies
+
+        for filename in os.listdir(self.base_dir):
+            if filename.endswith('.json'):
+                file_path = os.path.join(self.base_dir, filename)
+                try:
+                    data = document_cache.load(file_path, _read_json)
+
+                    vocabularies.append({
+                        "name": data.get("name", filename.replace('.json', '')),
+                        "word_count": len(data.get("words", [])),
+                        "created_at": data.get("created_at", ""),
+                        "updated_at": data.get("updated_at", "")
+                    })
+                except Exception as e:
+                    print(f"读取词库 {filename} 失败: {e}")
+                    continue
+
+        return vocabularies
+
+    def delete(self, name: str) -> bool:
+        try:
+            file_path = self.file_path(name)
+
+            if not os.path.exists(file_path):
+                return False
+
+            os.remove(file_path)
+            document_cache.invalidate(file_path)
+            return True
+
+        except Exception as e:
+            print(f"删除词库失败: {e}")
+            return False
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.file_path(name))
+
+
+class JsonHistoryBackend(HistoryBackend):
+    """全部历史记录保存在一个 JSON 文件中 {"records": [...]}"""
+
+    def __init__(self, history_file: str):
+        self.history_file = history_file
+
+        # 确保目录存在
+        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
+
+        # 如果文件不存在，创建空记录
+        if not os.path.exists(self.history_file):
+            self._save_data({"records": []})
+
+    def _load_data(self) -> Dict:
+        """加载历史记录数据"""
+        try:
+            return document_cache.load(self.history_file, _read_json)
+        except Exception as e:
+            print(f"加载历史记录失败: {e}")
+            return {"records": []}
+
+    def _save_data(self, data: Dict) -> bool:
+        """保存历史记录数据"""
+        try:
+            _write_json(self.history_file, data, indent=2)
+            return True
+        except Exception as e:
+            print(f"保存历史记录失败: {e}")
+            return False
+
+    def append(self, record: Dict) -> bool:
+        data = self._load_data()
+        # 不修改缓存中的文档，写入成功后由新文档替换
+        data = dict(data, records=data.get("records", []) + [record])
+        return self._save_data(data)
+
+    def list(self, limit: Optional[int] = None) -> List[Dict]:
+        # 深拷贝：记录中的 wrong_words / user_answers 是嵌套结构，与缓存中的文档共享
+        records = copy.deepcopy(self._load_data().get("records", []))
+
+        # 按时间倒序排序
+        records.sort(key=lambda x: x.get("date", ""), reverse=True)
+
+        if limit:
+            return records[:limit]
+        return records
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        for record in self._load_data().get("records", []):
+            if record.get("id") == record_id:
+                return copy.deepcopy(record)
+        return None
+
+    def delete(self, record_id: str) -> bool:
+        data = self._load_data()
+        records = data.get("records", [])
+
+        # 过滤掉要删除的记录
+        new_records = [r for r in records if r.get("id") != record_id]
+
+        if len(new_records) < len(records):
+            return self._save_data(dict(data, records=new_records))
+
+        return False
+
+    def clear(self) -> bool:
+        return self._save_data({"records": []})
+
+    @property
+    def stats_file(self) -> str:
+        """统计汇总文件（与历史记录文件同目录，如 history.stats.json）"""
+        return os.path.splitext(self.history_file)[0] + ".stats.json"
+
+    def fingerprint(self) -> str:
+        try:
+            stat = os.stat(self.history_file)
+        except OSError:
+            return ""
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+    def load_stats(self) -> Optional[Dict]:
+        return _read_stats(self.stats_file)
+
+    def save_stats(self, stats: Dict):
+        _write_stats(self.stats_file, stats)
+
+
+class JsonWrongAnswerBackend(WrongAnswerBackend):
+    """错题本保存在一个 JSON 文件中 {"words": [...], "stats": {...}}"""
+
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+
+        # 确保数据文件存在
+        if not os.path.exists(self.data_file):
+            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
+            self._save_data(_empty_wrong_data())
+
+    def _load_data(self) -> Dict:
+        """加载错题数据"""
+        try:
+            return document_cache.load(self.data_file, _read_json)
+        except Exception as e:
+            print(f"加载错题数据失败: {e}")
+            return _empty_wrong_data()
+
+    def _save_data(self, data: Dict):
+        """保存错题数据"""
+        try:
+            _write_json(self.data_file, data, indent=4)
+        except Exception as e:
+            print(f"保存错题数据失败: {e}")
+
+    @staticmethod
+    def _total_wrong(data: Dict) -> int:
+        """保存的累计错误次数（缺失时由单词列表计算）"""
+        stats = data.get('stats')
+        if stats and 'total_wrong' in stats:
+            return stats['total_wrong']
+        return sum(w['wrong_count'] for w in data['words'])
+
+    def add(self, en: str, cn: str, user_answer: str, when: str):
+        self.add_many([(en, cn, user_answer)], when)
+
+    def add_many(self, entries: List[Tuple[str, str, str]], when: str):
+        """读取一次、按小写单词建索引逐个更新、写入一次；统计增量更新"""
+        if not entries:
+            return
+        data = self._load_data()
+        # 复制后修改（不修改缓存中的文档）
+        words = [dict(word) for word in data.get('words', [])]
+        data = dict(data, words=words)
+        index = {word['en'].lower(): word for word in words}
+        total_wrong = self._total_wrong(data)
+
+        for en, cn, user_answer in entries:
+            existing = index.get(en.lower())
+            if existing:
+                # 更新错误次数和时间
+                existing['wrong_count'] += 1
+                existing['last_wrong_time'] = when
+                existing['user_answer'] = user_answer  # 更新最新的错误答案
+            else:
+                # 新增错题
+                index[en.lower()] = {
+                    'en': en,
+                    'cn': cn,
+                    'user_answer': user_answer,
+                    'wrong_count': 1,
+                    'last_wrong_time': when
+                }
+                words.append(index[en.lower()])
+            total_wrong += 1
+
+        data['stats'] = {'total_wrong': total_wrong, 'unique_words': len(words)}
+        self._save_data(data)
+
+    def list(self) -> List[Dict]:
+        return [dict(word) for word in self._load_data().get('words', [])]
+
+    def stats(self) -> Dict:
+        return dict(self._load_data().get('stats', _empty_wrong_data()['stats']))
+
+    def remove(self, en: str):
+        data = self._load_data()
+        for i, word in enumerate(data['words']):
+            if word['en'].lower() == en.lower():
+                total_wrong = self._total_wrong(data) - word['wrong_count']
+                words = data['words'][:i] + data['words'][i + 1:]
+                self._save_data(dict(data, words=words, stats={
+                    'total_wrong': max(0, total_wrong),
+                    'unique_words': len(words)
+                }))
+                return
+
+    def clear(self):
+        self._save_data(_empty_wrong_data())
@@ -0,0 +1,101 @@
+"""
+把 JSON 文件中的数据一次性迁移到 SQLite 数据库
+
+    python -m src.storage.migrate
+    python -m src.storage.migrate --data-dir data --db data/dictation.db --force
+
+迁移完成后在数据库中记下标记，再次运行时直接跳过（--force 强制重新导入，已有数据按键覆盖，
+历史记录会重复导入）。原 JSON 文件保持不变，切回 json 后端时仍可使用。
+"""
+import argparse
+import json
+import os
+from datetime import datetime
+from typing import Dict
+
+from src.storage.sqlite_backend import (SqliteDatabase, SqliteHistoryBackend,
+                                        SqliteVocabularyBackend, SqliteWrongAnswerBackend)
+
+MIGRATED_KEY = "migrated_from_json"
+
+
+def _read_json(path: str):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"读取 {path} 失败: {e}")
+        return None
+
+
+def migrate_json_to_sqlite(db: SqliteDatabase, data_dir: str, force: bool = False) -> Dict[str, int]:
+    """
+    导入 data_dir 下的词库（vocabularies/*.json）、history.json 与 wrong_answers.json
+
+    Args:
+        db: 目标数据库
+        data_dir: JSON 数据目录
+        force: 已迁移过时是否仍然导入
+
+    Returns:
+        {"vocabularies", "records", "wrong_words"}: 导入的数量（已迁移过时均为 0）
+    """
+    counts = {"vocabularies": 0, "records": 0, "wrong_words": 0}
+    if db.get_meta(MIGRATED_KEY) and not force:
+        return counts
+
+    vocab_dir = os.path.join(data_dir, "vocabularies")
+    if os.path.isdir(vocab_dir):
+        vocabularies = SqliteVocabularyBackend(db)
+        for filename in sorted(os.listdir(vocab_dir)):
+            if not filename.endswith('.json'):
+                continue
+            data = _read_json(os.path.join(vocab_dir, filename))
+            if isinstance(data, dict) and vocabularies.import_document(
+                    data, name=data.get("name") or filename[:-len('.json')]):
+                counts["vocabularies"] += 1
+
+    history = _read_json(os.path.join(data_dir, "history.json")) \
+        if os.path.exists(os.path.join(data_dir, "history.json")) else None
+    if isinstance(history, dict):
+        records = SqliteHistoryBackend(db)
+        for record in history.get("records", []):
+            if records.append(record):
+                counts["records"] += 1
+
+    wrong = _read_json(os.path.join(data_dir, "wrong_answers.json")) \
+        if os.path.exists(os.path.join(data_dir, "wrong_answers.json")) else None
+    if isinstance(wrong, dict):
+        wrong_words = SqliteWrongAnswerBackend(db)
+        for word in wrong.get("words", []):
+            wrong_words.upsert(word.get("en", ""), word.get("cn", ""), word.get("user_answer", ""),
+                               word.get("wrong_count", 1), word.get("last_wrong_time", ""))
+            counts["wrong_words"] += 1
+
+    db.set_meta(MIGRATED_KEY, datetime.now().isoformat())
+    return counts
+
+
+def main(argv=None) -> int:
+    from src.storage import DATA_DIR, default_db_path
+
+    parser = argparse.ArgumentParser(description="把词库、历史记录和错题本从 JSON 文件迁移到 SQLite")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="JSON 数据目录（默认 data/）")
+    parser.add_argument("--db", default=None, help="数据库路径，默认读取 DICTATION_DB_PATH")
+    parser.add_argument("--force", action="store_true", help="已迁移过也重新导入")
+    args = parser.parse_args(argv)
+
+    db = SqliteDatabase(args.db or default_db_path())
+    if db.get_meta(MIGRATED_KEY) and not args.force:
+        print(f"{db.path} 已于 {db.get_meta(MIGRATED_KEY)} 迁移过，使用 --force 重新导入")
+        return 0
+
+    counts = migrate_json_to_sqlite(db, args.data_dir, force=args.force)
+    print(f"已迁移到 {db.path}：词库 {counts['vocabularies']} 个，历史记录 {counts['records']} 条，"
+          f"错题 {counts['wrong_words']} 个")
+    print("设置 DICTATION_STORAGE=sqlite 后应用将使用该数据库")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,334 @@
+"""
+SQLite 存储后端
+
+词库、历史记录、错题本共用一个数据库文件，使用 WAL 模式（读写互不阻塞，
+多个进程可以同时打开）。每次追加或更新只写入相关的行，开销与数据总量无关：
+- 历史记录按 date 建索引，get_all_records(limit) 只读取需要的行
+- 错题本以小写英文单词为主键，更新错误次数是一次按键的 UPSERT
+- 词库按名称为主键，列表只读取摘要列，不解析单词
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.storage.base import HistoryBackend, VocabularyBackend, WrongAnswerBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vocabularies (
+    name TEXT PRIMARY KEY,
+    words TEXT NOT NULL,
+    word_count INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS history (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_id ON history(id);
+CREATE INDEX IF NOT EXISTS idx_history_date ON history(date);
+CREATE TABLE IF NOT EXISTS wrong_answers (
+    word_key TEXT PRIMARY KEY,
+    en TEXT NOT NULL,
+    cn TEXT NOT NULL,
+    user_answer TEXT NOT NULL,
+    wrong_count INTEGER NOT NULL,
+    last_wrong_time TEXT NOT NULL
+);
+"""
+
+
+class SqliteDatabase:
+    """一个 SQLite 数据库连接（线程安全，写入在事务中串行执行）"""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """在一个事务中执行（正常结束时提交，出错时回滚）"""
+        with self._lock:
+            with self._conn:
+                yield self._conn
+
+    def query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        rows = self.query("SELECT value FROM meta WHERE key = ?", (key,))
+        return rows[0]["value"] if rows else None
+
+    def set_meta(self, key: str, value: str):
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SqliteVocabularyBackend(VocabularyBackend):
+    """词库表：单词列表以 JSON 保存在一行中，其他字段（如 description）保存在 extra 列"""
+
+    CORE_FIELDS = ("name", "words", "created_at", "updated_at")
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def save(self, name: str, words: List[Dict], update_time: bool = True) -> bool:
+        now = datetime.now().isoformat()
+        try:
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO vocabularies (name, words, word_count, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET words = excluded.words, "
+                    "word_count = excluded.word_count, "
+                    "updated_at = CASE WHEN ? THEN excluded.updated_at ELSE vocabularies.created_at END",
+                    (name, json.dumps(words, ensure_ascii=False), len(words), now, now, update_time)
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"保存词库失败: {e}")
+            return False
+
+    def import_document(self, data: Dict, name: Optional[str] = None) -> bool:
+        """按原样写入完整的词库文档（保留时间戳与其他字段，供迁移使用）"""
+        name = name or data.get("name", "")
+        words = data.get("words", [])
+        created_at = data.get("created_at") or datetime.now().isoformat()
+        extra = {k: v for k, v in data.items() if k not in self.CORE_FIELDS}
+        try:
+            with self.db.transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO vocabularies "
+                    "(name, words, word_count, created_at, updated_at, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, json.dumps(words, ensure_ascii=False), len(words), created_at,
+                     data.get("updated_at") or created_at, json.dumps(extra, ensure_ascii=False))
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"导入词库失败: {e}")
+            return False
+
+    def load(self, name: str) -> Optional[Dict]:
+        try:
+            rows = self.db.query("SELECT * FROM vocabularies WHERE name = ?", (name,))
+        except sqlite3.Error as e:
+            print(f"加载词库失败: {e}")
+            return None
+        if not rows:
+            return None
+        row = rows[0]
+        data = json.loads(row["extra"])
+        data.update({
+            "name": row["name"],
+            "words": json.loads(row["words"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        })
+        return data
+
+    def list(self) -> List[Dict]:
+        try:
+            rows = self.db.query(
+                "SELECT name, word_count, created_at, updated_at FROM vocabularies")
+        except sqlite3.Error as e:
+            print(f"列出词库失败: {e}")
+            return []
+        return [dict(row) for row in rows]
+
+    def delete(self, name: str) -> bool:
+        try:
+            with self.db.transaction() as conn:
+                return conn.execute("DELETE FROM vocabularies WHERE name = ?", (name,)).rowcount > 0
+        except sqlite3.Error as e:
+            print(f"删除词库失败: {e}")
+            return False
+
+    def exists(self, name: str) -> bool:
+        try:
+            return bool(self.db.query("SELECT 1 FROM vocabularies WHERE name = ?", (name,)))
+        except sqlite3.Error:
+            return False
+
+
+class SqliteHistoryBackend(HistoryBackend):
+    """历史记录表：每条记录一行（完整记录以 JSON 保存），按 date 建索引"""
+
+    STATS_KEY = "history_stats"
+    VERSION_KEY = "history_version"  # 每次写入加一，作为 fingerprint
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def _bump_version(self, conn: sqlite3.Connection):
+        conn.execute("INSERT INTO meta (key, value) VALUES (?, '1') "
+                     "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+                     (self.VERSION_KEY,))
+
+    def append(self, record: Dict) -> bool:
+        try:
+            with self.db.transaction() as conn:
+                conn.execute("INSERT INTO history (id, date, data) VALUES (?, ?, ?)",
+                             (record.get("id", ""), record.get("date", ""),
+                              json.dumps(record, ensure_ascii=False)))
+                self._bump_version(conn)
+            return True
+        except sqlite3.Error as e:
+            print(f"保存历史记录失败: {e}")
+            return False
+
+    def list(self, limit: Optional[int] = None) -> List[Dict]:
+        sql = "SELECT data FROM history ORDER BY date DESC, seq ASC"
+        params: tuple = ()
+        if limit:
+            sql += " LIMIT ?"
+            params = (limit,)
+        try:
+            rows = self.db.query(sql, params)
+        except sqlite3.Error as e:
+            print(f"加载历史记录失败: {e}")
+            return []
+        return [json.loads(row["data"]) for row in rows]
+
+    def get(self, record_id: str) -> Optional[Dict]:
+        try:
+            rows = self.db.query(
+                "SELECT data FROM history WHERE id = ? ORDER BY seq LIMIT 1", (record_id,))
+        except sqlite3.Error as e:
+            print(f"加载历史记录失败: {e}")
+            return None
+        return json.loads(rows[0]["data"]) if rows else None
+
+    def delete(self, record_id: str) -> bool:
+        try:
+            with self.db.transaction() as conn:
+                if conn.execute("DELETE FROM history WHERE id = ?", (record_id,)).rowcount == 0:
+                    return False
+                self._bump_version(conn)
+                return True
+        except sqlite3.Error as e:
+            print(f"删除历史记录失败: {e}")
+            return False
+
+    def clear(self) -> bool:
+        try:
+            with self.db.transaction() as conn:
+                conn.execute("DELETE FROM history")
+                self._bump_version(conn)
+            return True
+        except sqlite3.Error as e:
+            print(f"清空历史记录失败: {e}")
+            return False
+
+    def fingerprint(self) -> str:
+        try:
+            return self.db.get_meta(self.VERSION_KEY) or "0"
+        except sqlite3.Error:
+            return ""
+
+    def load_stats(self) -> Optional[Dict]:
+        try:
+            value = self.db.get_meta(self.STATS_KEY)
+        except sqlite3.Error as e:
+            print(f"加载统计数据失败: {e}")
+            return None
+        return json.loads(value) if value else None
+
+    def save_stats(self, stats: Dict):
+        try:
+            self.db.set_meta(self.STATS_KEY, json.dumps(stats, ensure_ascii=False))
+        except sqlite3.Error as e:
+            print(f"保存统计数据失败: {e}")
+
+
+class SqliteWrongAnswerBackend(WrongAnswerBackend):
+    """错题表：以小写英文单词为主键，rowid 保持首次收录顺序"""
+
+    def __init__(self, db: SqliteDatabase):
+        self.db = db
+
+    def add(self, en: str, cn: str, user_answer: str, when: str):
+        self.upsert(en, cn, user_answer, 1, when)
+
+    UPSERT_SQL = (
+        "INSERT INTO wrong_answers "
+        "(word_key, en, cn, user_answer, wrong_count, last_wrong_time) "
+        "VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(word_key) DO UPDATE SET "
+        "wrong_count = wrong_answers.wrong_count + excluded.wrong_count, "
+        "user_answer = excluded.user_answer, "
+        "last_wrong_time = excluded.last_wrong_time"
+    )
+
+    def upsert(self, en: str, cn: str, user_answer: str, count: int, when: str):
+        """错误次数加 count（不存在时新增），并更新最近答案与时间"""
+        try:
+            with self.db.transaction() as conn:
+                conn.execute(self.UPSERT_SQL, (en.lower(), en, cn, user_answer, count, when))
+        except sqlite3.Error as e:
+            print(f"保存错题数据失败: {e}")
+
+    def add_many(self, entries: List[Tuple[str, str, str]], when: str):
+        """在一个事务中逐个 UPSERT"""
+        try:
+            with self.db.transaction() as conn:
+                conn.executemany(self.UPSERT_SQL, [(en.lower(), en, cn, user_answer, 1, when)
+                                                   for en, cn, user_answer in entries])
+        except sqlite3.Error as e:
+            print(f"保存错题数据失败: {e}")
+
+    def list(self) -> List[Dict]:
+        try:
+            rows = self.db.query(
+                "SELECT en, cn, user_answer, wrong_count, last_wrong_time "
+                "FROM wrong_answers ORDER BY rowid")
+        except sqlite3.Error as e:
+            print(f"加载错题数据失败: {e}")
+            return []
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict:
+        try:
+            row = self.db.query(
+                "SELECT COALESCE(SUM(wrong_count), 0) AS total_wrong, COUNT(*) AS unique_words "
+                "FROM wrong_answers")[0]
+        except sqlite3.Error as e:
+            print(f"加载错题数据失败: {e}")
+            return {'total_wrong': 0, 'unique_words': 0}
+        return {'total_wrong': row["total_wrong"], 'unique_words': row["unique_words"]}
+
+    def remove(self, en: str):
+        try:
+            with self.db.transaction() as conn:
+                conn.execute("DELETE FROM wrong_answers WHERE word_key = ?", (en.lower(),))
+        except sqlite3.Error as e:
+            print(f"保存错题数据失败: {e}")
+
+    def clear(self):
+        try:
+            with self.db.transaction() as conn:
+                conn.execute("DELETE FROM wrong_answers")
+        except sqlite3.Error as e:
+            print(f"保存错题数据失败: {e}")
@@ -0,0 +1,68 @@
+"""
+文本规范化 - 把读音相同的不同写法统一为同一存储键
+
+"ice-cream"、"ice cream"、"ice_cream." 规范化后都是 "ice cream"，共用一个音频。
+规范化结果只用于存储键（键由完整文本哈希得到），合成时仍把原文交给 TTS；
+可能影响读音的差异（大小写如 "Polish"/"polish"、"1/2"、"n. 苹果" 中的空格）一律保留，
+读音不同的文本始终对应不同的键。
+
+规则：
+- 英文：全角转半角，单词间的连字符/下划线视为空格，去掉首尾标点，大小写不变
+- 中文：全角转半角后，义项分隔符（；;，,、/）统一为中文逗号，去掉汉字之间的空格与首尾标点
+"""
+import re
+import unicodedata
+
+# 单词内部的连接符：ice-cream、ice_cream（斜杠会改变读音，如 1/2，不在此列）
+_EN_JOINERS = re.compile(r"(?<=[^\W_])[-_‐‑‒–—]+(?=[^\W_])")
+_EN_EDGE_PUNCT = " \t\n\"'`,;:!?*~-_/\\"
+_QUOTES = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"'})
+
+# 中文义项分隔符（NFKC 后全角标点已转为半角）
+_CN_SEPARATORS = re.compile(r"\s*[;,、/|]+\s*")
+_CN_EDGE_PUNCT = " \t\n\"'`,;:!?.*~-_/\\，。、；！？…"
+_CJK = r"㐀-鿿豈-﫿"
+# 只去掉两侧都是汉字（或逗号）的空格，"n. 苹果" 中词性与释义之间的空格保留
+_CN_SPACES = re.compile(rf"(?<=[{_CJK}，])\s+(?=[{_CJK}，])")
+
+
+def _collapse_spaces(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _normalize_en(text: str) -> str:
+    text = _EN_JOINERS.sub(" ", text.translate(_QUOTES))
+    text = _collapse_spaces(text).strip(_EN_EDGE_PUNCT)
+    # 句末的句号去掉，缩写中的点（a.m.、U.S.）保留
+    if text.endswith(".") and text.count(".") == 1:
+        text = text[:-1].rstrip(_EN_EDGE_PUNCT)
+    return text
+
+
+def _normalize_cn(text: str) -> str:
+    text = _CN_SEPARATORS.sub("，", text.translate(_QUOTES))
+    text = _CN_SPACES.sub("", _collapse_spaces(text))
+    return text.strip(_CN_EDGE_PUNCT)
+
+
+def normalize_text(text: str, lang: str = "en") -> str:
+    """
+    规范化文本，用于生成存储键（幂等：对结果再次规范化不变）
+
+    Args:
+        text: 原始文本
+        lang: 语言（en/cn），其他值只做全角转半角与空白合并
+
+    Returns:
+        规范化后的文本；规范化后为空（例如只有标点）时返回去掉首尾空白的原文
+    """
+    if not text:
+        return text
+    folded = unicodedata.normalize("NFKC", text)
+    if lang == "en":
+        normalized = _normalize_en(folded)
+    elif lang == "cn":
+        normalized = _normalize_cn(folded)
+    else:
+        normalized = _collapse_spaces(folded)
+    return normalized or text.strip()
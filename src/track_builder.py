@@ -0,0 +1,216 @@
+"""
+整段听写音频导出 - 把缓存的单词音频与静音拼接为一个 MP3
+
+按播放顺序逐个读取片段并以帧为单位"流复制"写入输出文件，
+片段之间插入与片段规格一致的静音帧，不解码也不重新编码；
+同一时刻内存中只保留一个片段。
+
+文件开头写入 ID3v2.4 章节标签（CHAP/CTOC），播放器可按单词跳转。
+"""
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from src.audio_profile import transcode_available, transcode_mp3
+from src.mp3_utils import get_duration, iter_frames, make_silence
+
+
+# 一个 CTOC 最多列出 255 个子元素
+_TOC_MAX_ENTRIES = 255
+
+
+def _syncsafe(size: int) -> bytes:
+    """ID3v2.4 的 28 位同步安全整数"""
+    return bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+
+
+def _id3_frame(frame_id: str, body: bytes) -> bytes:
+    return frame_id.encode("latin-1") + _syncsafe(len(body)) + b"\x00\x00" + body
+
+
+def _title_frame(title: str) -> bytes:
+    # 编码 3 = UTF-8
+    return _id3_frame("TIT2", b"\x03" + title.encode("utf-8") + b"\x00")
+
+
+def _chapter_frame(element_id: str, title: str, start: float, end: float) -> bytes:
+    body = (
+        element_id.encode("latin-1") + b"\x00"
+        + int(round(start * 1000)).to_bytes(4, "big")
+        + int(round(end * 1000)).to_bytes(4, "big")
+        + b"\xff\xff\xff\xff" * 2  # 不使用字节偏移
+        + _title_frame(title)
+    )
+    return _id3_frame("CHAP", body)
+
+
+def _toc_frame(element_id: str, children: List[str], top_level: bool,
+               title: Optional[str] = None) -> bytes:
+    flags = 0x01 | (0x02 if top_level else 0)  # bit0 有序，bit1 顶层
+    body = (
+        element_id.encode("latin-1") + b"\x00"
+        + bytes([flags, len(children)])
+        + b"".join(child.encode("latin-1") + b"\x00" for child in children)
+    )
+    if title:
+        body += _title_frame(title)
+    return _id3_frame("CTOC", body)
+
+
+def build_chapter_tag(chapters: List[Dict], title: str = "") -> bytes:
+    """
+    生成包含章节索引的 ID3v2.4 标签
+
+    Args:
+        chapters: [{"title", "start", "end"}, ...]（秒）
+        title: 整段音频的标题
+
+    Returns:
+        ID3v2.4 标签字节（没有章节且没有标题时为空）
+    """
+    frames = []
+    if title:
+        frames.append(_title_frame(title))
+
+    chapter_ids = [f"ch{i}" for i in range(len(chapters))]
+    if chapters:
+        if len(chapter_ids) <= _TOC_MAX_ENTRIES:
+            frames.append(_toc_frame("toc", chapter_ids, top_level=True))
+        else:
+            # 超过单个目录的容量时分成多个子目录
+            groups = [chapter_ids[i:i + _TOC_MAX_ENTRIES]
+                      for i in range(0, len(chapter_ids), _TOC_MAX_ENTRIES)]
+            group_ids = [f"toc{i}" for i in range(len(groups))]
+            frames.append(_toc_frame("toc", group_ids, top_level=True))
+            for group_id, group in zip(group_ids, groups):
+                frames.append(_toc_frame(group_id, group, top_level=False))
+        for element_id, chapter in zip(chapter_ids, chapters):
+            frames.append(_chapter_frame(element_id, chapter["title"],
+                                         chapter["start"], chapter["end"]))
+
+    if not frames:
+        return b""
+    body = b"".join(frames)
+    return b"ID3\x04\x00\x00" + _syncsafe(len(body)) + body
+
+
+class _TrackWriter:
+    """逐片段写入音频帧并累计时长"""
+
+    def __init__(self, f):
+        self.f = f
+        self.duration = 0.0
+        self.params: Optional[Tuple[int, int, int]] = None  # (采样率, 比特率, 声道数)
+        self._silence: Dict[tuple, Tuple[bytes, float]] = {}
+
+    def add_clip(self, data: bytes) -> bool:
+        """写入一个片段的音频帧（跳过标签与元数据帧），返回是否写入了音频"""
+        written = False
+        for offset, length, info in iter_frames(data):
+            if self.params is None:
+                self.params = (info["sample_rate"], info["bitrate"], info["channels"])
+            self.f.write(data[offset:offset + length])
+            self.duration += info["samples"] / info["sample_rate"]
+            written = True
+        return written
+
+    def add_silence(self, seconds: float):
+        """写入静音帧（规格与第一个片段一致）"""
+        if seconds <= 0 or self.params is None:
+            return
+        key = (self.params, seconds)
+        if key not in self._silence:
+            sample_rate, bitrate, channels = self.params
+            silence = make_silence(seconds, sample_rate=sample_rate, bitrate=bitrate,
+                                   channels=channels)
+            self._silence[key] = (silence, get_duration(silence))
+        silence, duration = self._silence[key]
+        self.f.write(silence)
+        self.duration += duration
+
+
+def _read_clip(path: str, params: Optional[Tuple[int, int, int]]) -> bytes:
+    """
+    读取片段；规格与整段音频不一致时（例如 MiniMax 与 Edge 混用）转码后再拼接
+
+    没有 ffmpeg 时按原样拼接（多数播放器可以处理采样率变化）。
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if params is None:
+        return data
+
+    for _, _, info in iter_frames(data):
+        if (info["sample_rate"], info["channels"]) == (params[0], params[2]):
+            return data
+        break
+    else:
+        return data
+
+    if not transcode_available():
+        print(f"片段规格不一致，按原样拼接: {path}")
+        return data
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".mp3")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        transcode_mp3(tmp_path, params[0], params[1])
+        with open(tmp_path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(tmp_path)
+
+
+def build_track(items: List[Dict], output_path: str, title: str = "") -> List[Dict]:
+    """
+    拼接整段音频
+
+    Args:
+        items: 按播放顺序排列的片段
+            [{"path": 音频路径, "gap": 片段后的静音秒数, "chapter": 章节标题}, ...]
+            相邻且章节标题相同的片段合并为一个章节
+        output_path: 输出 MP3 路径
+        title: 整段音频的标题
+
+    Returns:
+        章节列表 [{"title", "start", "end"}, ...]（秒）
+
+    Raises:
+        ValueError: 没有任何可拼接的 MP3 片段
+    """
+    chapters: List[Dict] = []
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, audio_tmp = tempfile.mkstemp(suffix=".tmp", dir=out_dir)
+    tmp_path = None  # 输出的临时文件，替换到 output_path 之前出错时删除
+    try:
+        with os.fdopen(fd, "wb") as f:
+            writer = _TrackWriter(f)
+            for item in items:
+                start = writer.duration
+                if not writer.add_clip(_read_clip(item["path"], writer.params)):
+                    print(f"跳过无法拼接的音频: {item['path']}")
+                    continue
+
+                chapter = item.get("chapter", "")
+                if not chapters or chapters[-1]["title"] != chapter:
+                    chapters.append({"title": chapter, "start": start})
+                writer.add_silence(item.get("gap", 0))
+                chapters[-1]["end"] = writer.duration
+
+        if writer.params is None:
+            raise ValueError("没有可拼接的 MP3 音频")
+
+        # 章节时间在写完音频后才确定，因此最后把标签与音频合并到输出文件
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=out_dir)
+        with os.fdopen(fd, "wb") as out, open(audio_tmp, "rb") as audio:
+            out.write(build_chapter_tag(chapters, title))
+            shutil.copyfileobj(audio, out)
+        os.replace(tmp_path, output_path)
+        tmp_path = None
+    finally:
+        os.remove(audio_tmp)
+        if tmp_path is not None:
+            os.remove(tmp_path)
+    return chapters
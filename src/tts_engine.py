@@ -4,9 +4,14 @@ TTS语音引擎 - 文字转语音播报
 import asyncio
 import tempfile
 import os
-from typing import Optional
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from typing import Callable, Coroutine, Dict, List, Optional, Tuple, Union
 import edge_tts
 
+from src.circuit_breaker import CircuitBreaker
+
 # pyttsx3 仅本地使用，云端跳过
 try:
     import pyttsx3
@@ -15,14 +20,71 @@ except ImportError:
     PYTTSX3_AVAILABLE = False
 
 
+class _EventLoopThread:
+    """在后台线程中常驻运行的事件循环，供所有 TTS 协程复用"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="tts-event-loop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """提交协程，返回线程安全的 Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None):
+        """在常驻事件循环上执行协程并等待结果"""
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("不能在 TTS 事件循环线程内同步等待")
+        return self.submit(coro).result(timeout)
+
+
+_loop_thread: Optional[_EventLoopThread] = None
+_loop_thread_lock = threading.Lock()
+
+
+def get_tts_loop() -> _EventLoopThread:
+    """获取进程内共享的 TTS 事件循环"""
+    global _loop_thread
+    if _loop_thread is None:
+        with _loop_thread_lock:
+            if _loop_thread is None:
+                _loop_thread = _EventLoopThread()
+    return _loop_thread
+
+
 class TTSEngine:
     """语音播报引擎"""
+
+    # 音色类型 -> edge-tts 音色
+    VOICES = {
+        "us_female": "en-US-AriaNeural",
+        "us_male": "en-US-GuyNeural",
+        "uk_female": "en-GB-SoniaNeural",
+        "uk_male": "en-GB-RyanNeural",
+        "chinese": "zh-CN-XiaoxiaoNeural",
+    }
+
+    # edge-tts 固定输出 24kHz 48kbps 单声道 MP3
+    OUTPUT_SAMPLE_RATE = 24000
+    OUTPUT_BITRATE = 48000
+
+    # 单次 Edge TTS 合成的超时（秒）
+    EDGE_TIMEOUT = 10.0
     
     def __init__(self):
         self.engine_type = "edge"  # 默认使用edge-tts
         self.voice = "en-US-AriaNeural"  # 默认美式英语女声
         self.rate = "+0%"  # 语速
         self.volume = "+0%"  # 音量
+        self._local_lock = threading.Lock()  # pyttsx3 不支持并发调用
+        # Edge TTS 故障时熔断，speak 直接使用本地 TTS，不再逐次等待超时
+        self.edge_breaker = CircuitBreaker(latency_budget=self.EDGE_TIMEOUT)
         
         # 初始化本地TTS作为备选
         self._init_local_tts()
@@ -52,16 +114,8 @@ class TTSEngine:
                 - "uk_male": 英式英语男声
                 - "chinese": 中文
         """
-        voices = {
-            "us_female": "en-US-AriaNeural",
-            "us_male": "en-US-GuyNeural",
-            "uk_female": "en-GB-SoniaNeural",
-            "uk_male": "en-GB-RyanNeural",
-            "chinese": "zh-CN-XiaoxiaoNeural",
-        }
-        
-        if voice_type in voices:
-            self.voice = voices[voice_type]
+        if voice_type in self.VOICES:
+            self.voice = self.VOICES[voice_type]
     
     def set_rate(self, speed: float = 1.0):
         """
@@ -75,67 +129,155 @@ class TTSEngine:
         if speed > 2.0:
             speed = 2.0
         
-        # 转换为edge-tts格式
-        if speed > 1.0:
-            self.rate = f"+{int((speed - 1) * 100)}%"
-        elif speed < 1.0:
-            self.rate = f"-{int((1 - speed) * 100)}%"
-        else:
-            self.rate = "+0%"
+        self.rate = self.speed_to_rate(speed)
         
         # 同时更新本地TTS
         if self.local_tts:
             rate = int(150 * speed)
             self.local_tts.setProperty('rate', rate)
     
-    async def _speak_edge_async(self, text: str) -> str:
+    @staticmethod
+    def speed_to_rate(speed: float) -> str:
+        """倍速 -> edge-tts 语速字符串"""
+        speed = max(0.5, min(2.0, speed))
+        if speed > 1.0:
+            return f"+{int(round((speed - 1) * 100))}%"
+        if speed < 1.0:
+            return f"-{int(round((1 - speed) * 100))}%"
+        return "+0%"
+
+    async def aspeak(self, text: str, save_path: Optional[str] = None,
+                     voice: Optional[str] = None, rate: Optional[str] = None) -> str:
         """
-        使用edge-tts生成语音文件
+        使用edge-tts生成语音文件（协程版本）
+
+        音频分片到达即写入 save_path，不再经过临时文件和重命名。
         
         Returns:
             生成的音频文件路径
         """
+        if not text:
+            return ""
+
         communicate = edge_tts.Communicate(
             text=text,
-            voice=self.voice,
-            rate=self.rate,
+            voice=voice or self.voice,
+            rate=rate or self.rate,
             volume=self.volume
         )
-        
-        # 创建临时文件
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
-            temp_path = f.name
-        
-        await communicate.save(temp_path)
-        return temp_path
+
+        created = save_path is None
+        if created:
+            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as f:
+                save_path = f.name
+
+        try:
+            with open(save_path, "wb") as f:
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        f.write(chunk["data"])
+        except BaseException:
+            if created:
+                try:
+                    os.remove(save_path)
+                except OSError:
+                    pass
+            raise
+        return save_path
+
+    async def aspeak_many(self, items: List[Dict], concurrency: int = 8,
+                          on_done: Optional[Callable[[int, Union[str, Exception]], None]] = None,
+                          should_stop: Optional[Callable[[], bool]] = None,
+                          timeout: Optional[float] = None,
+                          fallback_local: bool = True,
+                          on_start: Optional[Callable[[int], None]] = None
+                          ) -> List[Union[str, Exception]]:
+        """
+        并发合成多条语音（协程版本）
+
+        Args:
+            items: [{"text", "save_path", "voice", "rate"}, ...]，除 text 外均可省略
+            concurrency: 同时进行的合成数量上限
+            on_done: 每条完成时的回调 (序号, 路径或异常)
+            should_stop: 每条开始前检查，返回 True 时跳过（结果为 CancelledError）
+            timeout: 单条合成的超时（秒），超时按失败处理
+            fallback_local: Edge TTS 失败时是否改用本地 TTS（由调用方自行回退时传 False）
+            on_start: 每条开始合成时的回调 (序号)，可用于统计单条耗时
+
+        Returns:
+            与 items 一一对应的结果列表，失败项为异常对象
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        loop = asyncio.get_running_loop()
+
+        async def speak_one(index: int, item: Dict):
+            async with semaphore:
+                if should_stop and should_stop():
+                    result = CancelledError()
+                else:
+                    if on_start:
+                        on_start(index)
+                    try:
+                        result = await asyncio.wait_for(self.aspeak(**item), timeout)
+                    except Exception as e:
+                        result = e
+                        if fallback_local and self.local_tts:
+                            try:
+                                result = await loop.run_in_executor(
+                                    None, self._speak_local, item["text"], item.get("save_path")
+                                )
+                            except Exception as local_error:
+                                result = local_error
+            if on_done:
+                on_done(index, result)
+            return result
+
+        return await asyncio.gather(*(speak_one(i, item) for i, item in enumerate(items)))
+
+    def speak_many(self, items: List[Dict], concurrency: int = 8,
+                   on_done: Optional[Callable[[int, Union[str, Exception]], None]] = None,
+                   should_stop: Optional[Callable[[], bool]] = None,
+                   timeout: Optional[float] = None,
+                   fallback_local: bool = True,
+                   on_start: Optional[Callable[[int], None]] = None
+                   ) -> List[Union[str, Exception]]:
+        """并发合成多条语音，在共享事件循环上执行（参数见 aspeak_many）"""
+        return get_tts_loop().run(self.aspeak_many(items, concurrency, on_done, should_stop,
+                                                   timeout, fallback_local, on_start))
     
-    def speak(self, text: str, save_path: Optional[str] = None) -> str:
+    def speak(self, text: str, save_path: Optional[str] = None,
+              voice: Optional[str] = None, rate: Optional[str] = None) -> str:
         """
         播报文字
         
         Args:
             text: 要播报的文字
             save_path: 保存路径，None则创建临时文件
+            voice: 本次使用的 edge-tts 音色（不修改实例状态，可并发调用）
+            rate: 本次使用的语速，如 "+10%"
             
         Returns:
             音频文件路径
         """
         if not text:
             return ""
-        
+
+        if not self.edge_breaker.allow():
+            # Edge TTS 熔断中：直接使用本地 TTS
+            return self._speak_local(text, save_path)
+
+        start = time.monotonic()
         try:
-            # 使用edge-tts
-            audio_path = asyncio.run(self._speak_edge_async(text))
-            
-            if save_path:
-                os.rename(audio_path, save_path)
-                return save_path
-            
-            return audio_path
-            
+            # 使用edge-tts（在共享事件循环上执行，不再每次新建事件循环）
+            path = get_tts_loop().run(asyncio.wait_for(
+                self.aspeak(text, save_path, voice=voice, rate=rate), self.EDGE_TIMEOUT
+            ))
         except Exception as e:
+            self.edge_breaker.record_failure()
             print(f"Edge TTS失败，尝试本地TTS: {e}")
             return self._speak_local(text, save_path)
+        self.edge_breaker.record_success(time.monotonic() - start)
+        return path
     
     def _speak_local(self, text: str, save_path: Optional[str] = None) -> str:
         """使用本地TTS"""
@@ -146,11 +288,38 @@ class TTSEngine:
             with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
                 save_path = f.name
         
-        self.local_tts.save_to_file(text, save_path)
-        self.local_tts.runAndWait()
+        with self._local_lock:
+            self.local_tts.save_to_file(text, save_path)
+            self.local_tts.runAndWait()
         
         return save_path
     
+    def speak_local_batch(self, items: List[Tuple[str, str]]) -> List[Union[str, Exception]]:
+        """
+        用本地 TTS 一次合成多条语音（pyttsx3 排队后只调用一次 runAndWait）
+
+        Args:
+            items: [(文本, 保存路径), ...]
+
+        Returns:
+            与 items 一一对应的结果，失败项为异常对象
+        """
+        if not self.local_tts:
+            raise RuntimeError("没有可用的TTS引擎")
+
+        with self._local_lock:
+            for text, save_path in items:
+                self.local_tts.save_to_file(text, save_path)
+            self.local_tts.runAndWait()
+
+        results: List[Union[str, Exception]] = []
+        for text, save_path in items:
+            if os.path.exists(save_path) and os.path.getsize(save_path) > 0:
+                results.append(save_path)
+            else:
+                results.append(RuntimeError(f"本地合成失败: {text}"))
+        return results
+
     def get_audio_bytes(self, text: str) -> bytes:
         """获取音频文件的二进制数据"""
         audio_path = self.speak(text)
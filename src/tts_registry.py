@@ -0,0 +1,212 @@
+"""
+TTS 引擎注册表 - 可插拔的合成引擎与按健康状况排序的路由
+
+每个引擎登记能力信息（支持的语言、典型延迟、成本、是否离线、是否支持批量）
+和合成函数；每个引擎配有一个熔断器（见 circuit_breaker），AudioCache 按路由结果依次尝试，
+熔断中的引擎不参与路由，调用直接落到下一个健康的引擎。
+
+自定义引擎示例：
+    cache.registry.register(
+        EngineInfo("espeak", languages=("en",), latency=0.05, cost=0.0, offline=True, batch=False),
+        render=lambda text, spec, tmp_path: my_render(text, tmp_path),
+    )
+"""
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from src.circuit_breaker import CircuitBreaker
+
+
+class EngineInfo(NamedTuple):
+    """引擎能力信息"""
+    name: str
+    languages: Tuple[str, ...]  # 支持的语言（en/cn）
+    latency: float              # 单个单词的典型合成耗时（秒）
+    cost: float                 # 每千次合成的相对成本（0 为免费）
+    offline: bool               # 是否无需网络
+    batch: bool                 # 是否支持一次调用合成多个单词
+
+
+# 内置引擎（按音质从高到低排列，也是默认的回退顺序）
+MINIMAX_INFO = EngineInfo("minimax", ("en", "cn"), latency=1.0, cost=1.0, offline=False, batch=True)
+EDGE_INFO = EngineInfo("edge", ("en", "cn"), latency=0.8, cost=0.0, offline=False, batch=False)
+LOCAL_INFO = EngineInfo("local", ("en", "cn"), latency=0.3, cost=0.0, offline=True, batch=True)
+
+# render(文本, 合成参数, 临时文件路径) -> 实际写入的路径
+RenderFunc = Callable[[str, Dict, str], str]
+# render_batch([(文本, 合成参数, 临时文件路径), ...]) -> 路径或异常
+BatchRenderFunc = Callable[[List[Tuple[str, Dict, str]]], List[Union[str, Exception]]]
+
+
+class _Engine:
+    def __init__(self, info: EngineInfo, render: RenderFunc,
+                 render_batch: Optional[BatchRenderFunc],
+                 available: Optional[Callable[[], bool]], breaker: CircuitBreaker, order: int):
+        self.info = info
+        self.render = render
+        self.render_batch = render_batch
+        self.available = available
+        self.breaker = breaker
+        self.order = order
+        self.avg_latency = info.latency
+
+
+class TTSRegistry:
+    """引擎注册表与健康感知路由"""
+
+    # 延迟滑动平均的权重
+    LATENCY_ALPHA = 0.2
+
+    def __init__(self):
+        self._engines: Dict[str, _Engine] = {}
+        self._lock = threading.Lock()
+        self._order = 0
+
+    def register(self, info: EngineInfo, render: RenderFunc,
+                 render_batch: Optional[BatchRenderFunc] = None,
+                 available: Optional[Callable[[], bool]] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        """
+        登记引擎（同名引擎会被替换，保留原有的排列顺序）
+
+        Args:
+            info: 能力信息
+            render: 单条合成函数
+            render_batch: 批量合成函数（info.batch 为 True 时使用）
+            available: 返回引擎当前是否可用（例如依赖是否安装），默认总是可用
+            breaker: 熔断器（可设置延迟预算），默认按失败率熔断、不限延迟
+        """
+        if breaker is None:
+            breaker = CircuitBreaker()
+        with self._lock:
+            old = self._engines.get(info.name)
+            if old is not None:
+                order = old.order
+            else:
+                order = self._order
+                self._order += 1
+            self._engines[info.name] = _Engine(info, render, render_batch, available, breaker, order)
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._engines.pop(name, None)
+
+    def names(self) -> List[str]:
+        """按登记顺序返回所有引擎名称"""
+        with self._lock:
+            return [e.info.name for e in sorted(self._engines.values(), key=lambda e: e.order)]
+
+    def info(self, name: str) -> Optional[EngineInfo]:
+        engine = self._engines.get(name)
+        return engine.info if engine else None
+
+    def renderer(self, name: str) -> RenderFunc:
+        engine = self._engines.get(name)
+        if engine is None:
+            raise KeyError(f"未登记的 TTS 引擎: {name}")
+        return engine.render
+
+    def batch_renderer(self, name: str) -> Optional[BatchRenderFunc]:
+        engine = self._engines.get(name)
+        return engine.render_batch if engine and engine.info.batch else None
+
+    def is_available(self, name: str) -> bool:
+        engine = self._engines.get(name)
+        if engine is None:
+            return False
+        if engine.available is None:
+            return True
+        try:
+            return bool(engine.available())
+        except Exception:
+            return False
+
+    def breaker(self, name: str) -> Optional[CircuitBreaker]:
+        engine = self._engines.get(name)
+        return engine.breaker if engine else None
+
+    def is_healthy(self, name: str) -> bool:
+        """熔断器是否允许尝试（不占用半开探测名额）"""
+        engine = self._engines.get(name)
+        return engine is not None and engine.breaker.ready()
+
+    def acquire(self, name: str) -> bool:
+        """
+        调用引擎前申请放行
+
+        Returns:
+            False 表示引擎熔断中（或半开探测已被其他调用占用），应直接尝试下一个引擎；
+            True 时调用结束后必须 report_success 或 report_failure
+        """
+        engine = self._engines.get(name)
+        return engine is not None and engine.breaker.allow()
+
+    def report_success(self, name: str, latency: Optional[float] = None):
+        """记录一次成功的合成（latency 为单个单词的耗时，超出延迟预算按失败计；未知时传 None）"""
+        engine = self._engines.get(name)
+        if engine is None:
+            return
+        engine.breaker.record_success(latency)
+        if latency is not None:
+            with self._lock:
+                engine.avg_latency += self.LATENCY_ALPHA * (latency - engine.avg_latency)
+
+    def report_failure(self, name: str):
+        """记录一次失败的合成，失败率达到阈值后熔断"""
+        engine = self._engines.get(name)
+        if engine is not None:
+            engine.breaker.record_failure()
+
+    def route(self, lang: Optional[str] = None, preferred: Optional[str] = None,
+              max_cost: Optional[float] = None, offline_only: bool = False) -> List[str]:
+        """
+        返回应依次尝试的引擎
+
+        首选引擎排第一，其余按登记顺序；熔断中的引擎不参与路由，
+        冷却结束后重新出现在路由中，由第一个 acquire 的调用负责探测。
+
+        Args:
+            lang: 需要支持的语言，None 表示不限
+            preferred: 首选引擎
+            max_cost: 成本上限（例如只使用免费引擎）
+            offline_only: 只使用离线引擎
+
+        Returns:
+            引擎名称列表（可能为空）
+        """
+        with self._lock:
+            engines = list(self._engines.values())
+
+        candidates = []
+        for engine in engines:
+            info = engine.info
+            if lang is not None and lang not in info.languages:
+                continue
+            if max_cost is not None and info.cost > max_cost:
+                continue
+            if offline_only and not info.offline:
+                continue
+            if not engine.breaker.ready() or not self.is_available(info.name):
+                continue
+            candidates.append(((info.name != preferred, engine.order), info.name))
+
+        candidates.sort()
+        return [name for _, name in candidates]
+
+    def get_health(self) -> Dict[str, Dict]:
+        """各引擎的健康状况（含熔断器状态与计数）与能力信息"""
+        with self._lock:
+            engines = sorted(self._engines.values(), key=lambda e: e.order)
+        return {
+            e.info.name: {
+                "available": self.is_available(e.info.name),
+                "healthy": e.breaker.ready(),
+                **e.breaker.snapshot(),
+                "avg_latency": e.avg_latency,
+                "languages": list(e.info.languages),
+                "cost": e.info.cost,
+                "offline": e.info.offline,
+                "batch": e.info.batch,
+            }
+            for e in engines
+        }
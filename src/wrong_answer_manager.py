@@ -1,103 +1,46 @@
 """
 错题本管理模块 - 自动收录和管理错误单词
 """
-import json
-import os
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from src.storage import WrongAnswerBackend, create_wrong_answer_backend
+
 
 class WrongAnswerManager:
     """错题本管理器"""
 
-    def __init__(self, data_file: str = None):
+    def __init__(self, data_file: str = None, backend: Optional[WrongAnswerBackend] = None):
         """
         初始化错题本管理器
 
         Args:
-            data_file: 错题数据文件路径
+            data_file: 错题数据文件路径（指定文件时总是使用 JSON 文件，否则按 DICTATION_STORAGE 选择后端）
+            backend: 存储后端，默认见 src.storage
         """
-        if data_file is None:
-            # 默认路径
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            data_file = os.path.join(base_dir, 'data', 'wrong_answers.json')
-
-        self.data_file = data_file
-        self._ensure_data_file()
-
-    def _ensure_data_file(self):
-        """确保数据文件存在"""
-        if not os.path.exists(self.data_file):
-            os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-            self._save_data({
-                'words': [],
-                'stats': {
-                    'total_wrong': 0,
-                    'unique_words': 0
-                }
-            })
-
-    def _load_data(self) -> Dict:
-        """加载错题数据"""
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"加载错题数据失败: {e}")
-            return {
-                'words': [],
-                'stats': {
-                    'total_wrong': 0,
-                    'unique_words': 0
-                }
-            }
-
-    def _save_data(self, data: Dict):
-        """保存错题数据"""
-        try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"保存错题数据失败: {e}")
+        self.backend = backend or create_wrong_answer_backend(data_file)
 
     def add_wrong_answer(self, en: str, cn: str, user_answer: str):
         """
-        添加错题记录
+        添加错题记录（已存在时错误次数加一，并更新最新的错误答案和时间）
 
         Args:
             en: 英文单词
             cn: 中文释义
             user_answer: 用户的错误答案
         """
-        data = self._load_data()
-
-        # 查找是否已存在该单词
-        existing = None
-        for word in data['words']:
-            if word['en'].lower() == en.lower():
-                existing = word
-                break
-
-        if existing:
-            # 更新错误次数和时间
-            existing['wrong_count'] += 1
-            existing['last_wrong_time'] = datetime.now().isoformat()
-            existing['user_answer'] = user_answer  # 更新最新的错误答案
-        else:
-            # 新增错题
-            data['words'].append({
-                'en': en,
-                'cn': cn,
-                'user_answer': user_answer,
-                'wrong_count': 1,
-                'last_wrong_time': datetime.now().isoformat()
-            })
-
-        # 更新统计
-        data['stats']['total_wrong'] = sum(w['wrong_count'] for w in data['words'])
-        data['stats']['unique_words'] = len(data['words'])
-
-        self._save_data(data)
+        self.backend.add(en, cn, user_answer, datetime.now().isoformat())
+
+    def add_wrong_answers(self, words: List[Dict]):
+        """
+        批量添加错题（一次读取、一次写入，等同于逐个调用 add_wrong_answer）
+
+        Args:
+            words: [{"en": "apple", "cn": "苹果", "user_answer": "aple"}, ...]
+        """
+        entries = [(w['en'], w['cn'], w.get('user_answer', '')) for w in words]
+        if entries:
+            self.backend.add_many(entries, datetime.now().isoformat())
 
     def get_all_wrong_answers(self) -> List[Dict]:
         """
@@ -106,8 +49,7 @@ class WrongAnswerManager:
         Returns:
             错题列表
         """
-        data = self._load_data()
-        return data.get('words', [])
+        return self.backend.list()
 
     def get_stats(self) -> Dict:
         """
@@ -116,21 +58,11 @@ class WrongAnswerManager:
         Returns:
             统计信息
         """
-        data = self._load_data()
-        return data.get('stats', {
-            'total_wrong': 0,
-            'unique_words': 0
-        })
+        return self.backend.stats()
 
     def clear_all(self):
         """清空所有错题"""
-        self._save_data({
-            'words': [],
-            'stats': {
-                'total_wrong': 0,
-                'unique_words': 0
-            }
-        })
+        self.backend.clear()
 
     def remove_word(self, en: str):
         """
@@ -139,14 +71,7 @@ class WrongAnswerManager:
         Args:
             en: 英文单词
         """
-        data = self._load_data()
-        data['words'] = [w for w in data['words'] if w['en'].lower() != en.lower()]
-
-        # 更新统计
-        data['stats']['total_wrong'] = sum(w['wrong_count'] for w in data['words'])
-        data['stats']['unique_words'] = len(data['words'])
-
-        self._save_data(data)
+        self.backend.remove(en)
 
     def get_review_words(self, limit: Optional[int] = None) -> List[Dict]:
         """
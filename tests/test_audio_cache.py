@@ -3,7 +3,17 @@
 """
 import pytest
 import os
-from src.audio_cache import AudioCache
+import threading
+import time
+from src.audio_cache import AudioCache, get_shared_audio_cache
+from src.preload_scheduler import PreloadJob
+
+
+def fake_render(word, mode, spec, tmp_path):
+    """替代真实 TTS 的假合成：写入占位音频"""
+    with open(tmp_path, 'wb') as f:
+        f.write(f'{word}|{spec["voice"]}'.encode('utf-8'))
+    return tmp_path
 
 
 class TestAudioCache:
@@ -130,16 +140,16 @@ class TestAudioCache:
 
         # 添加一些数据
         cache.cache['test'] = 'path'
-        cache.preload_total = 10
+        cache.track_job(PreloadJob(total=10))
 
         # 重置
         old_dir = cache.cache_dir
         cache.reset()
 
-        # 检查状态
+        # 检查状态（持久化目录保留，供下个词库复用）
         assert cache.cache == {}
-        assert cache.preload_total == 0
-        assert cache.cache_dir != old_dir
+        assert cache.get_preload_status()['total'] == 0
+        assert cache.cache_dir == old_dir
 
     def test_cleanup(self):
         """测试清理缓存"""
@@ -153,6 +163,338 @@ class TestAudioCache:
         # 注意：可能因为权限问题删除失败，所以不强制检查
 
 
+class TestPersistentStore:
+    """持久化存储测试"""
+
+    def test_warm_store_needs_no_synthesis(self, temp_dir, monkeypatch):
+        """已预热的存储在新实例中直接命中，不发起合成"""
+        words = [{'en': f'word{i}', 'cn': f'词{i}'} for i in range(20)]
+
+        cache = AudioCache(cache_dir=temp_dir)
+        monkeypatch.setattr(cache, '_render', fake_render)
+        cache.preload_all_required(words)
+        assert cache.get_preload_status()['errors'] == 0
+
+        # 模拟重启：新实例、禁止合成
+        restarted = AudioCache(cache_dir=temp_dir)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("不应发起网络合成")
+
+        monkeypatch.setattr(restarted, '_render', fail)
+        for word in words:
+            assert restarted.get_audio(word['en'], 'en') is not None
+            assert restarted.get_audio(word['cn'], 'cn') is not None
+
+        restarted.preload_all_required(words)
+        status = restarted.get_preload_status()
+        assert status['errors'] == 0
+        assert status['completed'] == 40
+
+    def test_cache_path_depends_on_voice(self, temp_dir):
+        """不同音色对应不同的存储路径"""
+        cache = AudioCache(cache_dir=temp_dir)
+
+        path_a = cache.get_cache_path('apple', 'en', voice_en='female_shaonv')
+        path_b = cache.get_cache_path('apple', 'en', voice_en='male_qn_qingse')
+        path_edge = cache.get_cache_path('apple', 'en', use_minimax=False)
+
+        assert len({path_a, path_b, path_edge}) == 3
+        assert path_a.startswith(temp_dir)
+
+
+class TestVoiceAwareIndex:
+    """按音色区分的缓存索引测试"""
+
+    def test_voices_cached_side_by_side(self, temp_dir, monkeypatch):
+        """多个音色并存，切换音色不会返回旧音色的音频"""
+        cache = AudioCache(cache_dir=temp_dir)
+        monkeypatch.setattr(cache, '_render', fake_render)
+
+        path_a = cache.get_audio('apple', 'en', voice_en='female_shaonv')
+        path_b = cache.get_audio('apple', 'en', voice_en='male_qn_qingse')
+
+        assert path_a != path_b
+        assert cache.is_cached('apple', 'en', voice_en='female_shaonv')
+        assert cache.is_cached('apple', 'en', voice_en='male_qn_qingse')
+        assert not cache.is_cached('apple', 'en', voice_en='female_yujie')
+        assert cache.is_cached('apple', 'en')
+
+        # 切回原音色：直接命中，不再合成
+        monkeypatch.setattr(cache, '_render', lambda *args: pytest.fail("不应重新合成"))
+        assert cache.get_audio('apple', 'en', voice_en='female_shaonv') == path_a
+
+    def test_preload_only_missing(self, temp_dir, monkeypatch):
+        """切换音色后只为缺失的音频合成"""
+        cache = AudioCache(cache_dir=temp_dir)
+        rendered = []
+
+        def counting_render(word, mode, spec, tmp_path):
+            rendered.append((word, spec['voice']))
+            return fake_render(word, mode, spec, tmp_path)
+
+        monkeypatch.setattr(cache, '_render', counting_render)
+        words = [{'en': 'apple', 'cn': '苹果'}, {'en': 'banana', 'cn': '香蕉'}]
+
+        cache.preload_words(words, mode='spell', voice_en='female_shaonv', voice_cn='female_shaonv')
+        assert len(rendered) == 4
+
+        rendered.clear()
+        cache.preload_words(words, mode='spell', voice_en='male_qn_qingse', voice_cn='female_shaonv')
+        assert sorted(rendered) == [('apple', 'male-qn-qingse'), ('banana', 'male-qn-qingse')]
+
+        status = cache.get_preload_status()
+        assert status['total'] == 4
+        assert status['completed'] == 4
+
+
+class TestSharedCache:
+    """跨会话共享缓存测试"""
+
+    def test_shared_instance(self):
+        """进程内只有一个共享实例"""
+        assert get_shared_audio_cache() is get_shared_audio_cache()
+
+    def test_concurrent_requests_single_flight(self, temp_dir, monkeypatch):
+        """并发请求同一音频只合成一次"""
+        cache = AudioCache(cache_dir=temp_dir)
+        calls = []
+        calls_lock = threading.Lock()
+
+        def slow_render(word, mode, spec, tmp_path):
+            with calls_lock:
+                calls.append(word)
+            time.sleep(0.2)
+            return fake_render(word, mode, spec, tmp_path)
+
+        monkeypatch.setattr(cache, '_render', slow_render)
+
+        results = []
+        barrier = threading.Barrier(20)
+
+        def session():
+            barrier.wait()
+            results.append(cache.get_audio('apple', 'en', voice_en='female_shaonv'))
+
+        threads = [threading.Thread(target=session) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert calls == ['apple']
+        assert len(results) == 20
+        assert len(set(results)) == 1 and results[0] is not None
+
+
+class TestBackgroundPreload:
+    """后台预加载任务句柄测试"""
+
+    def test_returns_immediately_with_progress(self, temp_dir, monkeypatch):
+        """异步预加载立即返回，进度随合成推进"""
+        cache = AudioCache(cache_dir=temp_dir, max_workers=1)
+        gate = threading.Event()
+
+        def gated_render(word, mode, spec, tmp_path):
+            gate.wait(5)
+            return fake_render(word, mode, spec, tmp_path)
+
+        monkeypatch.setattr(cache, '_render', gated_render)
+        words = [{'en': f'w{i}', 'cn': f'词{i}'} for i in range(3)]
+
+        job = cache.preload_words_async(words, voice_en='female_shaonv')
+        assert not job.done()
+
+        gate.set()
+        seen = [status['completed'] for status in job.iter_progress(timeout=5)]
+        assert seen[-1] == 3
+        assert seen == sorted(seen)
+        assert job.done() and not job.cancelled
+        assert all(cache.is_cached(w['en'], 'en', voice_en='female_shaonv') for w in words)
+
+    def test_cancel_skips_remaining(self, temp_dir, monkeypatch):
+        """取消后不再开始新的合成"""
+        cache = AudioCache(cache_dir=temp_dir, max_workers=1)
+        started = threading.Event()
+        gate = threading.Event()
+        rendered = []
+
+        def gated_render(word, mode, spec, tmp_path):
+            rendered.append(word)
+            started.set()
+            gate.wait(5)
+            return fake_render(word, mode, spec, tmp_path)
+
+        monkeypatch.setattr(cache, '_render', gated_render)
+        words = [{'en': f'w{i}', 'cn': f'词{i}'} for i in range(5)]
+
+        job = cache.preload_words_async(words, voice_en='female_shaonv')
+        assert started.wait(5)
+        job.cancel()
+        gate.set()
+
+        assert job.wait(5)
+        assert job.cancelled
+        assert rendered == ['w0']
+
+    def test_overlapping_preloads(self, temp_dir, monkeypatch):
+        """多个会话的预加载同时进行：汇总状态与待预加载数按所有未结束的任务计算"""
+        cache = AudioCache(cache_dir=temp_dir, max_workers=1)
+        started = threading.Event()
+        gate = threading.Event()
+
+        def gated_render(word, mode, spec, tmp_path):
+            if word.startswith('slow'):
+                started.set()
+                gate.wait(5)
+            return fake_render(word, mode, spec, tmp_path)
+
+        monkeypatch.setattr(cache, '_render', gated_render)
+        slow_words = [{'en': f'slow{i}', 'cn': f'慢{i}'} for i in range(60)]
+
+        job = cache.preload_words_async(slow_words, voice_en='female_shaonv')
+        assert started.wait(5)
+        # 另一个会话的同步预加载（如播放器预取下一个单词）
+        cache.preload_words([{'en': 'fast', 'cn': '快'}], voice_en='female_shaonv')
+
+        assert cache.preload_active
+        assert cache.preload_pending == 60
+        assert cache.get_stats()['queue']['preload_pending'] == 60
+        assert 'dictation_audio_preload_pending 60' in cache.render_metrics()
+        status = cache.get_preload_status()
+        assert (status['total'], status['completed'], status['finished']) == (61, 1, False)
+
+        gate.set()
+        assert job.wait(10)
+        assert cache.preload_pending == 0
+        status = cache.get_preload_status()
+        assert (status['total'], status['completed'], status['finished']) == (61, 61, True)
+
+
+class TestAudioProfile:
+    """音频规格测试"""
+
+    def test_profile_in_store_key(self, temp_dir, monkeypatch):
+        """不同规格的音频分别缓存"""
+        monkeypatch.setattr(AudioCache, '_render', staticmethod(
+            lambda word, mode, spec, tmp_path: fake_render(word, mode, spec, tmp_path)))
+        compact = AudioCache(cache_dir=temp_dir, audio_profile='compact')
+        hifi = AudioCache(cache_dir=temp_dir, audio_profile='hifi')
+
+        path = compact.get_audio('apple', 'en', voice_en='female_shaonv')
+        assert compact.is_cached('apple', 'en', voice_en='female_shaonv')
+        assert hifi._request_key('apple', 'en', voice_en='female_shaonv') != \
+            compact._request_key('apple', 'en', voice_en='female_shaonv')
+        assert hifi.get_audio('apple', 'en', voice_en='female_shaonv') != path
+
+    def test_default_from_env(self, temp_dir, monkeypatch):
+        """默认读取环境变量，未知名称回退为默认规格"""
+        monkeypatch.setenv('DICTATION_AUDIO_PROFILE', 'standard')
+        assert AudioCache(cache_dir=temp_dir).profile.sample_rate == 24000
+        monkeypatch.setenv('DICTATION_AUDIO_PROFILE', 'unknown')
+        assert AudioCache(cache_dir=temp_dir).profile.name == 'compact'
+
+    def test_minimax_requests_profile(self, temp_dir):
+        """MiniMax 按规格请求采样率与比特率"""
+        from benchmarks.stub_tts_server import StubTTSServer
+        from src.minimax_tts import MiniMaxTTSEngine
+        from src.mp3_utils import get_audio_params
+
+        with StubTTSServer() as server:
+            server.realistic_audio = True
+            cache = AudioCache(cache_dir=temp_dir, audio_profile='compact')
+            cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=server.url)
+            path = cache.get_audio('apple', 'en')
+
+            assert server.requests[0]['audio_setting']['sample_rate'] == 16000
+            assert server.requests[0]['audio_setting']['bitrate'] == 32000
+        with open(path, 'rb') as f:
+            params = get_audio_params(f.read())
+        assert params['sample_rate'] == 16000 and params['bitrate'] == 32000
+
+    def test_edge_transcoded_when_available(self, temp_dir, monkeypatch):
+        """有 ffmpeg 时 Edge 音频入库前转码，无 ffmpeg 时保留原始规格"""
+        from src import audio_cache as audio_cache_module
+        from src.tts_engine import tts_engine
+
+        transcoded = []
+        async def fake_aspeak(word, save_path=None, voice=None, rate=None):
+            return fake_render(word, 'en', {'voice': voice}, save_path)
+
+        monkeypatch.setattr(tts_engine, 'aspeak', fake_aspeak)
+        monkeypatch.setattr(audio_cache_module, 'transcode_mp3',
+                            lambda path, sample_rate, bitrate: transcoded.append((sample_rate, bitrate)))
+
+        monkeypatch.setattr(audio_cache_module, 'transcode_available', lambda: False)
+        cache = AudioCache(cache_dir=temp_dir, audio_profile='compact')
+        cache.get_audio('apple', 'en', use_minimax=False)
+        assert transcoded == []
+
+        # 创建时检测一次：运行中 ffmpeg 出现不改变已有实例的存储键
+        monkeypatch.setattr(audio_cache_module, 'transcode_available', lambda: True)
+        assert cache._audio_spec('en', use_minimax=False)['bitrate'] != 32000
+
+        cache = AudioCache(cache_dir=temp_dir, audio_profile='compact')
+        cache.get_audio('apple', 'en', use_minimax=False)
+        assert transcoded == [(16000, 32000)]
+        assert cache._audio_spec('en', use_minimax=False)['bitrate'] == 32000
+
+
+class TestSpeedVariants:
+    """本地派生变速音频测试"""
+
+    def _cache(self, temp_dir, monkeypatch, calls, stretched):
+        from src import audio_cache as audio_cache_module
+
+        def counting_render(word, mode, spec, tmp_path):
+            calls.append(word)
+            return fake_render(word, mode, spec, tmp_path)
+
+        def fake_stretch(src_path, dst_path, speed, sample_rate, bitrate):
+            stretched.append(speed)
+            with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+                dst.write(src.read() + f'|x{speed:g}'.encode('utf-8'))
+            return dst_path
+
+        monkeypatch.setattr(audio_cache_module, 'time_stretch_mp3', fake_stretch)
+        cache = AudioCache(cache_dir=temp_dir)
+        monkeypatch.setattr(cache, '_render', counting_render)
+        return cache
+
+    def test_variants_derived_without_synthesis(self, temp_dir, monkeypatch):
+        """变速版本由 1.0× 音频派生并单独缓存，不再调用 TTS"""
+        from src import audio_cache as audio_cache_module
+        monkeypatch.setattr(audio_cache_module, 'transcode_available', lambda: True)
+        calls, stretched = [], []
+        cache = self._cache(temp_dir, monkeypatch, calls, stretched)
+
+        base = cache.get_audio('apple', 'en')
+        slow = cache.get_audio('apple', 'en', speed=0.75)
+        fast = cache.get_audio('apple', 'en', speed=1.25)
+        assert calls == ['apple']
+        assert stretched == [0.75, 1.25]
+        assert len({base, slow, fast}) == 3
+        with open(slow, 'rb') as f:
+            assert f.read().endswith(b'|x0.75')
+
+        # 再次请求直接命中；重启后从持久化存储命中
+        assert cache.get_audio('apple', 'en', speed=0.75) == slow
+        restarted = self._cache(temp_dir, monkeypatch, calls, stretched)
+        assert restarted.get_audio('apple', 'en', speed=0.75) == slow
+        assert calls == ['apple'] and stretched == [0.75, 1.25]
+        assert cache.get_stats()['speed_variants'] == {'0.75': 1, '1.25': 1}
+
+    def test_without_ffmpeg_plays_base(self, temp_dir, monkeypatch):
+        """没有 ffmpeg 时返回原速音频"""
+        from src import audio_cache as audio_cache_module
+        monkeypatch.setattr(audio_cache_module, 'transcode_available', lambda: False)
+        calls, stretched = [], []
+        cache = self._cache(temp_dir, monkeypatch, calls, stretched)
+
+        assert cache.get_audio('apple', 'en', speed=1.25) == cache.get_audio('apple', 'en')
+        assert calls == ['apple'] and stretched == []
+
+
 class TestAudioCacheIntegration:
     """音频缓存集成测试"""
 
@@ -0,0 +1,112 @@
+"""
+音频缓存指标单元测试
+"""
+import requests
+
+from src.audio_cache import AudioCache
+from src.audio_metrics import Counter, Histogram
+from src.audio_server import AudioServer
+from src.tts_registry import EDGE_INFO, LOCAL_INFO, MINIMAX_INFO
+
+
+def write_render(text, spec, tmp_path):
+    with open(tmp_path, "wb") as f:
+        f.write(b"x" * 100)
+    return tmp_path
+
+
+def failing_render(text, spec, tmp_path):
+    raise RuntimeError("down")
+
+
+class TestMetricTypes:
+    """计数器与直方图测试类"""
+
+    def test_counter_labels(self):
+        """按标签累计，部分标签时求和"""
+        counter = Counter("c_total", "test")
+        counter.inc(engine="a", voice="x")
+        counter.inc(2, engine="a", voice="y")
+        counter.inc(engine="b", voice="x")
+
+        assert counter.get() == 4
+        assert counter.get(engine="a") == 3
+        assert counter.get(voice="x") == 2
+        assert 'c_total{engine="a",voice="y"} 2' in counter.render()
+
+    def test_histogram_percentiles_and_buckets(self):
+        """分位数按样本计算，导出的桶计数是累计值"""
+        histogram = Histogram("h_seconds", "test", buckets=(0.1, 1.0))
+        for i in range(100):
+            histogram.observe((i + 1) / 100, engine="a")
+
+        summary = histogram.summary(engine="a")
+        assert summary["count"] == 100
+        assert summary["p50"] == 0.51
+        assert summary["p99"] == 1.0
+
+        lines = histogram.render()
+        assert 'h_seconds_bucket{engine="a",le="0.1"} 10' in lines
+        assert 'h_seconds_bucket{engine="a",le="1"} 100' in lines
+        assert 'h_seconds_bucket{engine="a",le="+Inf"} 100' in lines
+
+
+class TestCacheStats:
+    """AudioCache 统计测试类"""
+
+    def test_hits_misses_and_fallbacks(self, temp_dir):
+        """首选引擎失败后回退，统计命中、合成字节数与回退次数"""
+        cache = AudioCache(cache_dir=temp_dir)
+        cache.registry.register(MINIMAX_INFO, failing_render)
+        cache.registry.register(EDGE_INFO, write_render)
+
+        cache.get_audio("apple", "en")
+        cache.get_audio("apple", "en")
+        cache.reset()
+        cache.get_audio("apple", "en")
+
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (2, 1)
+        assert stats["hit_rate"] == 2 / 3
+        voice = stats["by_voice"][0]
+        assert voice["engine"] == "minimax" and voice["hits"] == 2
+
+        assert stats["engines"]["minimax"]["failures"] == 1
+        assert stats["engines"]["edge"]["synthesized"] == 1
+        assert stats["engines"]["edge"]["bytes"] == 100
+        assert stats["engines"]["edge"]["latency"]["count"] == 1
+        assert stats["fallbacks"] == [{"from": "minimax", "to": "edge", "count": 1}]
+
+        metrics = cache.metrics
+        assert metrics.hits.get(layer="memory") == 1
+        assert metrics.hits.get(layer="store") == 1
+
+    def test_evictions_counted(self, temp_dir):
+        """容量超限的淘汰计入指标"""
+        cache = AudioCache(cache_dir=temp_dir, max_bytes=250)
+        for info in (MINIMAX_INFO, EDGE_INFO, LOCAL_INFO):
+            cache.registry.register(info, write_render)
+
+        for i in range(5):
+            cache.get_audio(f"w{i}", "en")
+
+        stats = cache.get_stats()
+        assert stats["store"]["evictions"] == 3
+        assert cache.metrics.evicted_bytes.get() == 300
+        assert cache.get_progress() == (2, 5)
+
+    def test_metrics_endpoint(self, temp_dir):
+        """音频服务的 /metrics 导出 Prometheus 文本"""
+        cache = AudioCache(cache_dir=temp_dir)
+        cache.registry.register(MINIMAX_INFO, write_render)
+        cache.get_audio("apple", "en")
+
+        with AudioServer(temp_dir, metrics_source=cache.render_metrics) as server:
+            response = requests.get(server.local_url + "/metrics")
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain")
+        body = response.text
+        assert 'dictation_audio_synthesized_total{engine="minimax"} 1' in body
+        assert 'dictation_audio_synthesis_seconds_count{engine="minimax"} 1' in body
+        assert 'dictation_tts_circuit_open{engine="minimax"} 0' in body
+        assert "dictation_audio_store_entries 1" in body
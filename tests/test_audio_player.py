@@ -0,0 +1,82 @@
+"""
+音频播放组件单元测试
+"""
+import os
+
+import components.audio_player as audio_player_module
+from components.audio_player import AudioPlayer
+from src.audio_server import AudioServer
+
+
+class FakeCache:
+    """只按文本返回固定文件的假缓存"""
+
+    def __init__(self, temp_dir):
+        self.temp_dir = temp_dir
+        self.preloaded = []
+
+    def is_cached(self, text, mode="en", **kwargs):
+        return os.path.exists(os.path.join(self.temp_dir, f"{text}.mp3"))
+
+    def preload_words(self, words, mode, **kwargs):
+        self.preloaded.append((list(words), mode))
+
+    def get_audio(self, text, mode="en", **kwargs):
+        path = os.path.join(self.temp_dir, f"{text}.mp3")
+        with open(path, "wb") as f:
+            f.write(text.encode("utf-8"))
+        return path
+
+
+class TestPlaylist:
+    """浏览器端播放列表测试类"""
+
+    def test_en_to_cn(self, temp_dir, sample_word_list):
+        """按播放顺序生成，从指定位置开始，单词之间使用播放间隔"""
+        cache = FakeCache(temp_dir)
+        player = AudioPlayer(cache)
+        order = [4, 3, 2, 1, 0]
+
+        playlist = player.build_playlist(sample_word_list, order, "en_to_cn", interval=5, start=2)
+
+        assert [item["index"] for item in playlist] == [2, 3, 4]
+        assert all(item["gap"] == 5 for item in playlist)
+        assert playlist[0]["src"].startswith("data:audio/mp3;base64,")
+        # 播放前统一预加载剩余单词
+        assert cache.preloaded == [([sample_word_list[2], sample_word_list[1], sample_word_list[0]],
+                                    "en_to_cn")]
+
+    def test_spell_with_repeat(self, temp_dir, sample_word_list):
+        """拼写模式英文与中文之间使用固定间隔，重复次数展开为多个片段"""
+        player = AudioPlayer(FakeCache(temp_dir))
+
+        playlist = player.build_playlist(sample_word_list[:1], [0], "spell", interval=4, repeat=2)
+
+        assert len(playlist) == 4
+        assert [item["gap"] for item in playlist] == [AudioPlayer.SPELL_GAP] * 3 + [4]
+        assert playlist[0]["src"] == playlist[2]["src"]
+
+
+class TestStreaming:
+    """未缓存音频边合成边播放测试类"""
+
+    def test_stream_src_only_for_uncached(self, temp_dir, monkeypatch):
+        """未缓存时使用 /stream 地址；已缓存、变速或服务不可达时使用文件"""
+        cache = FakeCache(temp_dir)
+        player = AudioPlayer(cache, voice_en="male_qn_qingse")
+        with AudioServer(temp_dir) as server:
+            monkeypatch.setattr(audio_player_module, "get_audio_server", lambda: server)
+            monkeypatch.setattr(audio_player_module, "_browser_can_reach_audio_server", lambda: True)
+
+            src = player.stream_src("apple", "en")
+            assert src == server.stream_url("apple", "en", "male_qn_qingse")
+
+            cache.get_audio("apple")
+            assert player.stream_src("apple", "en") is None
+
+            player.update_speed(1.25)
+            assert player.stream_src("banana", "en") is None
+
+            player.update_speed(1.0)
+            monkeypatch.setattr(audio_player_module, "_browser_can_reach_audio_server", lambda: False)
+            assert player.stream_src("banana", "en") is None
@@ -0,0 +1,108 @@
+"""
+音频静态服务单元测试
+"""
+import os
+import pytest
+import requests
+from src.audio_store import AudioStore
+from src.audio_server import CACHE_CONTROL, AudioServer
+
+
+@pytest.fixture
+def store(temp_dir):
+    return AudioStore(root_dir=temp_dir)
+
+
+@pytest.fixture
+def server(store):
+    with AudioServer(store.root_dir) as audio_server:
+        yield audio_server
+
+
+class TestAudioServer:
+    """音频服务测试类"""
+
+    def put(self, store, text="apple", data=b"0123456789"):
+        key = AudioStore.make_key(text, "en", "edge", "v")
+        return key, store.put_bytes(key, data, text=text)
+
+    def test_serve_with_cache_headers(self, store, server):
+        """返回音频及 ETag / Cache-Control"""
+        key, path = self.put(store)
+        response = requests.get(server.url_for(path))
+
+        assert response.status_code == 200
+        assert response.content == b"0123456789"
+        assert response.headers["Content-Type"] == "audio/mpeg"
+        assert response.headers["ETag"] == f'"{key}"'
+        assert response.headers["Cache-Control"] == CACHE_CONTROL
+        assert response.headers["Access-Control-Allow-Origin"] == "*"
+
+    def test_not_modified(self, store, server):
+        """ETag 匹配时返回 304，不发送音频"""
+        key, path = self.put(store)
+        response = requests.get(server.url_for(path), headers={"If-None-Match": f'"{key}"'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_range(self, store, server):
+        """支持 Range 请求"""
+        _, path = self.put(store)
+        url = server.url_for(path)
+
+        response = requests.get(url, headers={"Range": "bytes=2-5"})
+        assert response.status_code == 206
+        assert response.content == b"2345"
+        assert response.headers["Content-Range"] == "bytes 2-5/10"
+
+        assert requests.get(url, headers={"Range": "bytes=-3"}).content == b"789"
+        assert requests.get(url, headers={"Range": "bytes=20-"}).status_code == 416
+
+    def test_rejects_paths_outside_store(self, store, server, temp_dir):
+        """只提供存储中的音频文件"""
+        outside = os.path.join(temp_dir, "secret.mp3")
+        with open(outside, "wb") as f:
+            f.write(b"secret")
+
+        assert server.url_for(outside) is None
+        for path in ("/audio/../secret.mp3", "/audio/ab/secret.mp3", "/etc/passwd"):
+            assert requests.get(server.local_url + path).status_code == 404
+
+    def test_base_url(self, store):
+        """配置对外地址时 URL 使用该地址"""
+        _, path = self.put(store)
+        with AudioServer(store.root_dir, base_url="https://cdn.example.com/") as audio_server:
+            url = audio_server.url_for(path)
+        assert url.startswith("https://cdn.example.com/audio/")
+
+    def test_stream_chunked(self, store):
+        """/stream 以 chunked 编码逐块返回来源产出的音频"""
+        requested = []
+
+        def source(text, lang, voice):
+            requested.append((text, lang, voice))
+            yield b"ab"
+            yield b""
+            yield b"cd"
+
+        with AudioServer(store.root_dir, stream_source=source) as audio_server:
+            url = audio_server.stream_url("ice cream", "en", "male_qn_qingse")
+            response = requests.get(url)
+
+        assert response.status_code == 200
+        assert response.headers["Transfer-Encoding"] == "chunked"
+        assert response.headers["Content-Type"] == "audio/mpeg"
+        assert response.content == b"abcd"
+        assert requested == [("ice cream", "en", "male_qn_qingse")]
+
+    def test_stream_errors(self, store):
+        """合成失败返回 502；参数无效返回 404"""
+        def failing(text, lang, voice):
+            raise RuntimeError("down")
+            yield b""
+
+        with AudioServer(store.root_dir, stream_source=failing) as audio_server:
+            assert requests.get(audio_server.stream_url("apple", "en")).status_code == 502
+            assert requests.get(audio_server.stream_url("apple", "fr")).status_code == 404
+            assert requests.get(audio_server.stream_url("x" * 500, "en")).status_code == 404
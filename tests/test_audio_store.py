@@ -0,0 +1,91 @@
+"""
+持久化音频存储单元测试
+"""
+import os
+import pytest
+from src.audio_store import AudioStore
+
+
+class TestAudioStore:
+    """音频存储测试类"""
+
+    def test_make_key(self):
+        """测试内容键"""
+        key = AudioStore.make_key('apple', 'en', 'minimax', 'female-shaonv', 'speech-02-turbo', 1.0, 32000)
+        same = AudioStore.make_key('apple', 'en', 'minimax', 'female-shaonv', 'speech-02-turbo', 1.0, 32000)
+        other_voice = AudioStore.make_key('apple', 'en', 'minimax', 'male-qn-qingse', 'speech-02-turbo', 1.0, 32000)
+        other_speed = AudioStore.make_key('apple', 'en', 'minimax', 'female-shaonv', 'speech-02-turbo', 1.25, 32000)
+
+        assert key == same
+        assert len({key, other_voice, other_speed}) == 3
+
+    def test_put_and_get(self, temp_dir):
+        """测试写入与读取"""
+        store = AudioStore(temp_dir)
+        key = AudioStore.make_key('apple', 'en', 'edge', 'en-US-AriaNeural')
+
+        assert store.get(key, text='apple') is None
+
+        path = store.put_bytes(key, b'audio-bytes', text='apple')
+        assert os.path.exists(path)
+        assert 'apple' in path
+        assert store.get(key, text='apple') == path
+
+        with open(path, 'rb') as f:
+            assert f.read() == b'audio-bytes'
+
+    def test_persists_across_instances(self, temp_dir):
+        """测试重启后仍可命中"""
+        key = AudioStore.make_key('苹果', 'cn', 'edge', 'zh-CN-XiaoxiaoNeural')
+        path = AudioStore(temp_dir).put_bytes(key, b'data', text='苹果')
+
+        reopened = AudioStore(temp_dir)
+        assert reopened.contains(key)
+        assert reopened.get(key, text='苹果') == path
+        assert reopened.get_usage()['bytes'] == 4
+
+    def test_failed_write_leaves_nothing(self, temp_dir):
+        """测试写入失败时不留下残缺文件"""
+        store = AudioStore(temp_dir)
+        key = AudioStore.make_key('broken', 'en', 'edge', 'v')
+
+        def writer(tmp_path):
+            with open(tmp_path, 'wb') as f:
+                f.write(b'partial')
+            raise RuntimeError('network error')
+
+        with pytest.raises(RuntimeError):
+            store.put_with(key, writer, text='broken')
+
+        assert store.get(key, text='broken') is None
+        leftovers = [name for _, _, files in os.walk(temp_dir) for name in files]
+        assert leftovers == []
+
+    def test_lru_eviction(self, temp_dir):
+        """测试超过容量时淘汰最久未使用的音频"""
+        store = AudioStore(temp_dir, max_bytes=30)
+        keys = [AudioStore.make_key(f'w{i}', 'en', 'edge', 'v') for i in range(3)]
+
+        for i, key in enumerate(keys):
+            store.put_bytes(key, b'x' * 10, text=f'w{i}')
+
+        # 访问最早的条目，使其变为最近使用
+        assert store.get(keys[0], text='w0')
+
+        extra = AudioStore.make_key('w3', 'en', 'edge', 'v')
+        store.put_bytes(extra, b'x' * 10, text='w3')
+
+        assert store.contains(keys[0])
+        assert not store.contains(keys[1])
+        assert store.contains(extra)
+        assert store.get_usage()['bytes'] <= 30
+
+    def test_clear(self, temp_dir):
+        """测试清空"""
+        store = AudioStore(temp_dir)
+        key = AudioStore.make_key('apple', 'en', 'edge', 'v')
+        path = store.put_bytes(key, b'data', text='apple')
+
+        store.clear()
+        assert len(store) == 0
+        assert not os.path.exists(path)
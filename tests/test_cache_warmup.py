@@ -0,0 +1,71 @@
+"""
+音频缓存预热命令单元测试
+"""
+import os
+
+from benchmarks.stub_tts_server import StubTTSServer
+from data.vocabulary_store import VocabularyStore
+from src.audio_cache import AudioCache
+from src.cache_warmup import count_cached, main, resolve_vocabulary, warmup_plan
+
+
+class TestCacheWarmup:
+    """预热命令测试类"""
+
+    def test_resolve_builtin_and_user(self, temp_dir):
+        """预置词库按文件名或显示名称查找，其次查找用户词库"""
+        store = VocabularyStore(os.path.join(temp_dir, "vocabularies"))
+        store.save_vocabulary("my list", [{'en': 'apple', 'cn': '苹果'}])
+        builtin = os.path.join(temp_dir, "builtin")
+        os.makedirs(builtin)
+        with open(os.path.join(builtin, "cet4.json"), "w", encoding="utf-8") as f:
+            f.write('{"name": "CET-4 核心词汇", "words": [{"en": "abandon", "cn": "放弃"}]}')
+
+        assert resolve_vocabulary(store, "cet4") == ("CET-4 核心词汇", [{"en": "abandon", "cn": "放弃"}])
+        assert resolve_vocabulary(store, "CET-4 核心词汇")[0] == "CET-4 核心词汇"
+        assert resolve_vocabulary(store, "my list")[1][0]['en'] == 'apple'
+        assert resolve_vocabulary(store, "missing") is None
+
+    def test_plan_does_not_repeat_chinese(self):
+        """中文音频与英文音色、口音无关，只预热一次"""
+        plan = warmup_plan([], ["minimax", "edge"], ["a", "b"], ["c"], ["us", "uk"])
+        labels = [step["label"] for step in plan]
+        assert labels == ["minimax en a", "minimax en b", "minimax cn c",
+                          "edge en us", "edge en uk", "edge cn"]
+
+    def test_warmup_and_resume(self, temp_dir, monkeypatch, capsys):
+        """预热后重新运行不再请求合成"""
+        vocab_dir = os.path.join(temp_dir, "vocabularies")
+        store = VocabularyStore(vocab_dir)
+        words = [{'en': f'w{i}', 'cn': f'词{i}'} for i in range(5)]
+        store.save_vocabulary("unit", words)
+        cache_dir = os.path.join(temp_dir, "audio")
+
+        with StubTTSServer() as server:
+            monkeypatch.setenv("MINIMAX_API_URL", server.url)
+            monkeypatch.setenv("MINIMAX_API_KEY", "stub")
+            argv = ["unit", "--vocab-dir", vocab_dir, "--cache-dir", cache_dir, "--workers", "2"]
+
+            assert main(argv) == 0
+            assert len(server.requests) == 10
+            assert "本次合成 10 条" in capsys.readouterr().out
+
+            assert main(argv) == 0
+            assert len(server.requests) == 10
+            assert "均已缓存" in capsys.readouterr().out
+
+        cache = AudioCache(cache_dir=cache_dir)
+        assert all(cache.is_cached(w['cn'], 'cn', use_minimax=True) for w in words)
+
+    def test_count_accepts_fallback_audio(self, temp_dir):
+        """回退引擎生成的音频也算已缓存（预加载同样不会重新合成）"""
+        cache = AudioCache(cache_dir=temp_dir)
+        spec = cache._engine_spec("edge", "en")
+        cache.store.put_bytes(cache._store_key("apple", "en", spec), b"ID3", text="apple")
+
+        words = [{'en': 'apple', 'cn': '苹果'}, {'en': 'Apple.', 'cn': '苹果'}, {'en': 'pear', 'cn': '梨'}]
+        assert count_cached(cache, words, "en_to_cn", {"use_minimax": True}) == (3, 1)
+
+    def test_unknown_vocabulary(self, temp_dir):
+        """找不到词库时返回错误码"""
+        assert main(["nope", "--vocab-dir", os.path.join(temp_dir, "v")]) == 2
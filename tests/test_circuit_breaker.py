@@ -0,0 +1,61 @@
+"""
+熔断器单元测试
+"""
+import time
+
+from src.circuit_breaker import CircuitBreaker
+
+
+class TestCircuitBreaker:
+    """熔断器测试类"""
+
+    def test_opens_on_failure_rate(self):
+        """失败率达到阈值才断开，少量失败不影响"""
+        breaker = CircuitBreaker(failure_rate=0.5, window=10, min_calls=4)
+        for ok in (True, False, True, True, False):
+            assert breaker.allow()
+            if ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        assert breaker.state == "closed"
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+        assert breaker.snapshot()["rejected"] == 1
+
+    def test_slow_calls_count_as_failures(self):
+        """超出延迟预算的成功调用按失败计"""
+        breaker = CircuitBreaker(min_calls=3, latency_budget=1.0)
+        for _ in range(3):
+            breaker.record_success(latency=2.0)
+        assert breaker.state == "open"
+        assert breaker.snapshot()["slow_calls"] == 3
+
+    def test_half_open_single_probe(self):
+        """冷却后只放行一个探测请求，探测结果决定恢复或重新断开"""
+        breaker = CircuitBreaker(min_calls=1, cooldown=0.05)
+        breaker.record_failure()
+        assert not breaker.ready()
+
+        time.sleep(0.06)
+        assert breaker.state == "half_open"
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+        time.sleep(0.06)
+        assert breaker.allow()
+        breaker.record_success(latency=0.1)
+        assert breaker.state == "closed"
+        assert breaker.allow() and breaker.allow()
+
+    def test_late_results_ignored_while_open(self):
+        """断开前发出的调用迟到的结果不会关闭熔断器"""
+        breaker = CircuitBreaker(min_calls=1, cooldown=10)
+        breaker.record_failure()
+        breaker.record_success()
+        assert breaker.state == "open"
@@ -0,0 +1,125 @@
+"""
+历史记录统计单元测试
+"""
+import os
+
+import pytest
+
+from src.history_manager import HistoryManager
+from src.history_stats import HistoryStats, WrongWordCounter, score_band
+from src.storage import JournalHistoryBackend, JsonHistoryBackend, SqliteDatabase, SqliteHistoryBackend
+
+
+def make_record(record_id, score, mode="en_to_cn", wrong=()):
+    return {
+        "id": record_id,
+        "date": f"2024-01-01T00:00:{record_id}",
+        "mode": mode,
+        "total_words": 10,
+        "correct_count": score // 10,
+        "score": score,
+        "duration_seconds": 60,
+        "wrong_words": [{"en": en, "cn": cn} for en, cn in wrong],
+    }
+
+
+@pytest.fixture(params=["json", "sqlite", "journal"])
+def backend(request, temp_dir):
+    if request.param == "json":
+        yield JsonHistoryBackend(os.path.join(temp_dir, "history.json"))
+    elif request.param == "sqlite":
+        db = SqliteDatabase(os.path.join(temp_dir, "dictation.db"))
+        yield SqliteHistoryBackend(db)
+        db.close()
+    else:
+        journal = JournalHistoryBackend(os.path.join(temp_dir, "journal"))
+        yield journal
+        journal.close()
+
+
+class TestWrongWordCounter:
+    """错词计数测试"""
+
+    def test_top_and_decrement(self):
+        counter = WrongWordCounter()
+        for en in ["apple", "banana", "apple", "cat", "apple", "banana"]:
+            counter.add(en, "")
+        assert [(w["en"], w["count"]) for w in counter.top(2)] == [("apple", 3), ("banana", 2)]
+
+        counter.add("apple", "", -3)
+        assert [w["en"] for w in counter.top(5)] == ["banana", "cat"]
+
+    def test_round_trip_keeps_order(self):
+        counter = WrongWordCounter()
+        for en in ["b", "a", "c", "c"]:
+            counter.add(en, "")
+        assert WrongWordCounter.from_list(counter.to_list()).to_list() == counter.to_list()
+
+
+class TestHistoryStats:
+    """汇总数据测试"""
+
+    def test_score_band(self):
+        assert score_band(100) == "90-100"
+        assert score_band(89.5) == "80-89"
+        assert score_band(0) == "0-59"
+
+    def test_incremental_matches_rebuild(self):
+        records = [make_record(f"{i:02d}", i * 7 % 101, wrong=[("apple", "苹果")] * (i % 3))
+                   for i in range(15)]
+        stats = HistoryStats()
+        for record in records:
+            stats.add(record)
+        stats.remove(records[3])
+
+        remaining = [r for r in reversed(records) if r is not records[3]]
+        rebuilt = HistoryStats.build(remaining)
+        assert stats.summary() == rebuilt.summary()
+        assert stats.wrong_words.top(5) == rebuilt.wrong_words.top(5)
+
+    def test_invalid_saved_data(self):
+        assert HistoryStats.from_dict({"total_sessions": 1}) is None
+
+
+class TestManagerStats:
+    """HistoryManager 增量维护并保存统计数据"""
+
+    def test_add_and_delete(self, backend):
+        manager = HistoryManager(backend=backend)
+        for i in range(12):
+            backend.append(make_record(f"{i:02d}", 50 + i * 4, mode="spell" if i % 2 else "en_to_cn",
+                                       wrong=[("apple", "苹果")] if i % 3 == 0 else ()))
+
+        # 直接写入后端的记录：版本不一致，重建一次
+        assert manager.get_statistics() == HistoryStats.build(backend.list()).summary()
+
+        assert manager.add_record("cn_to_en", "词库", 10, 9, 30, wrong_words=[{"en": "cat", "cn": "猫"}])
+        assert manager.delete_record("10")  # 最近 10 次中的一条
+        assert not manager.delete_record("missing")
+
+        expected = HistoryStats.build(backend.list()).summary()
+        assert manager.get_statistics() == expected
+        assert expected["total_sessions"] == 12 and len(expected["recent_scores"]) == 10
+        assert manager.get_wrong_words_frequency(limit=1) == [{"en": "apple", "cn": "苹果", "count": 4}]
+
+        # 保存的统计数据可由新的管理器直接使用
+        saved = backend.load_stats()
+        assert saved["fingerprint"] == backend.fingerprint()
+        assert HistoryManager(backend=backend).get_statistics() == expected
+
+    def test_same_second_records(self, backend):
+        """同一秒内添加的记录 ID 不同，删除一条只影响这一条"""
+        manager = HistoryManager(backend=backend)
+        ids = [manager.add_record("spell", "词库", 10, correct, 30) for correct in (5, 9)]
+        assert len(set(ids)) == 2
+
+        assert manager.delete_record(ids[0])
+        assert [r["id"] for r in backend.list()] == [ids[1]]
+        assert manager.get_statistics() == HistoryStats.build(backend.list()).summary()
+
+    def test_clear(self, backend):
+        manager = HistoryManager(backend=backend)
+        manager.add_record("spell", "词库", 10, 5, 30)
+        assert manager.clear_all_records()
+        assert manager.get_statistics()["total_sessions"] == 0
+        assert manager.get_wrong_words_frequency() == []
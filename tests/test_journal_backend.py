@@ -0,0 +1,115 @@
+"""
+历史记录追加日志后端单元测试
+"""
+import os
+
+from src.history_manager import HistoryManager
+from src.storage import JournalHistoryBackend, create_history_backend
+
+
+def record(i):
+    return {"id": f"r{i}", "date": f"2024-01-01T00:00:{i:02d}", "score": i}
+
+
+def journal_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".jsonl"))
+
+
+class TestJournalHistoryBackend:
+    """追加日志测试类"""
+
+    def test_manager_api(self, temp_dir, sample_history_records):
+        """增删查与清空"""
+        journal = JournalHistoryBackend(temp_dir)
+        manager = HistoryManager(backend=journal)
+        for r in sample_history_records:
+            manager.add_record(**r)
+        assert [r['vocabulary_name'] for r in manager.get_all_records()] == ['测试词库2', '测试词库1']
+        assert manager.get_statistics()['total_words'] == 15
+
+        journal.append(record(1))
+        journal.append(record(2))
+        assert manager.get_record_by_id("r1")['score'] == 1
+        assert manager.delete_record("r1")
+        assert not manager.delete_record("r1")
+        assert [r['id'] for r in manager.get_all_records(limit=2)][0] == "r2"
+        assert manager.get_record_by_id("r1") is None
+        assert manager.clear_all_records()
+        assert manager.get_all_records() == []
+
+    def test_segments_and_compaction(self, temp_dir):
+        """日志段写满后换段，积累到一定数量后合并为快照，重新打开后数据不变"""
+        journal = JournalHistoryBackend(temp_dir, segment_records=3, compact_segments=2)
+        for i in range(5):
+            journal.append(record(i))
+        assert journal_files(temp_dir) == ["segment-00000001.jsonl", "segment-00000002.jsonl"]
+
+        journal.delete("r1")  # 第 2 段写满，在后台与第 1 段合并
+        journal.wait_for_compaction()
+        assert journal_files(temp_dir) == ["snapshot-00000002.jsonl"]
+        with open(os.path.join(temp_dir, "snapshot-00000002.jsonl"), encoding="utf-8") as f:
+            assert len(f.readlines()) == 4
+
+        journal.append(record(5))
+        journal.append(record(6))
+        expected = ["r6", "r5", "r4", "r3", "r2", "r0"]
+        assert [r["id"] for r in journal.list()] == expected
+        assert [r["id"] for r in journal.list(limit=2)] == ["r6", "r5"]
+        # 索引随合并指向新快照
+        assert journal.get("r0") == record(0) and journal.get("r6") == record(6)
+        assert journal.get("r1") is None
+        journal.close()
+
+        reopened = JournalHistoryBackend(temp_dir, segment_records=3, compact_segments=2)
+        assert [r["id"] for r in reopened.list()] == expected
+        assert reopened.get("r3") == record(3) and not reopened.delete("r1")
+        reopened.append(record(7))
+        assert reopened.list(limit=1)[0]["id"] == "r7"
+
+    def test_recovers_torn_write(self, temp_dir):
+        """崩溃时未写完的最后一行在重新打开时被截掉，之后的追加不受影响"""
+        journal = JournalHistoryBackend(temp_dir)
+        journal.append(record(0))
+        journal.append(record(1))
+        journal.close()
+        with open(os.path.join(temp_dir, "segment-00000001.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"op": "add", "record": {"id": "r2", "da')
+
+        reopened = JournalHistoryBackend(temp_dir)
+        assert [r["id"] for r in reopened.list()] == ["r1", "r0"]
+        reopened.append(record(3))
+        assert [r["id"] for r in reopened.list()] == ["r3", "r1", "r0"]
+
+    def test_get_and_delete_use_index(self, temp_dir):
+        """按 ID 读取与删除只读取一行，不重放日志"""
+        journal = JournalHistoryBackend(temp_dir, segment_records=2, compact_segments=100)
+        for i in range(6):
+            journal.append(record(i))
+        with open(os.path.join(temp_dir, "segment-00000001.jsonl"), "ab") as f:
+            f.write(b"not json\n")  # 较早的段无法解析也不影响
+
+        assert journal.get("r4") == record(4)
+        assert journal.delete("r4") and journal.get("r4") is None
+        assert journal.clear() and journal.get("r5") is None and not journal.delete("r5")
+
+    def test_limit_reads_only_newest_segments(self, temp_dir):
+        """读取最近的记录不需要解析较早的日志段"""
+        journal = JournalHistoryBackend(temp_dir, segment_records=2, compact_segments=100)
+        for i in range(6):
+            journal.append(record(i))
+        with open(os.path.join(temp_dir, "segment-00000001.jsonl"), "w", encoding="utf-8") as f:
+            f.write("not json\n")
+
+        assert [r["id"] for r in journal.list(limit=3)] == ["r5", "r4", "r3"]
+
+    def test_migrates_history_json(self, temp_dir, monkeypatch):
+        """首次启用时导入 history.json 中的记录"""
+        legacy = HistoryManager(os.path.join(temp_dir, "history.json"))
+        legacy.add_record("spell", "词库", 10, 9, 60)
+        monkeypatch.setenv("DICTATION_STORAGE", "journal")
+        monkeypatch.setattr("src.storage.DATA_DIR", temp_dir)
+
+        manager = HistoryManager()
+        assert isinstance(manager.backend, JournalHistoryBackend)
+        assert manager.get_all_records()[0]["score"] == 90.0
+        assert create_history_backend() is manager.backend
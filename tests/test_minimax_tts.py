@@ -0,0 +1,290 @@
+"""
+MiniMax TTS 引擎单元测试（使用本地测试桩，不访问外网）
+"""
+import os
+import time
+import pytest
+import requests
+from benchmarks.stub_tts_server import StubTTSServer
+from src.minimax_tts import BatchSplitError, MiniMaxTTSEngine
+from src.mp3_utils import get_duration
+from src.audio_cache import AudioCache
+from src.audio_server import AudioServer
+from src.http_client import RateLimiter, RetryPolicy
+
+
+@pytest.fixture
+def stub_server():
+    """本地 TTS 测试桩"""
+    with StubTTSServer() as server:
+        yield server
+
+
+class TestMiniMaxTTSEngine:
+    """MiniMax 引擎测试类"""
+
+    def test_speak(self, stub_server, temp_dir):
+        """测试合成并保存"""
+        engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+        path = engine.speak("apple", save_path=os.path.join(temp_dir, "apple.mp3"))
+
+        with open(path, 'rb') as f:
+            assert f.read() == b"ID3|apple|male-qn-qingse"
+
+    def test_per_call_params_do_not_mutate(self, stub_server, temp_dir):
+        """按次传入的音色/语速只作用于本次请求"""
+        engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+        engine.speak("apple", save_path=os.path.join(temp_dir, "a.mp3"),
+                     voice="female-yujie", speed=1.25, model="speech-02-hd")
+
+        payload = stub_server.requests[-1]
+        assert payload["voice_setting"]["voice_id"] == "female-yujie"
+        assert payload["voice_setting"]["speed"] == 1.25
+        assert payload["model"] == "speech-02-hd"
+
+        assert engine.voice == MiniMaxTTSEngine.ENGLISH_VOICES["male_qn_qingse"]
+        assert engine.speed == 1.0
+        assert engine.model == MiniMaxTTSEngine.MODELS["turbo"]
+
+    def test_resolve_voice(self):
+        """测试音色名称解析"""
+        assert MiniMaxTTSEngine.resolve_voice("female_shaonv") == "female-shaonv"
+        assert MiniMaxTTSEngine.resolve_voice("custom-voice-id", is_english=False) == "custom-voice-id"
+
+
+class TestParallelPreload:
+    """并行预加载测试"""
+
+    def test_preload_runs_in_parallel(self, temp_dir):
+        """预加载按配置的并发数并行请求"""
+        words = [{'en': f'word{i}', 'cn': f'词{i}'} for i in range(8)]
+
+        with StubTTSServer(latency=0.2) as server:
+            cache = AudioCache(cache_dir=temp_dir, max_workers=4)
+            cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=server.url)
+
+            start = time.perf_counter()
+            cache.preload_words(words, mode='en_to_cn', voice_en='female_shaonv')
+            elapsed = time.perf_counter() - start
+
+            assert server.max_active == 4
+            assert len(server.requests) == 8
+
+        # 串行需要 1.6s
+        assert elapsed < 1.2
+        assert cache.get_preload_status()['errors'] == 0
+        assert cache.is_cached('word0', 'en', voice_en='female_shaonv')
+
+
+class TestStreaming:
+    """流式合成测试"""
+
+    def test_iter_speak_chunks(self, stub_server):
+        """逐块产出音频，拼接后与完整音频一致，且不重复汇总块"""
+        engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+        chunks = list(engine.iter_speak("apple"))
+
+        assert len(chunks) == stub_server.stream_chunks
+        assert b"".join(chunks) == b"ID3|apple|male-qn-qingse"
+        assert stub_server.requests[0]["stream"] is True
+
+    def test_first_chunk_before_completion(self, stub_server):
+        """首块音频在整段合成结束前到达"""
+        stub_server.chunk_delay = 0.3
+        engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+
+        start = time.perf_counter()
+        chunks = engine.iter_speak("apple")
+        next(chunks)
+        first = time.perf_counter() - start
+        list(chunks)
+        total = time.perf_counter() - start
+
+        assert first < 0.2
+        assert total >= 0.9
+
+    def test_stream_error(self, stub_server):
+        """流中的业务错误抛出异常"""
+        stub_server.errors = [{"status_code": 2013, "status_msg": "invalid params"}]
+        engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+
+        with pytest.raises(RuntimeError, match="invalid params"):
+            list(engine.iter_speak("apple"))
+
+    def test_cache_stream_writes_entry(self, stub_server, temp_dir):
+        """缓存流式获取时写入存储，再次获取直接读文件"""
+        cache = AudioCache(cache_dir=temp_dir)
+        cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+
+        data = b"".join(cache.stream_audio('apple', 'en', voice_en='male_qn_qingse'))
+        assert data == b"ID3|apple|male-qn-qingse"
+        assert cache.is_cached('apple', 'en', voice_en='male_qn_qingse')
+
+        assert b"".join(cache.stream_audio('apple', 'en', voice_en='male_qn_qingse')) == data
+        assert len(stub_server.requests) == 1
+
+    def test_stream_route(self, stub_server, temp_dir):
+        """音频服务的 /stream 边合成边返回，合成结果写入存储"""
+        cache = AudioCache(cache_dir=temp_dir)
+        cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+
+        with AudioServer(cache.store.root_dir, stream_source=cache.stream_voice) as server:
+            response = requests.get(server.stream_url("apple", "en", "male_qn_qingse"))
+        assert response.content == b"ID3|apple|male-qn-qingse"
+        assert cache.is_cached('apple', 'en', voice_en='male_qn_qingse')
+
+    def test_cache_stream_abandoned(self, stub_server, temp_dir):
+        """调用方中途停止时不留下不完整的缓存条目"""
+        cache = AudioCache(cache_dir=temp_dir)
+        cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+
+        chunks = cache.stream_audio('apple', 'en')
+        next(chunks)
+        chunks.close()
+
+        assert not cache.is_cached('apple', 'en', use_minimax=True)
+        assert len(cache.store) == 0
+        assert not cache._inflight
+
+
+class TestBatchSynthesis:
+    """批量合成测试"""
+
+    WORDS = ['cat', 'banana', 'ice cream', 'extraordinary', 'go']
+
+    def test_speak_batch_splits_by_subtitles(self, stub_server):
+        """一次请求合成多个单词，按字幕切分出各自的音频"""
+        engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+        clips = engine.speak_batch(self.WORDS)
+
+        assert len(stub_server.requests) == 1
+        payload = stub_server.requests[0]
+        assert payload["subtitle_enable"] is True
+        assert payload["text"].count("<#") == len(self.WORDS) - 1
+
+        # 每段 = 发音 + 两侧各约一半停顿（首尾段只有一侧）
+        half_pause = MiniMaxTTSEngine.BATCH_PAUSE / 2
+        for i, (word, clip) in enumerate(zip(self.WORDS, clips)):
+            expected = StubTTSServer.segment_duration(word + ".")
+            expected += half_pause * (1 if i in (0, len(self.WORDS) - 1) else 2)
+            assert get_duration(clip) == pytest.approx(expected, abs=0.08)
+
+    def test_speak_batch_without_subtitles(self, stub_server):
+        """没有字幕时抛出 BatchSplitError"""
+        stub_server.subtitles_enabled = False
+        engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+
+        with pytest.raises(BatchSplitError):
+            engine.speak_batch(self.WORDS)
+
+    def test_preload_in_batches(self, stub_server, temp_dir):
+        """预加载按批次请求，每个单词仍是独立的缓存条目"""
+        words = [{'en': f'word{i}', 'cn': f'词{i}'} for i in range(12)]
+        cache = AudioCache(cache_dir=temp_dir, batch_size=5)
+        cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+
+        cache.preload_all_required(words)
+
+        # 英文 12 个、中文 12 个，各分 3 批
+        assert len(stub_server.requests) == 6
+        status = cache.get_preload_status()
+        assert status['completed'] == 24
+        assert status['errors'] == 0
+        assert len(cache.store) == 24
+
+        path = cache.get_audio('word3', 'en')
+        with open(path, 'rb') as f:
+            assert get_duration(f.read()) > 0
+        assert len(stub_server.requests) == 6
+
+    def test_preload_batch_fallback(self, stub_server, temp_dir):
+        """批量结果无法切分时回退为逐个合成"""
+        stub_server.subtitles_enabled = False
+        words = [{'en': f'word{i}'} for i in range(4)]
+        cache = AudioCache(cache_dir=temp_dir, batch_size=4)
+        cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=stub_server.url)
+
+        cache.preload_words(words, mode='en_to_cn')
+
+        assert len(stub_server.requests) == 1 + 4
+        assert cache.get_preload_status()['errors'] == 0
+        assert all(cache.is_cached(f'word{i}', 'en') for i in range(4))
+
+
+class TestHTTPResilience:
+    """连接池、重试与限流测试"""
+
+    def make_engine(self, server, **kwargs):
+        kwargs.setdefault('retry_policy', RetryPolicy(max_retries=3, backoff_base=0.01))
+        return MiniMaxTTSEngine(api_key="stub", api_url=server.url, **kwargs)
+
+    def test_connection_reused(self, stub_server, temp_dir):
+        """连续请求复用同一条 keep-alive 连接"""
+        engine = self.make_engine(stub_server)
+        for i in range(5):
+            engine.speak(f"word{i}", save_path=os.path.join(temp_dir, f"{i}.mp3"))
+
+        assert len(stub_server.requests) == 5
+        assert len(stub_server.connections) == 1
+
+    def test_retry_on_429_and_5xx(self, stub_server, temp_dir):
+        """429/5xx 退避后重试成功"""
+        stub_server.errors = [429, 503]
+        engine = self.make_engine(stub_server)
+
+        path = engine.speak("apple", save_path=os.path.join(temp_dir, "apple.mp3"))
+
+        assert os.path.exists(path)
+        assert len(stub_server.requests) == 3
+
+    def test_retry_on_business_rate_limit(self, stub_server, temp_dir):
+        """base_resp 限流错误码同样重试"""
+        stub_server.errors = [{"status_code": 1002, "status_msg": "rate limit"}]
+        engine = self.make_engine(stub_server)
+
+        engine.speak("apple", save_path=os.path.join(temp_dir, "apple.mp3"))
+        assert len(stub_server.requests) == 2
+
+    def test_gives_up_after_max_retries(self, stub_server, temp_dir):
+        """超过重试次数后抛出错误"""
+        stub_server.errors = [500] * 10
+        engine = self.make_engine(stub_server, retry_policy=RetryPolicy(max_retries=2, backoff_base=0.01))
+
+        with pytest.raises(RuntimeError):
+            engine.speak("apple", save_path=os.path.join(temp_dir, "apple.mp3"))
+        assert len(stub_server.requests) == 3
+
+    def test_non_retryable_error(self, stub_server, temp_dir):
+        """鉴权等错误不重试"""
+        stub_server.errors = [{"status_code": 1004, "status_msg": "auth failed"}]
+        engine = self.make_engine(stub_server)
+
+        with pytest.raises(RuntimeError, match="auth failed"):
+            engine.speak("apple", save_path=os.path.join(temp_dir, "apple.mp3"))
+        assert len(stub_server.requests) == 1
+
+    def test_rate_limiter(self, stub_server, temp_dir):
+        """客户端限流控制请求速率"""
+        engine = self.make_engine(stub_server, rate_limiter=RateLimiter(rate_per_minute=600))
+
+        start = time.perf_counter()
+        for i in range(4):
+            engine.speak(f"w{i}", save_path=os.path.join(temp_dir, f"{i}.mp3"))
+        elapsed = time.perf_counter() - start
+
+        # 每秒 10 个，首个令牌立即可用
+        assert elapsed >= 0.28
+
+
+class TestRetryPolicy:
+    """退避策略测试"""
+
+    def test_delay_bounds(self):
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=4.0)
+        for attempt in range(6):
+            assert 0 <= policy.delay(attempt) <= min(4.0, 0.5 * 2 ** attempt)
+
+    def test_retry_after_header(self):
+        policy = RetryPolicy(backoff_max=4.0)
+        assert policy.delay(0, retry_after="2") == 2.0
+        assert policy.delay(0, retry_after="100") == 4.0
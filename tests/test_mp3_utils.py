@@ -0,0 +1,58 @@
+"""
+MP3 帧工具单元测试
+"""
+import pytest
+from src.mp3_utils import (
+    get_audio_params, get_duration, iter_frames, make_silence, parse_frame_header, slice_by_time
+)
+
+
+class TestMp3Utils:
+    """MP3 帧解析与切分测试类"""
+
+    @pytest.mark.parametrize("sample_rate,bitrate,samples", [
+        (32000, 128000, 1152),
+        (24000, 64000, 576),
+        (16000, 32000, 576),
+    ])
+    def test_silence_params(self, sample_rate, bitrate, samples):
+        """生成的静音帧可被解析，参数与请求一致"""
+        data = make_silence(1.0, sample_rate=sample_rate, bitrate=bitrate)
+        info = get_audio_params(data)
+
+        assert info["sample_rate"] == sample_rate
+        assert info["bitrate"] == bitrate
+        assert info["channels"] == 1
+        assert info["samples"] == samples
+        # 按帧向上取整
+        assert 1.0 <= get_duration(data) < 1.0 + samples / sample_rate
+
+    def test_skip_id3_and_garbage(self):
+        """跳过 ID3v2 标签与无法同步的字节"""
+        frames = make_silence(0.5)
+        tag = b"ID3\x04\x00\x00\x00\x00\x00\x05" + b"\x00" * 5
+        data = tag + frames + b"\x00\x01garbage"
+
+        assert get_duration(data) == pytest.approx(get_duration(frames))
+
+    def test_invalid_header(self):
+        """非 Layer III 帧头返回 None"""
+        assert parse_frame_header(b"ID3\x04") is None
+        assert parse_frame_header(b"\xff\xfb") is None
+
+    def test_slice_by_time(self):
+        """按时间截取帧，前后两段拼起来等于原音频"""
+        data = make_silence(2.0, sample_rate=24000, bitrate=64000)
+        head = slice_by_time(data, 0, 1.0)
+        tail = slice_by_time(data, 1.0)
+
+        assert head + tail == data
+        assert get_duration(head) == pytest.approx(1.0, abs=0.03)
+        assert len(list(iter_frames(head))) + len(list(iter_frames(tail))) == len(list(iter_frames(data)))
+
+    def test_unsupported_params(self):
+        """不支持的采样率/比特率报错"""
+        with pytest.raises(ValueError):
+            make_silence(1.0, sample_rate=12345)
+        with pytest.raises(ValueError):
+            make_silence(1.0, sample_rate=16000, bitrate=320000)
@@ -0,0 +1,219 @@
+"""
+预加载调度器单元测试
+"""
+import threading
+from src.preload_scheduler import PreloadJob, PreloadScheduler, playback_tasks, sync_session_preload
+
+
+class RecordingCache:
+    """记录合成顺序的假缓存，可在第一次合成时阻塞"""
+
+    def __init__(self):
+        self.max_workers = 1
+        self.batch_size = 1
+        self.calls = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.started = threading.Event()
+
+    def synthesize_many(self, words, mode="en", **kwargs):
+        paths = []
+        for text in words:
+            self.calls.append((text, kwargs.get("voice_en")))
+            self.started.set()
+            self.gate.wait(5)
+            paths.append(f"/tmp/{text}.mp3")
+        return paths
+
+    def track_job(self, job):
+        pass
+
+
+def make_tasks(count):
+    words = [{'en': f'w{i}', 'cn': f'词{i}'} for i in range(count)]
+    return playback_tasks(words, list(range(count)), "en_to_cn")
+
+
+class TestPreloadJob:
+    """任务句柄测试类"""
+
+    def test_progress_and_wait(self):
+        """进度随完成推进，结束后 wait 返回"""
+        job = PreloadJob(total=2)
+        assert not job.wait(0.01)
+
+        job._advance()
+        job._advance(error=True)
+        job._finish()
+
+        assert job.wait(0.01)
+        assert job.progress() == {
+            "total": 2, "completed": 2, "errors": 1,
+            "progress": 1.0, "finished": True, "cancelled": False,
+        }
+
+    def test_cancel_calls_back_once(self):
+        """取消只触发一次回调，结束后再取消无效"""
+        calls = []
+        job = PreloadJob(total=1, on_cancel=lambda: calls.append(1))
+        job.cancel()
+        job.cancel()
+        assert job.cancelled and calls == [1]
+
+        finished = PreloadJob(on_cancel=lambda: calls.append(2))
+        finished._finish()
+        finished.cancel()
+        assert not finished.cancelled and calls == [1]
+
+    def test_iter_progress_from_other_thread(self):
+        """进度流在后台线程推进时依次产出"""
+        job = PreloadJob(total=3)
+
+        def worker():
+            for _ in range(3):
+                job._advance()
+            job._finish()
+
+        threading.Thread(target=worker).start()
+        statuses = list(job.iter_progress(timeout=5))
+        assert statuses[-1]["completed"] == 3 and statuses[-1]["finished"]
+
+
+class TestPreloadScheduler:
+    """调度器测试类"""
+
+    def test_playback_tasks(self, sample_word_list):
+        """按播放顺序展开，拼写模式包含英文与中文"""
+        tasks = playback_tasks(sample_word_list, [2, 0], "spell")
+        assert tasks == [('computer', 'en', 0), ('电脑', 'cn', 0), ('apple', 'en', 1), ('苹果', 'cn', 1)]
+
+    def test_upcoming_words_first(self):
+        """从当前位置开始依次合成，已经过的单词排在后面"""
+        cache = RecordingCache()
+        scheduler = PreloadScheduler(cache)
+
+        scheduler.plan(make_tasks(10), position=5)
+        assert scheduler.wait(5)
+
+        order = [text for text, _ in cache.calls]
+        assert order[:4] == ['w5', 'w6', 'w7', 'w8']
+        assert order.index('w4') < order.index('w3') < order.index('w0')
+        assert scheduler.get_status()['done'] == 10
+
+    def test_reprioritize_on_skip(self):
+        """跳转播放位置后按新位置排序"""
+        cache = RecordingCache()
+        cache.gate.clear()
+        scheduler = PreloadScheduler(cache)
+
+        scheduler.plan(make_tasks(10), position=0)
+        assert cache.started.wait(5)
+        scheduler.set_position(7)
+        cache.gate.set()
+        assert scheduler.wait(5)
+
+        order = [text for text, _ in cache.calls]
+        assert order[:4] == ['w0', 'w7', 'w8', 'w9']
+
+    def test_cancel_deselected(self):
+        """重新规划时取消不再选中的单词"""
+        cache = RecordingCache()
+        cache.gate.clear()
+        scheduler = PreloadScheduler(cache)
+
+        scheduler.plan(make_tasks(10), position=0)
+        assert cache.started.wait(5)
+        scheduler.plan(make_tasks(3), position=0)
+        cache.gate.set()
+        assert scheduler.wait(5)
+
+        assert sorted(text for text, _ in cache.calls) == ['w0', 'w1', 'w2']
+
+    def test_voice_change_resynthesizes(self):
+        """切换音色后重新合成（包括切换时正在合成的单词）"""
+        cache = RecordingCache()
+        scheduler = PreloadScheduler(cache)
+
+        scheduler.plan(make_tasks(2), voice_en='a')
+        assert scheduler.wait(5)
+        scheduler.plan(make_tasks(2), voice_en='a')
+        assert scheduler.wait(5)
+        assert len(cache.calls) == 2
+
+        scheduler.plan(make_tasks(2), voice_en='b')
+        assert scheduler.wait(5)
+        assert cache.calls[2:] == [('w0', 'b'), ('w1', 'b')]
+
+    def test_batches_in_priority_order(self, temp_dir):
+        """开启批量合成时按优先级分批请求"""
+        from benchmarks.stub_tts_server import StubTTSServer
+        from src.audio_cache import AudioCache
+        from src.minimax_tts import MiniMaxTTSEngine
+
+        with StubTTSServer() as server:
+            cache = AudioCache(cache_dir=temp_dir, max_workers=1, batch_size=3)
+            cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=server.url)
+            scheduler = PreloadScheduler(cache)
+
+            scheduler.plan(make_tasks(6), position=3)
+            assert scheduler.wait(10)
+
+            assert len(server.requests) == 2
+            assert server.requests[0]["text"].startswith("w3.")
+        assert all(cache.is_cached(f'w{i}', 'en', use_minimax=True) for i in range(6))
+
+    def test_plan_returns_job(self):
+        """规划返回任务句柄，完成后进度达到总数；重新规划会替换旧句柄"""
+        cache = RecordingCache()
+        scheduler = PreloadScheduler(cache)
+
+        job = scheduler.plan(make_tasks(4))
+        assert job.wait(5)
+        assert job.progress()["completed"] == 4
+
+        cache.gate.clear()
+        old = scheduler.plan(make_tasks(8))
+        new = scheduler.plan(make_tasks(6))
+        cache.gate.set()
+        assert old.done() and old.cancelled
+        assert new.wait(5) and not new.cancelled
+        assert scheduler.job is new
+
+    def test_cancel_job_stops_pending(self):
+        """取消任务句柄后不再开始新的合成"""
+        cache = RecordingCache()
+        cache.gate.clear()
+        scheduler = PreloadScheduler(cache)
+
+        job = scheduler.plan(make_tasks(5))
+        assert cache.started.wait(5)
+        job.cancel()
+        cache.gate.set()
+
+        assert job.wait(5) and job.cancelled
+        assert scheduler.wait(5)
+        assert [text for text, _ in cache.calls] == ['w0']
+
+    def test_sync_session_preload(self):
+        """会话同步：参数不变时复用规划，只更新播放位置"""
+        cache = RecordingCache()
+        session = {
+            'audio_cache': cache,
+            'selected_words': [{'en': f'w{i}', 'cn': f'词{i}'} for i in range(3)],
+            'dictation_order': [0, 1, 2],
+            'dictation_mode': 'en_to_cn',
+            'voice_en': 'a',
+            'voice_cn': 'b',
+            'current_index': 0,
+        }
+
+        job = sync_session_preload(session)
+        assert job.wait(5)
+        session['current_index'] = 2
+        assert sync_session_preload(session) is job
+        assert session['preload_scheduler'].position == 2
+
+        session['voice_en'] = 'c'
+        assert sync_session_preload(session) is not job
+        assert session['preload_scheduler'].wait(5)
+        assert len(cache.calls) == 6
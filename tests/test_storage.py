@@ -0,0 +1,198 @@
+"""
+存储后端单元测试（JSON 与 SQLite 行为一致）
+"""
+import json
+import os
+
+import pytest
+
+from data.vocabulary_store import VocabularyStore
+from src.history_manager import HistoryManager
+from src.storage import (DocumentCache, JsonHistoryBackend, JsonVocabularyBackend,
+                         JsonWrongAnswerBackend, SqliteDatabase, SqliteHistoryBackend,
+                         SqliteVocabularyBackend, SqliteWrongAnswerBackend, create_history_backend,
+                         document_cache)
+from src.storage.migrate import migrate_json_to_sqlite
+from src.wrong_answer_manager import WrongAnswerManager
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def backends(request, temp_dir):
+    """(词库, 历史记录, 错题本) 后端"""
+    if request.param == "json":
+        yield (JsonVocabularyBackend(os.path.join(temp_dir, "vocabularies")),
+               JsonHistoryBackend(os.path.join(temp_dir, "history.json")),
+               JsonWrongAnswerBackend(os.path.join(temp_dir, "wrong_answers.json")))
+    else:
+        db = SqliteDatabase(os.path.join(temp_dir, "dictation.db"))
+        yield (SqliteVocabularyBackend(db), SqliteHistoryBackend(db), SqliteWrongAnswerBackend(db))
+        db.close()
+
+
+class TestBackends:
+    """两种后端通过管理器接口的行为测试"""
+
+    def test_history(self, backends, sample_history_records):
+        manager = HistoryManager(backend=backends[1])
+        ids = [manager.add_record(**record) for record in sample_history_records]
+        assert all(ids)
+
+        records = manager.get_all_records()
+        assert [r['vocabulary_name'] for r in records] == ['测试词库2', '测试词库1']
+        assert len(manager.get_all_records(limit=1)) == 1
+        assert manager.get_record_by_id(ids[0])['score'] == 80.0
+        assert manager.get_statistics()['total_sessions'] == 2
+
+        assert manager.delete_record(records[0]['id'])
+        assert not manager.delete_record('missing')
+        assert manager.clear_all_records()
+        assert manager.get_all_records() == []
+
+    def test_wrong_answers(self, backends):
+        manager = WrongAnswerManager(backend=backends[2])
+        manager.add_wrong_answer('apple', '苹果', '苹')
+        manager.add_wrong_answer('banana', '香蕉', '香')
+        manager.add_wrong_answer('Apple', '苹果', 'aple')
+
+        words = manager.get_all_wrong_answers()
+        assert [w['en'] for w in words] == ['apple', 'banana']
+        assert words[0]['wrong_count'] == 2 and words[0]['user_answer'] == 'aple'
+        assert manager.get_stats() == {'total_wrong': 3, 'unique_words': 2}
+
+        manager.remove_word('APPLE')
+        assert manager.get_stats() == {'total_wrong': 1, 'unique_words': 1}
+        manager.clear_all()
+        assert manager.get_all_wrong_answers() == []
+
+    def test_wrong_answers_batch(self, backends):
+        """批量添加与逐个添加结果相同"""
+        manager = WrongAnswerManager(backend=backends[2])
+        manager.add_wrong_answer('banana', '香蕉', '香')
+        manager.add_wrong_answers([
+            {'en': 'apple', 'cn': '苹果', 'user_answer': '苹'},
+            {'en': 'Banana', 'cn': '香蕉', 'user_answer': 'banan'},
+            {'en': 'APPLE', 'cn': '苹果', 'user_answer': 'aple'},
+        ])
+        manager.add_wrong_answers([])
+
+        words = manager.get_all_wrong_answers()
+        assert [(w['en'], w['wrong_count'], w['user_answer']) for w in words] == \
+            [('banana', 2, 'banan'), ('apple', 2, 'aple')]
+        assert manager.get_stats() == {'total_wrong': 4, 'unique_words': 2}
+
+    def test_vocabularies(self, backends, sample_word_list):
+        store = VocabularyStore(backend=backends[0])
+        assert store.save_vocabulary('四级', sample_word_list)
+        created_at = store.load_vocabulary('四级')['created_at']
+
+        assert store.save_vocabulary('四级', sample_word_list[:2])
+        loaded = store.load_vocabulary('四级')
+        assert loaded['words'] == sample_word_list[:2]
+        assert loaded['created_at'] == created_at
+        assert store.list_vocabularies()[0]['word_count'] == 2
+
+        assert store.rename_vocabulary('四级', '六级')
+        assert not store.vocabulary_exists('四级') and store.vocabulary_exists('六级')
+        assert store.delete_vocabulary('六级')
+        assert store.load_vocabulary('六级') is None
+
+
+class TestSqlite:
+    """SQLite 后端测试"""
+
+    def test_wal_and_shared_file(self, temp_dir):
+        """WAL 模式；同一文件的两个连接互相可见"""
+        path = os.path.join(temp_dir, "dictation.db")
+        first, second = SqliteDatabase(path), SqliteDatabase(path)
+        assert first.query("PRAGMA journal_mode")[0][0] == "wal"
+
+        SqliteHistoryBackend(first).append({"id": "1", "date": "2024-01-01T00:00:00"})
+        assert SqliteHistoryBackend(second).get("1") == {"id": "1", "date": "2024-01-01T00:00:00"}
+
+    def test_storage_env(self, temp_dir, monkeypatch):
+        """DICTATION_STORAGE 选择后端，显式路径总是使用 JSON 文件"""
+        monkeypatch.setenv("DICTATION_STORAGE", "sqlite")
+        monkeypatch.setenv("DICTATION_DB_PATH", os.path.join(temp_dir, "app.db"))
+        monkeypatch.setattr("src.storage.DATA_DIR", temp_dir)
+        assert isinstance(create_history_backend(), SqliteHistoryBackend)
+        assert isinstance(create_history_backend(os.path.join(temp_dir, "h.json")), JsonHistoryBackend)
+
+
+class TestMigration:
+    """JSON -> SQLite 迁移测试"""
+
+    def test_migrate(self, temp_dir, sample_word_list):
+        vocab_dir = os.path.join(temp_dir, "vocabularies")
+        os.makedirs(vocab_dir)
+        with open(os.path.join(vocab_dir, "cet4.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": "四级", "words": sample_word_list, "description": "核心词",
+                       "created_at": "2024-01-01T00:00:00", "updated_at": "2024-02-01T00:00:00"}, f)
+        history = JsonHistoryBackend(os.path.join(temp_dir, "history.json"))
+        history.append({"id": "a", "date": "2024-01-01T00:00:00", "score": 50})
+        history.append({"id": "b", "date": "2024-01-02T00:00:00", "score": 90})
+        wrong = WrongAnswerManager(os.path.join(temp_dir, "wrong_answers.json"))
+        wrong.add_wrong_answer('apple', '苹果', 'a')
+        wrong.add_wrong_answer('apple', '苹果', 'ap')
+
+        db = SqliteDatabase(os.path.join(temp_dir, "dictation.db"))
+        counts = migrate_json_to_sqlite(db, temp_dir)
+        assert counts == {"vocabularies": 1, "records": 2, "wrong_words": 1}
+
+        vocab = SqliteVocabularyBackend(db).load("四级")
+        assert vocab["description"] == "核心词" and vocab["updated_at"] == "2024-02-01T00:00:00"
+        assert [r["id"] for r in SqliteHistoryBackend(db).list()] == ["b", "a"]
+        assert SqliteWrongAnswerBackend(db).stats() == {'total_wrong': 2, 'unique_words': 1}
+
+        # 只迁移一次
+        assert migrate_json_to_sqlite(db, temp_dir) == {"vocabularies": 0, "records": 0, "wrong_words": 0}
+        assert len(SqliteHistoryBackend(db).list()) == 2
+
+
+class TestDocumentCache:
+    """JSON 文档缓存测试"""
+
+    def test_hits_and_external_change(self, temp_dir):
+        path = os.path.join(temp_dir, "doc.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"v": 1}, f)
+        cache = DocumentCache()
+        loads = []
+
+        def loader(p):
+            loads.append(p)
+            with open(p, encoding="utf-8") as f:
+                return json.load(f)
+
+        assert cache.load(path, loader) == {"v": 1}
+        assert cache.load(path, loader) == {"v": 1}
+        assert len(loads) == 1
+
+        # 其他进程修改文件（大小变化）
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"v": 100}, f)
+        assert cache.load(path, loader) == {"v": 100}
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+    def test_write_through_and_copies(self, temp_dir, sample_word_list):
+        """写入后直接命中缓存；返回给调用方的是副本"""
+        manager = HistoryManager(os.path.join(temp_dir, "history.json"))
+        wrong = WrongAnswerManager(os.path.join(temp_dir, "wrong_answers.json"))
+        store = VocabularyStore(base_dir=os.path.join(temp_dir, "vocabularies"))
+        manager.add_record("spell", "词库", 10, 8, 30)
+        wrong.add_wrong_answer('apple', '苹果', 'a')
+        store.save_vocabulary('四级', sample_word_list)
+
+        misses = document_cache.stats()["misses"]
+        manager.get_all_records()[0]["score"] = 0
+        manager.get_all_records()[0]["wrong_words"].append({"en": "x"})
+        manager.get_record_by_id(manager.get_all_records()[0]["id"])["user_answers"]["0"] = "x"
+        wrong.get_all_wrong_answers()[0]["wrong_count"] = 99
+        store.load_vocabulary('四级')['words'][0]['en'] = 'changed'
+        sample_word_list[1]['en'] = 'changed'
+
+        assert manager.get_all_records()[0]["score"] == 80.0
+        assert manager.get_all_records()[0]["wrong_words"] == []
+        assert manager.get_all_records()[0]["user_answers"] == {}
+        assert wrong.get_review_words()[0]["wrong_count"] == 1
+        assert [w['en'] for w in store.load_vocabulary('四级')['words'][:2]] == ['apple', 'banana']
+        assert document_cache.stats()["misses"] == misses
@@ -0,0 +1,78 @@
+"""
+文本规范化单元测试
+"""
+import pytest
+
+from src.audio_cache import AudioCache
+from src.text_normalizer import normalize_text
+
+
+class TestNormalizeText:
+    """规范化规则测试类"""
+
+    @pytest.mark.parametrize("text", ["ice-cream", "ice cream", " ice_cream. ", "ice—cream", "ｉｃｅ cream"])
+    def test_english_variants_share_text(self, text):
+        """连字符、首尾标点、全角不同的写法规范化为同一文本"""
+        assert normalize_text(text, "en") == "ice cream"
+
+    def test_english_keeps_meaningful_differences(self):
+        """缩写、撇号、大小写与斜杠保留（可能影响读音）"""
+        assert normalize_text("USA", "en") == "USA"
+        assert normalize_text("a.m.", "en") == "a.m."
+        assert normalize_text("Don’t", "en") == "Don't"
+        assert normalize_text("?", "en") == "?"
+        assert normalize_text("Polish", "en") != normalize_text("polish", "en")
+        assert normalize_text("1/2", "en") == "1/2"
+
+    def test_chinese_separators(self):
+        """中文义项分隔符统一为逗号，去掉空格与首尾标点"""
+        assert normalize_text("苹果；苹果树", "cn") == "苹果，苹果树"
+        assert normalize_text(" 苹果 ; 苹果树。", "cn") == "苹果，苹果树"
+        assert normalize_text("苹果/苹果树", "cn") == "苹果，苹果树"
+        assert normalize_text("苹果苹果树", "cn") == "苹果苹果树"
+        assert normalize_text("（人）苹果", "cn") == "(人)苹果"
+        assert normalize_text("n. 苹果", "cn") == "n. 苹果"
+
+    @pytest.mark.parametrize("text, lang", [
+        ("Ice-Cream!", "en"), ("Mr. Smith", "en"), ("T-shirt", "en"),
+        ("放弃 ，抛弃……", "cn"), ("DNA 分子", "cn"),
+    ])
+    def test_idempotent(self, text, lang):
+        once = normalize_text(text, lang)
+        assert normalize_text(once, lang) == once
+
+
+class TestCacheDeduplication:
+    """AudioCache 规范化去重测试类"""
+
+    def test_equivalent_words_share_one_clip(self, temp_dir, monkeypatch):
+        """读音相同的写法只合成一次，读音不同的文本不会相互覆盖"""
+        cache = AudioCache(cache_dir=temp_dir)
+        rendered = []
+
+        def fake_render(word, mode, spec, tmp_path):
+            rendered.append(word)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(word)
+            return tmp_path
+
+        monkeypatch.setattr(cache, "_render", fake_render)
+
+        words = [{'en': 'ice-cream', 'cn': '苹果；苹果树'},
+                 {'en': 'ice cream', 'cn': '苹果; 苹果树'},
+                 {'en': 'ice_cream', 'cn': '苹果苹果树'}]
+        cache.preload_all_required(words)
+
+        # 交给 TTS 的是首次出现的原文，而不是规范化后的文本
+        assert sorted(rendered) == ['ice-cream', '苹果苹果树', '苹果；苹果树']
+        assert cache.get_preload_status()["completed"] == 3
+
+        path = cache.get_audio("ice-cream!", "en")
+        assert path == cache.get_audio("ice cream", "en")
+        assert cache.is_cached("ice_cream", "en")
+        assert cache.get_audio("苹果；苹果树", "cn") != cache.get_audio("苹果苹果树", "cn")
+        assert len(rendered) == 3
+
+        cache.get_audio("Polish", "en")
+        cache.get_audio("1/2", "en")
+        assert rendered[3:] == ['Polish', '1/2']
@@ -0,0 +1,166 @@
+"""
+整段音频导出单元测试
+"""
+import os
+import time
+
+import pytest
+
+from components.audio_player import AudioPlayer
+from src.mp3_utils import get_audio_params, get_duration, make_silence
+from src.track_builder import build_chapter_tag, build_track
+
+
+def write_clip(temp_dir, name, seconds, sample_rate=16000, bitrate=32000):
+    path = os.path.join(temp_dir, f"{name}.mp3")
+    with open(path, "wb") as f:
+        f.write(make_silence(seconds, sample_rate=sample_rate, bitrate=bitrate))
+    return path
+
+
+def read_chapters(data):
+    """从 ID3v2.4 标签中读出 CHAP 帧 (元素 ID, 开始毫秒, 结束毫秒, 标题)"""
+    assert data[:4] == b"ID3\x04"
+    size = 0
+    for b in data[6:10]:
+        size = (size << 7) | b
+    pos, end = 10, 10 + size
+    chapters = []
+    while pos < end:
+        frame_id = data[pos:pos + 4].decode("latin-1")
+        frame_size = 0
+        for b in data[pos + 4:pos + 8]:
+            frame_size = (frame_size << 7) | b
+        body = data[pos + 10:pos + 10 + frame_size]
+        if frame_id == "CHAP":
+            element_id, rest = body.split(b"\x00", 1)
+            start = int.from_bytes(rest[0:4], "big")
+            stop = int.from_bytes(rest[4:8], "big")
+            title = rest[16 + 11:].rstrip(b"\x00").decode("utf-8")
+            chapters.append((element_id.decode(), start, stop, title))
+        pos += 10 + frame_size
+    return chapters, end
+
+
+class Mp3Cache:
+    """返回真实 MP3 帧的假缓存：时长随文本长度变化"""
+
+    def __init__(self, temp_dir):
+        self.temp_dir = temp_dir
+
+    def preload_words(self, words, mode, **kwargs):
+        pass
+
+    def get_audio(self, text, mode="en", **kwargs):
+        return write_clip(self.temp_dir, text, 0.3 + 0.05 * len(text))
+
+
+class TestBuildTrack:
+    """拼接测试类"""
+
+    def test_stream_copy_with_gaps(self, temp_dir):
+        """片段与静音按顺序拼接，章节时间与音频一致"""
+        a = write_clip(temp_dir, "a", 0.5)
+        b = write_clip(temp_dir, "b", 0.8)
+        output = os.path.join(temp_dir, "track.mp3")
+
+        chapters = build_track([
+            {"path": a, "gap": 1.0, "chapter": "1"},
+            {"path": b, "gap": 2.0, "chapter": "2"},
+        ], output)
+
+        with open(output, "rb") as f:
+            data = f.read()
+        duration = get_duration(data)
+        assert duration == pytest.approx(4.3, abs=0.1)
+        assert chapters[0]["start"] == 0
+        assert chapters[1]["start"] == pytest.approx(1.5, abs=0.1)
+        assert chapters[1]["end"] == pytest.approx(duration)
+        assert get_audio_params(data)["sample_rate"] == 16000
+
+        tagged, _ = read_chapters(data)
+        assert [(c[0], c[3]) for c in tagged] == [("ch0", "1"), ("ch1", "2")]
+        assert tagged[1][1] == round(chapters[1]["start"] * 1000)
+
+    def test_same_chapter_merged_and_invalid_skipped(self, temp_dir):
+        """相邻同名片段合并为一个章节，非 MP3 片段被跳过"""
+        a = write_clip(temp_dir, "a", 0.5)
+        broken = os.path.join(temp_dir, "broken.mp3")
+        with open(broken, "wb") as f:
+            f.write(b"not audio")
+        output = os.path.join(temp_dir, "track.mp3")
+
+        chapters = build_track([
+            {"path": a, "gap": 0.5, "chapter": "1"},
+            {"path": a, "gap": 1.0, "chapter": "1"},
+            {"path": broken, "gap": 1.0, "chapter": "2"},
+        ], output)
+
+        assert len(chapters) == 1
+        assert chapters[0]["end"] == pytest.approx(2.5, abs=0.1)
+
+    def test_no_audio(self, temp_dir):
+        """没有可拼接的音频时报错且不留下文件"""
+        broken = os.path.join(temp_dir, "broken.mp3")
+        with open(broken, "wb") as f:
+            f.write(b"not audio")
+        with pytest.raises(ValueError):
+            build_track([{"path": broken, "gap": 1.0}], os.path.join(temp_dir, "track.mp3"))
+        assert os.listdir(temp_dir) == ["broken.mp3"]
+
+    def test_copy_failure_leaves_no_files(self, temp_dir, monkeypatch):
+        """写入输出文件失败时删除所有临时文件"""
+        clips_dir = os.path.join(temp_dir, "clips")
+        out_dir = os.path.join(temp_dir, "out")
+        os.makedirs(clips_dir)
+        os.makedirs(out_dir)
+        a = write_clip(clips_dir, "a", 0.5)
+
+        def failing_copy(src, dst, *args):
+            dst.write(b"partial")
+            raise OSError("磁盘已满")
+
+        monkeypatch.setattr("src.track_builder.shutil.copyfileobj", failing_copy)
+        with pytest.raises(OSError):
+            build_track([{"path": a, "gap": 1.0}], os.path.join(out_dir, "track.mp3"))
+        assert os.listdir(out_dir) == []
+
+    def test_many_chapters_split_toc(self):
+        """超过 255 个章节时拆分为子目录"""
+        chapters = [{"title": str(i), "start": i, "end": i + 1} for i in range(300)]
+        tag = build_chapter_tag(chapters)
+        assert tag.count(b"CTOC") == 3
+        assert tag.count(b"CHAP") == 300
+
+
+class TestExportTrack:
+    """播放器导出测试类"""
+
+    def test_export_follows_order_and_spell_gap(self, temp_dir, sample_word_list):
+        """按播放顺序导出，拼写模式中英文之间使用固定间隔"""
+        player = AudioPlayer(Mp3Cache(temp_dir))
+        output = os.path.join(temp_dir, "track.mp3")
+
+        chapters = player.export_track(sample_word_list[:2], [1, 0], "spell", output, interval=3)
+
+        assert [c["title"] for c in chapters] == ["第 1 个", "第 2 个"]
+        second_word = sample_word_list[0]
+        en = 0.3 + 0.05 * len(second_word['en'])
+        cn = 0.3 + 0.05 * len(second_word['cn'])
+        length = chapters[1]["end"] - chapters[1]["start"]
+        assert length == pytest.approx(en + AudioPlayer.SPELL_GAP + cn + 3, abs=0.2)
+
+    def test_200_words_fast(self, temp_dir):
+        """热缓存下 200 个单词的导出在一秒内完成"""
+        words = [{'en': f'word{i}', 'cn': f'词{i}'} for i in range(200)]
+        player = AudioPlayer(Mp3Cache(temp_dir))
+        for word in words:
+            player.get_audio_path(word['en'], 'en')
+        output = os.path.join(temp_dir, "track.mp3")
+
+        start = time.perf_counter()
+        chapters = player.export_track(words, list(range(200)), "en_to_cn", output, interval=3)
+        elapsed = time.perf_counter() - start
+
+        assert len(chapters) == 200
+        assert elapsed < 1.0
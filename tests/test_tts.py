@@ -3,7 +3,44 @@ TTS引擎单元测试
 """
 import pytest
 import os
-from src.tts_engine import TTSEngine, speak_word
+import asyncio
+from src.tts_engine import TTSEngine, speak_word, get_tts_loop
+
+
+class FakeCommunicate:
+    """替代 edge_tts.Communicate 的假实现，记录并发度与所用事件循环"""
+
+    active = 0
+    max_active = 0
+    loops = set()
+
+    def __init__(self, text, voice=None, rate=None, volume=None, **kwargs):
+        self.text = text
+        self.voice = voice
+
+    async def stream(self):
+        cls = FakeCommunicate
+        cls.loops.add(id(asyncio.get_running_loop()))
+        cls.active += 1
+        cls.max_active = max(cls.max_active, cls.active)
+        try:
+            await asyncio.sleep(0.05)
+            yield {"type": "audio", "data": f"ID3|{self.text}|".encode('utf-8')}
+            yield {"type": "SentenceBoundary"}
+            yield {"type": "audio", "data": self.voice.encode('utf-8')}
+        finally:
+            cls.active -= 1
+
+
+@pytest.fixture
+def fake_edge(monkeypatch):
+    """用假的 edge-tts 替换网络合成"""
+    import edge_tts
+    FakeCommunicate.active = 0
+    FakeCommunicate.max_active = 0
+    FakeCommunicate.loops = set()
+    monkeypatch.setattr(edge_tts, "Communicate", FakeCommunicate)
+    return FakeCommunicate
 
 
 class TestTTSEngine:
@@ -105,6 +142,92 @@ class TestTTSEngine:
         assert len(audio_bytes) > 0
 
 
+class TestAsyncPipeline:
+    """异步合成管线测试"""
+
+    def test_speak_writes_stream_to_path(self, fake_edge, temp_dir):
+        """音频分片直接写入目标文件"""
+        engine = TTSEngine()
+        path = engine.speak("hello", save_path=os.path.join(temp_dir, "hello.mp3"),
+                            voice="en-GB-SoniaNeural")
+
+        with open(path, 'rb') as f:
+            assert f.read() == b"ID3|hello|en-GB-SoniaNeural"
+
+    def test_single_long_lived_loop(self, fake_edge, temp_dir):
+        """多次合成复用同一个事件循环"""
+        engine = TTSEngine()
+        engine.speak("one", save_path=os.path.join(temp_dir, "1.mp3"))
+        engine.speak("two", save_path=os.path.join(temp_dir, "2.mp3"))
+        engine.speak_many([{"text": "three", "save_path": os.path.join(temp_dir, "3.mp3")}])
+
+        assert fake_edge.loops == {id(get_tts_loop().loop)}
+
+    def test_speak_many_bounded_concurrency(self, fake_edge, temp_dir):
+        """speak_many 并发执行且受信号量限制"""
+        engine = TTSEngine()
+        items = [{"text": f"w{i}", "save_path": os.path.join(temp_dir, f"w{i}.mp3")}
+                 for i in range(12)]
+        done = []
+
+        results = engine.speak_many(items, concurrency=4, on_done=lambda i, r: done.append(i))
+
+        assert results == [item["save_path"] for item in items]
+        assert sorted(done) == list(range(12))
+        assert fake_edge.max_active == 4
+
+    def test_audio_cache_preload_uses_speak_many(self, fake_edge, temp_dir, monkeypatch):
+        """AudioCache 的 Edge 预加载直接驱动异步管线"""
+        from src.audio_cache import AudioCache
+        from src import tts_engine as tts_module
+
+        calls = []
+        original = tts_module.tts_engine.speak_many
+
+        def spy(items, concurrency=8, on_done=None, **kwargs):
+            calls.append(len(items))
+            return original(items, concurrency=concurrency, on_done=on_done, **kwargs)
+
+        monkeypatch.setattr(tts_module.tts_engine, "speak_many", spy)
+
+        cache = AudioCache(cache_dir=temp_dir, max_workers=3)
+        words = [{'en': f'word{i}', 'cn': f'词{i}'} for i in range(6)]
+        cache.preload_words(words, mode='spell', use_minimax=False)
+
+        status = cache.get_preload_status()
+        assert calls == [12]
+        assert status['completed'] == 12 and status['errors'] == 0
+        assert fake_edge.max_active == 3
+        assert cache.is_cached('word0', 'en', use_minimax=False)
+        assert cache.is_cached('词5', 'cn', use_minimax=False)
+
+
+    def test_speak_skips_edge_when_circuit_open(self, monkeypatch, temp_dir):
+        """Edge TTS 连续失败后熔断，之后直接使用本地 TTS"""
+        import edge_tts
+
+        class BrokenCommunicate(FakeCommunicate):
+            calls = 0
+
+            async def stream(self):
+                BrokenCommunicate.calls += 1
+                raise ConnectionError("edge down")
+                yield
+
+        monkeypatch.setattr(edge_tts, "Communicate", BrokenCommunicate)
+        engine = TTSEngine()
+        local_calls = []
+        monkeypatch.setattr(engine, "_speak_local",
+                            lambda text, save_path=None: local_calls.append(text) or save_path)
+
+        for i in range(5):
+            engine.speak(f"w{i}", save_path=os.path.join(temp_dir, f"{i}.mp3"))
+
+        assert BrokenCommunicate.calls == 3
+        assert len(local_calls) == 5
+        assert engine.edge_breaker.state == "open"
+
+
 class TestSpeakWord:
     """测试speak_word便捷函数"""
 
@@ -0,0 +1,208 @@
+"""
+TTS 引擎注册表与路由单元测试
+"""
+import time
+
+from benchmarks.stub_tts_server import StubTTSServer
+from src.audio_cache import AudioCache
+from src.circuit_breaker import CircuitBreaker
+from src.http_client import RetryPolicy
+from src.minimax_tts import MiniMaxTTSEngine
+from src.tts_registry import EDGE_INFO, LOCAL_INFO, MINIMAX_INFO, EngineInfo, TTSRegistry
+
+
+def noop_render(text, spec, tmp_path):
+    return tmp_path
+
+
+def make_registry():
+    registry = TTSRegistry()
+    registry.register(MINIMAX_INFO, noop_render)
+    registry.register(EDGE_INFO, noop_render)
+    registry.register(LOCAL_INFO, noop_render)
+    return registry
+
+
+class TestRouting:
+    """路由测试类"""
+
+    def test_preferred_first_then_registration_order(self):
+        """首选引擎在前，其余按登记顺序"""
+        registry = make_registry()
+        assert registry.route("en", preferred="edge") == ["edge", "minimax", "local"]
+        assert registry.route("en") == ["minimax", "edge", "local"]
+
+    def test_capability_filters(self):
+        """按语言、成本、离线能力和可用性过滤"""
+        registry = make_registry()
+        registry.register(EngineInfo("espeak", ("en",), 0.05, 0.0, True, False), noop_render)
+        registry.register(EngineInfo("broken", ("en", "cn"), 0.1, 0.0, True, False), noop_render,
+                          available=lambda: False)
+
+        assert "espeak" not in registry.route("cn")
+        assert registry.route("en", max_cost=0) == ["edge", "local", "espeak"]
+        assert registry.route("en", offline_only=True) == ["local", "espeak"]
+        assert "broken" not in registry.route("en")
+
+    def test_open_circuit_skipped(self):
+        """熔断中的引擎不参与路由，冷却后由一次探测决定是否恢复"""
+        registry = TTSRegistry()
+        registry.register(MINIMAX_INFO, noop_render, breaker=CircuitBreaker(cooldown=0.05))
+        registry.register(EDGE_INFO, noop_render)
+        for _ in range(3):
+            assert registry.acquire("minimax")
+            registry.report_failure("minimax")
+
+        assert registry.route("en", preferred="minimax") == ["edge"]
+        assert not registry.get_health()["minimax"]["healthy"]
+        assert not registry.acquire("minimax")
+
+        time.sleep(0.06)
+        assert registry.route("en", preferred="minimax") == ["minimax", "edge"]
+        assert registry.acquire("minimax")
+        # 探测进行中，其余调用直接走下一个引擎
+        assert registry.route("en", preferred="minimax") == ["edge"]
+
+        registry.report_success("minimax", 0.5)
+        assert registry.get_health()["minimax"]["state"] == "closed"
+
+
+class TestCacheRouting:
+    """AudioCache 按路由回退测试类"""
+
+    def _cache(self, temp_dir, calls):
+        cache = AudioCache(cache_dir=temp_dir)
+
+        def failing(name):
+            def render(text, spec, tmp_path):
+                calls.append((name, text))
+                raise RuntimeError(f"{name} down")
+            return render
+
+        def local_batch(items):
+            calls.append(("local-batch", [text for text, _, _ in items]))
+            results = []
+            for text, _, tmp_path in items:
+                with open(tmp_path, "wb") as f:
+                    f.write(text.encode("utf-8"))
+                results.append(tmp_path)
+            return results
+
+        cache.registry.register(MINIMAX_INFO, failing("minimax"))
+        cache.registry.register(EDGE_INFO, failing("edge"))
+        cache.registry.register(
+            LOCAL_INFO,
+            lambda text, spec, tmp_path: local_batch([(text, spec, tmp_path)])[0],
+            render_batch=local_batch,
+        )
+        return cache
+
+    def test_falls_back_through_chain(self, temp_dir):
+        """首选引擎失败后依次尝试下一个，结果可被再次命中"""
+        calls = []
+        cache = self._cache(temp_dir, calls)
+
+        path = cache.get_audio("apple", "en")
+        assert path is not None
+        assert [name for name, _ in calls] == ["minimax", "edge", "local-batch"]
+
+        calls.clear()
+        assert cache.get_audio("apple", "en") == path
+        assert calls == []
+
+    def test_retries_preferred_engine_after_fallback_ttl(self, temp_dir):
+        """回退引擎的音频只在有效期内直接命中，到期后重新尝试首选引擎"""
+        calls = []
+        cache = self._cache(temp_dir, calls)
+        fallback = cache.get_audio("apple", "en")
+        assert [name for name, _ in calls] == ["minimax", "edge", "local-batch"]
+
+        def minimax(text, spec, tmp_path):
+            calls.append(("minimax-ok", text))
+            with open(tmp_path, "wb") as f:
+                f.write(b"ID3")
+            return tmp_path
+
+        # 首选引擎恢复后，有效期内仍直接使用回退音频
+        cache.registry.register(MINIMAX_INFO, minimax)
+        calls.clear()
+        assert cache.get_audio("apple", "en") == fallback and calls == []
+
+        # 到期后重新尝试首选引擎，之后命中首选引擎的音频
+        cache._fallback_until = {key: 0 for key in cache._fallback_until}
+        preferred = cache.get_audio("apple", "en")
+        assert preferred != fallback and calls == [("minimax-ok", "apple")]
+        assert cache.get_audio("apple", "en") == preferred and len(calls) == 1
+
+    def test_local_engine_requires_ffmpeg(self, temp_dir, monkeypatch):
+        """本地引擎输出 WAV，没有 ffmpeg 转码时不参与路由"""
+        from src import audio_cache as audio_cache_module
+        monkeypatch.setattr(audio_cache_module.tts_engine, 'local_tts', object())
+
+        monkeypatch.setattr(audio_cache_module, 'transcode_available', lambda: False)
+        assert "local" not in AudioCache(cache_dir=temp_dir).registry.route("en")
+
+        monkeypatch.setattr(audio_cache_module, 'transcode_available', lambda: True)
+        assert "local" in AudioCache(cache_dir=temp_dir).registry.route("en")
+
+    def test_preload_uses_batch_engine_when_others_unhealthy(self, temp_dir):
+        """网络引擎熔断后，预加载直接用本地引擎批量合成"""
+        calls = []
+        cache = self._cache(temp_dir, calls)
+        for _ in range(3):
+            cache.registry.report_failure("minimax")
+            cache.registry.report_failure("edge")
+
+        words = [{'en': f'w{i}', 'cn': f'词{i}'} for i in range(5)]
+        cache.preload_words(words, mode="spell")
+
+        assert calls == [("local-batch", ['w0', '词0', 'w1', '词1', 'w2', '词2', 'w3', '词3', 'w4', '词4'])]
+        assert cache.get_preload_status()["completed"] == 10
+        assert all(cache.get_audio(w['en'], 'en') for w in words)
+        assert len(calls) == 1
+
+    def test_custom_engine(self, temp_dir):
+        """自定义引擎登记后参与路由"""
+        cache = AudioCache(cache_dir=temp_dir)
+        for info in (MINIMAX_INFO, EDGE_INFO, LOCAL_INFO):
+            cache.registry.unregister(info.name)
+
+        def render(text, spec, tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(b"custom")
+            return tmp_path
+
+        cache.registry.register(EngineInfo("custom", ("en",), 0.01, 0.0, True, False), render)
+        path = cache.get_audio("apple", "en")
+        with open(path, "rb") as f:
+            assert f.read() == b"custom"
+        assert cache.get_audio("苹果", "cn") is None
+
+    def test_minimax_outage_fails_fast(self, temp_dir):
+        """MiniMax 故障时熔断，之后的单词直接用 Edge TTS，不再请求 MiniMax"""
+        edge_calls = []
+
+        def edge_render(text, spec, tmp_path):
+            edge_calls.append(text)
+            with open(tmp_path, "wb") as f:
+                f.write(b"edge")
+            return tmp_path
+
+        with StubTTSServer() as server:
+            server.errors = [503] * 100
+            cache = AudioCache(cache_dir=temp_dir, max_workers=1)
+            cache._minimax_engine = MiniMaxTTSEngine(api_key="stub", api_url=server.url,
+                                                     retry_policy=RetryPolicy(max_retries=0))
+            cache.registry.register(EDGE_INFO, edge_render)
+
+            words = [{'en': f'w{i}'} for i in range(10)]
+            cache.preload_words(words, mode="en_to_cn")
+
+            assert len(server.requests) == 3
+            assert len(edge_calls) == 10
+            assert cache.get_preload_status()["errors"] == 0
+            assert cache.registry.get_health()["minimax"]["state"] == "open"
+
+            # 同步路径同样跳过熔断中的 MiniMax
+            assert cache.get_audio("new", "en") is not None
+            assert len(server.requests) == 3